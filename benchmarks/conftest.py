@@ -0,0 +1,41 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src import api, util
+
+RESULTS = Path(__file__).parent / ".results"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config: pytest.Config) -> None:
+    # NOTE: every run is saved under `benchmarks/.results`, named after the commit, so runs can be compared across
+    # commits with `--benchmark-compare` (and gated with `--benchmark-compare-fail=mean:10%`)
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{RESULTS}"
+    if not config.getoption("benchmark_save", None) and hasattr(config.option, "benchmark_autosave"):
+        config.option.benchmark_autosave = True
+
+
+@pytest.fixture(scope="session")
+def env() -> dict[str, str]:
+    util.context.parent_dir.set(Path.cwd())
+    util.context.project_name.set("test")
+    return util.context.env()
+
+
+@pytest.fixture(scope="session")
+def loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def engine(env: dict[str, str], loop: asyncio.AbstractEventLoop):
+    if not env.get("DBHOST"):
+        pytest.skip("No database configured (DBHOST)")
+    dependency = loop.run_until_complete(api.core.deps.db.DBEngine.start(env, loop))
+    yield dependency.instance
+    loop.run_until_complete(dependency.stop(env))
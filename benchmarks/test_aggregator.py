@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from src.app import aggregator
+
+TICKS = 10_000
+T0 = 1_700_000_000_000
+
+
+def _ticks(symbols: int) -> list[tuple[str, int, float, float]]:
+    rng = np.random.default_rng(0)
+    times = T0 + np.cumsum(rng.integers(0, 50, TICKS))
+    prices = 100 + np.cumsum(rng.normal(0, 0.01, TICKS))
+    return [(str(i % symbols), int(t), float(p), float(i)) for i, (t, p) in enumerate(zip(times, prices))]
+
+
+@pytest.mark.parametrize("symbols", [1, 100, 1000])
+def test_update(benchmark, symbols):
+    # NOTE: per-tick cost should not depend on the number of symbols
+    ticks = _ticks(symbols)
+
+    def _run() -> int:
+        agg = aggregator.Aggregator()
+        for tick in ticks:
+            agg.update(*tick)
+        return agg.ticks
+
+    assert benchmark.pedantic(_run, rounds=3) == TICKS
+
+
+def test_close(benchmark):
+    agg = aggregator.Aggregator()
+    for tick in _ticks(1000):
+        agg.update(*tick)
+    end = T0 + 10 * TICKS * 50
+    benchmark.pedantic(agg.close, args=(end,), rounds=1)
+    assert len(agg.drain()) >= 1000
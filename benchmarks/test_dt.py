@@ -0,0 +1,25 @@
+import numpy as np
+
+from src.ext.ibkr.util import bar_timestamps, unix_to_iso
+from src.util import dt
+from tests.mock import payloads
+
+BARS = payloads.bars(100_000)
+MS = np.array([bar["t"] for bar in BARS], dtype=np.int64)
+
+
+def test_unix_to_iso_scalar(benchmark):
+    assert len(benchmark(lambda: [unix_to_iso(bar["t"]) for bar in BARS])) == len(BARS)
+
+
+def test_bar_timestamps(benchmark):
+    assert len(benchmark(bar_timestamps, BARS)) == len(BARS)
+
+
+def test_unix_ms_to_iso(benchmark):
+    assert len(benchmark(dt.unix_ms_to_iso, MS)) == len(MS)
+
+
+def test_iso_to_unix_ms(benchmark):
+    iso = dt.unix_ms_to_iso(MS)
+    assert (benchmark(dt.iso_to_unix_ms, iso) == MS - MS % 1000).all()
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from src.api import core
+from src.api.core.limiter import Limiter
+from tests.mock import provider
+
+REQUESTS = 100
+PACED_REQUESTS = 10
+BARS_REQUEST = {"conid": "265598", "period": "1d", "bar": "1min"}
+
+
+def _fan_out(routers, gateway: provider.Gateway, n: int, *, wrapped: bool):
+    router = routers.hmds_historical_bars_columnar
+    call = router if wrapped else router.router
+
+    async def _fetch(client) -> int:
+        request = core.Request(provider="ibkr", router="hmds_historical_bars_columnar", payload=BARS_REQUEST)
+        return sum([len(response.data) async for response in call(request=request, client=client)])
+
+    async def _run() -> int:
+        async with gateway.client() as client:
+            return sum(await asyncio.gather(*(_fetch(client) for _ in range(n))))
+
+    return _run
+
+
+def test_gateway_throughput(benchmark, loop):
+    # NOTE: the unwrapped router, so only gateway latency and parsing are measured
+    gateway = provider.Gateway(latency=0.005, jitter=0.005, seed=0)
+    run = _fan_out(provider.routers(), gateway, REQUESTS, wrapped=False)
+    bars = benchmark.pedantic(loop.run_until_complete, setup=lambda: ((run(),), {}), rounds=5)
+    assert bars == REQUESTS * gateway.bars
+
+
+def test_gateway_pacing(benchmark, loop):
+    # NOTE: the router's own limiter should keep every request under the gateway's pacing limit
+    routers = provider.routers()
+    gateway = provider.Gateway(latency=0.005, rate_limit=routers.hmds_historical_bars_columnar.metadata.rate_limit)
+    run = _fan_out(routers, gateway, PACED_REQUESTS, wrapped=True)
+    benchmark.pedantic(loop.run_until_complete, setup=lambda: ((run(),), {}), rounds=1)
+    assert gateway.throttled == 0
+
+
+@pytest.mark.parametrize("prefetch", [1, 4])
+def test_positions(benchmark, loop, monkeypatch, prefetch: int):
+    # NOTE: a prefetch of 1 keeps a single page in flight, close to the old page-by-page chain
+    routers = provider.routers()
+    monkeypatch.setattr(routers, "POSITIONS_PREFETCH", prefetch)
+    gateway = provider.Gateway(latency=0.02, positions=2000, seed=0)
+    request = core.Request(provider="ibkr", router="portfolio_account_positions", payload={"root": "U1234567"})
+
+    async def _run() -> int:
+        async with gateway.client() as client:
+            router = routers.portfolio_account_positions.router(client=client, limiter=Limiter(), request=request)
+            return len([response async for response in router])
+
+    assert benchmark.pedantic(loop.run_until_complete, setup=lambda: ((_run(),), {}), rounds=3) == 2000
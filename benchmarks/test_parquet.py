@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from src.api.core.orm import parquet
+from src.ext.ibkr import tables
+
+ROWS = 100_000
+BATCH_SIZE = 10_000
+START = datetime(2024, 1, 1)
+
+
+def _batches():
+    async def _gen():
+        for offset in range(0, ROWS, BATCH_SIZE):
+            yield [
+                {
+                    "timestamp": START + timedelta(minutes=i),
+                    "symbol": "$265598",
+                    "open": 1.0,
+                    "high": 1.0,
+                    "low": 1.0,
+                    "close": 1.0,
+                    "volume": 1.0,
+                }
+                for i in range(offset, offset + BATCH_SIZE)
+            ]
+
+    return _gen()
+
+
+def test_write(benchmark, tmp_path):
+    def _write():
+        return asyncio.run(parquet.write(_batches(), tables.OHLC, tmp_path, partition_by="timestamp"))
+
+    assert benchmark.pedantic(_write, rounds=3).rows == ROWS
+
+
+def test_read(benchmark, tmp_path):
+    asyncio.run(parquet.write(_batches(), tables.OHLC, tmp_path, partition_by="timestamp"))
+
+    def _read() -> int:
+        return sum(len(list(records)) for _, records in parquet.read(tmp_path, tables.OHLC, batch_size=BATCH_SIZE))
+
+    assert benchmark.pedantic(_read, rounds=3) == ROWS
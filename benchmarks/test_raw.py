@@ -0,0 +1,87 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src import api
+
+ROWS = 10_000
+TABLE = Table(
+    "bench_ohlc",
+    MetaData(schema="public"),
+    Column("timestamp", DateTime, primary_key=True),
+    Column("symbol", String, primary_key=True),
+    Column("open", Float),
+    Column("high", Float),
+    Column("low", Float),
+    Column("close", Float),
+    Column("volume", Float),
+)
+
+
+def _bars(n: int) -> list[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "timestamp": start + timedelta(minutes=5 * i),
+            "symbol": "265598",
+            "open": 1.0,
+            "high": 2.0,
+            "low": 0.5,
+            "close": 1.5,
+            "volume": 100.0,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def table(engine: AsyncEngine, loop: asyncio.AbstractEventLoop) -> Table:
+    async def _create():
+        async with engine.begin() as conn:
+            await conn.run_sync(TABLE.metadata.create_all)
+
+    async def _drop():
+        async with engine.begin() as conn:
+            await conn.run_sync(TABLE.metadata.drop_all)
+
+    loop.run_until_complete(_create())
+    yield TABLE
+    loop.run_until_complete(_drop())
+
+
+@pytest.mark.parametrize("bulk", [False, True], ids=["loop", "copy"])
+def test_insert_many(benchmark, engine: AsyncEngine, loop: asyncio.AbstractEventLoop, table: Table, bulk: bool):
+    data = _bars(ROWS)
+
+    async def _insert():
+        async with AsyncSession(engine) as session:
+            await api.core.orm.raw.insert_many(session, table, data=data, bulk=bulk)
+
+    benchmark.extra_info["rows"] = ROWS
+    benchmark.pedantic(loop.run_until_complete, setup=lambda: ((_insert(),), {}), rounds=3)
+
+
+@pytest.mark.parametrize("batched", [False, True], ids=["rows", "batches"])
+def test_fetch(benchmark, engine: AsyncEngine, loop: asyncio.AbstractEventLoop, table: Table, batched: bool):
+    async def _seed():
+        async with AsyncSession(engine) as session:
+            await api.core.orm.raw.insert_many(session, table, data=_bars(ROWS), bulk=True)
+
+    async def _fetch() -> int:
+        count = 0
+        async with AsyncSession(engine) as session:
+            if batched:
+                async for batch in api.core.orm.raw.fetch_batches(session, table):
+                    count += len(batch)
+            else:
+                async for _ in api.core.orm.raw.fetch(session, table):
+                    count += 1
+        return count
+
+    loop.run_until_complete(_seed())
+    benchmark.extra_info["rows"] = ROWS
+    count = benchmark.pedantic(loop.run_until_complete, setup=lambda: ((_fetch(),), {}), rounds=3)
+    assert count == ROWS
@@ -0,0 +1,116 @@
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+
+from src.api import core
+from src.ext.ibkr import models as ibkr_models
+from src.ext.ibkr import models_generated as models
+from src.ext.ibkr.util import bar_timestamps, columnar_bars
+from tests.mock import payloads
+
+IDENTIFIER = core.symbols.Identifier("265598")
+CASES = {
+    "contract_info": (models.IserverContractConidInfoAndRulesGetResponse, payloads.contract_info(265598)),
+    "position": (models.IndividualPosition, payloads.position("U1234567", 265598)),
+    "ledger": (ibkr_models.Ledger, {**payloads.ledger()["USD"], "currency": "USD"}),
+    "account": (models.AccountAttributes, payloads.account("U1234567")),
+    "conid": (models.TrsrvAllConidsGetResponseItem, payloads.conids(1)[0]),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_object_construct(benchmark, case):
+    model, data = CASES[case]
+    obj = benchmark(core.response.Object, identifier=IDENTIFIER, model=model, _data=data)
+    assert obj.instance
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_object_json(benchmark, case):
+    # NOTE: `.json` is read by the log sink, the db sink and the daemon for every response
+    model, data = CASES[case]
+
+    def _json() -> dict:
+        obj = core.response.Object(identifier=IDENTIFIER, model=model, _data=data)
+        for _ in range(3):
+            json = obj.json
+        return json
+
+    assert benchmark(_json)["identifier"] == "$265598"
+
+
+BARS = payloads.bars(100_000)
+
+
+def test_bars_records(benchmark):
+    # NOTE: the per-bar path of `hmds_historical_bars`
+    attribute = core.symbols.Attribute("price")
+
+    def _records() -> list:
+        return [
+            core.Record(
+                identifier=IDENTIFIER,
+                timestamp=core.symbols.Timestamp(timestamp),
+                attribute=attribute,
+                _data={"open_": bar["o"], "high": bar["h"], "low": bar["l"], "close": bar["c"], "volume": bar["v"]},
+            )
+            for bar, timestamp in zip(BARS, bar_timestamps(BARS))
+        ]
+
+    assert len(benchmark(_records)) == len(BARS)
+
+
+def test_record_json(benchmark):
+    bar = BARS[0]
+    record = core.Record(
+        identifier=IDENTIFIER,
+        timestamp=core.symbols.Timestamp(str(bar["t"])),
+        attribute=core.symbols.Attribute("price"),
+        _data={"open_": bar["o"], "high": bar["h"], "low": bar["l"], "close": bar["c"], "volume": bar["v"]},
+    )
+    assert benchmark(lambda: record.json)["identifier"] == "$265598"
+
+
+@dataclass(frozen=True)
+class _DataclassRecord:
+    # NOTE: the layout `Record` had before it was slotted, kept to measure against
+    identifier: core.symbols.Identifier | None = None
+    timestamp: core.symbols.Timestamp | None = None
+    attribute: core.symbols.Attribute | None = None
+    _data: dict[str, Any] = field(default_factory=dict)
+
+
+MEMORY_BARS = 10_000
+
+
+@pytest.mark.parametrize("cls", [_DataclassRecord, core.Record], ids=["dataclass", "slots"])
+def test_bytes_per_bar(benchmark, cls):
+    attribute = core.symbols.Attribute("price")
+
+    def _records() -> float:
+        tracemalloc.start()
+        try:
+            records = [
+                cls(
+                    identifier=IDENTIFIER,
+                    timestamp=core.symbols.Timestamp(str(bar["t"])),
+                    attribute=attribute,
+                    _data={"open_": bar["o"], "high": bar["h"], "low": bar["l"], "close": bar["c"], "volume": bar["v"]},
+                )
+                for bar in BARS[:MEMORY_BARS]
+            ]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(records) == MEMORY_BARS
+        return size / MEMORY_BARS
+
+    per_bar = benchmark.pedantic(_records, rounds=3)
+    benchmark.extra_info["bytes_per_bar"] = per_bar
+    assert per_bar > 0
+
+
+def test_bars_columnar(benchmark):
+    assert len(benchmark(columnar_bars, BARS, 265598)) == len(BARS)
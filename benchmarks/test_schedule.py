@@ -0,0 +1,39 @@
+from datetime import time, timedelta
+
+from src.app.common.schedule import Schedule
+
+RULES = 10_000
+ITEMS = 100_000
+
+
+def _records(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "provider": "ibkr",
+            "router": "iserver_exchange_rate",
+            "request": {"source": "USD", "target": "EUR"},
+            "start": time(9, 30, i % 60),
+            "end": time(16),
+            "interval": timedelta(seconds=1),
+        }
+        for i in range(n)
+    ]
+
+
+def test_from_orm(benchmark):
+    records = _records(RULES)
+    schedule = benchmark(Schedule.from_orm, records)
+    assert len(schedule) == RULES
+
+
+def test_pop(benchmark):
+    records = _records(RULES)
+
+    def _pop(schedule: Schedule) -> int:
+        for _ in range(ITEMS):
+            schedule.pop()
+        return len(schedule)
+
+    remaining = benchmark.pedantic(_pop, setup=lambda: ((Schedule.from_orm(records),), {}), rounds=5)
+    assert remaining == RULES
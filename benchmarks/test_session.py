@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src import api, util
+from src.api.core.deps.http import HttpClient
+from src.api.core.limiter import Limiter
+from tests.mock import provider
+
+ROUTER = "hmds_historical_bars_columnar"
+BARS_REQUEST = {"conid": "265598", "period": "1d", "bar": "1min"}
+SCRIPT = """
+import asyncio
+
+from src import api
+
+asyncio.run(api.connect(["ibkr"]))
+"""
+
+
+@pytest.fixture(scope="module")
+def session(loop: asyncio.AbstractEventLoop):
+    """A session with the IBKR provider loaded and its HTTP client pointed at the mock gateway. No database."""
+    provider.routers()  # NOTE: imported against a placeholder host, ahead of `load_provider`
+    gateway = provider.Gateway(bars=1, seed=0)
+    HttpClient.transport = gateway.transport()
+    session = api.Session(loop, util.context.PROVIDERS, logger=logging.getLogger(__name__), env={})
+    session.load_provider(util.context.PROVIDERS / "ibkr", session.logger)
+    loop.run_until_complete(HttpClient.start({}, loop))
+    session[HttpClient.name] = HttpClient  # NOTE: set outside the loop, so the context var is visible to every call
+    # NOTE: unthrottled, so the benchmark measures dispatch rather than the rate limit
+    router = session.router("ibkr", ROUTER)
+    limiter, router.limiter = router.limiter, Limiter()
+    yield session
+    router.limiter = limiter
+    loop.run_until_complete(HttpClient.stop({}))
+    HttpClient.transport = None
+
+
+@pytest.mark.parametrize("warm", [False, True], ids=["cold", "warm"])
+def test_start(benchmark, env: dict[str, str], loop: asyncio.AbstractEventLoop, warm: bool):
+    if not env.get("DBHOST"):
+        pytest.skip("No database configured (DBHOST)")
+    if not warm:
+
+        def _run():
+            subprocess.run([sys.executable, "-c", SCRIPT], env=os.environ, check=True, capture_output=True)
+
+        _run()  # NOTE: warm the bytecode and model index caches
+        benchmark.pedantic(_run, rounds=5)
+        return
+
+    async def _start():
+        session = await api.connect(["ibkr"], loop=loop)
+        await session.stop(commit=False)
+
+    benchmark.pedantic(loop.run_until_complete, setup=lambda: ((_start(),), {}), rounds=5)
+
+
+def test_dispatch(benchmark, session: api.Session):
+    bound = benchmark(session, "ibkr", ROUTER, **BARS_REQUEST)
+    assert bound.args[-1].payload == BARS_REQUEST
+
+
+def test_round_trip(benchmark, session: api.Session, loop: asyncio.AbstractEventLoop):
+    # NOTE: dispatch, limiter, history and a single-bar response from a zero-latency gateway
+
+    async def _call() -> int:
+        return len([response async for response in session("ibkr", ROUTER, **BARS_REQUEST)()])
+
+    assert benchmark(lambda: loop.run_until_complete(_call())) == 1
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT = """
+import logging
+from pathlib import Path
+
+from src import api
+
+api.core.provider.ProviderDirectoryMixin.load_provider(Path("src/ext/ibkr"), logging.getLogger(), lazy={lazy})
+"""
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_load_provider(benchmark, lazy: bool):
+    env = {"IBKR_HOST": "localhost", "IBKR_PORT": "5000", **os.environ}
+    script = SCRIPT.format(lazy=lazy)
+
+    def _start():
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, capture_output=True)
+
+    _start()  # NOTE: warm the bytecode and model index caches
+    benchmark.pedantic(_start, rounds=5)
@@ -0,0 +1,41 @@
+import pytest
+
+from src.api.core import symbols
+
+SYMBOLS = [f"$SYM{i}" for i in range(100)] + [".price", ".volume"]
+CONSTRUCTIONS = 1_000_000
+
+
+@pytest.mark.parametrize("cls", [symbols.Identifier, symbols.Attribute, symbols.Router, symbols.Provider])
+def test_construct(benchmark, cls):
+    assert benchmark(cls, "265598").data == "265598"
+
+
+def test_json(benchmark):
+    symbol = symbols.Identifier("265598")
+    assert benchmark(lambda: symbol.json) == "$265598"
+
+
+def test_parse(benchmark):
+    parsed = benchmark(symbols.Collection._parse_str, ",".join(SYMBOLS))
+    assert len(parsed) == len(SYMBOLS)
+
+
+def test_collection(benchmark):
+    identifiers = [symbols.Identifier(f"SYM{i}") for i in range(100)]
+    assert benchmark(lambda: symbols.Collection(*identifiers).obj).startswith("SYM0,")
+
+
+@pytest.mark.parametrize("distinct", [100, CONSTRUCTIONS])
+def test_construct_many(benchmark, distinct):
+    # NOTE: 100 distinct values is the hot path of a streaming session; a million overflows the intern pool
+    values = [str(i % distinct) for i in range(CONSTRUCTIONS)]
+
+    def _run() -> int:
+        identifier, attribute = symbols.Identifier, symbols.Attribute
+        for value in values:
+            identifier(value)
+            attribute("price")
+        return len(values)
+
+    assert benchmark.pedantic(_run, rounds=1) == CONSTRUCTIONS
@@ -1,14 +1,19 @@
-from . import orm, symbols
+from . import cache, coalesce, history, limiter, orm, registry, symbols
 from .deps.dependency import Dependency
 from .factory import Bridge, Cycle, Factory, FactoryBase, Macro, Store
 from .provider import Provider
 from .request import Payload, Request, RequestModel
-from .response import Object, Record, Response
+from .response import Columnar, Object, Record, Response
 from .router import BoundRouterReturnType, Info, Metadata, Router, RouterReturnType, define
 from .symbols import Serializable, Symbol
 
 __all__ = [
+    "cache",
+    "coalesce",
+    "history",
+    "limiter",
     "orm",
+    "registry",
     "Dependency",
     "FactoryBase",
     "Factory",
@@ -24,6 +29,7 @@ __all__ = [
     "Response",
     "Object",
     "Record",
+    "Columnar",
     "Info",
     "Metadata",
     "Router",
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import sys
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import date, datetime
+from logging import Logger
+from time import time
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from .orm import meta
+from .request import Request
+from .response import Columnar, Object, Record, Response, ResponseFactory
+
+CACHE_SIZE = 1024
+
+Data = list[Object | Record | Columnar]
+
+
+def key(provider: str, router: str, payload: dict) -> str:
+    """Cache key of a request. Payload keys are sorted, so keyword order does not matter."""
+    return json.dumps([provider, router, payload], sort_keys=True, default=str, separators=(",", ":"))
+
+
+class LRUCache:
+    """In-memory tier. Holds the data of up to `maxsize` responses, evicting the least recently used.
+
+    Args:
+        maxsize: Number of cached requests
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Data]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"<LRUCache({len(self)}/{self.maxsize})>"
+
+    def get(self, key: str) -> Data | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: Data, expires_at: float) -> None:
+        self._entries[key] = (expires_at, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _default(value: Any) -> dict[str, str]:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} cannot be stored in the shared cache")
+
+
+def _hook(obj: dict) -> Any:
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def _model(path: str) -> type[BaseModel] | None:
+    # NOTE: only resolves models already imported, so a stored path can never import, let alone run, anything
+    module, _, qualname = path.partition(":")
+    model = sys.modules.get(module)
+    for name in qualname.split("."):
+        model = getattr(model, name, None)
+    return model if isinstance(model, type) and issubclass(model, BaseModel) else None
+
+
+def dumps(data: Data) -> str:
+    """Response data as JSON, tagged with the type of each item. Columns keep their dtype.
+
+    Raises:
+        TypeError: If a value is not JSON, a datetime or a date
+    """
+    items = []
+    for item in data:
+        entry = {"identifier": item._identifier, "timestamp": item._timestamp, "attribute": item._attribute}
+        if isinstance(item, Columnar):
+            entry["type"] = "columnar"
+            entry["data"] = {
+                key: {
+                    "dtype": array.dtype.str,
+                    "values": (array.astype(np.int64) if np.issubdtype(array.dtype, np.datetime64) else array).tolist(),
+                }
+                for key, array in item.arrays.items()
+            }
+        else:
+            entry["type"] = "object" if isinstance(item, Object) else "record"
+            entry["data"] = item._data
+            if isinstance(item, Object):
+                entry["model"] = f"{item.model.__module__}:{item.model.__qualname__}"
+        items.append(entry)
+    return json.dumps(items, default=_default, separators=(",", ":"))
+
+
+def loads(raw: str) -> Data | None:
+    """The data `dumps` stored, or None if an item's model is not loaded in this process."""
+    data = []
+    for entry in json.loads(raw, object_hook=_hook):
+        symbols = (entry["identifier"], entry["timestamp"], entry["attribute"])
+        if entry["type"] == "columnar":
+            arrays = {key: np.array(c["values"], dtype=np.dtype(c["dtype"])) for key, c in entry["data"].items()}
+            data.append(Columnar(*symbols, arrays))
+        elif entry["type"] == "object":
+            if (model := _model(entry["model"])) is None:
+                return None
+            data.append(Object(*symbols, entry["data"], model))
+        else:
+            data.append(Record(*symbols, entry["data"]))
+    return data
+
+
+class PostgresCache:
+    """Shared tier, in `meta.response_cache`. Response data is stored as tagged JSON (see `dumps`), so it survives
+    restarts and is shared between processes without trusting whoever can write the table."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    async def get(self, key: str) -> tuple[float, Data] | None:
+        table = meta.ResponseCache
+        query = select(table.expires_at, table.data).where(table.key == key, table.expires_at > datetime.now())
+        async with AsyncSession(self.engine) as session:
+            row = (await session.execute(query)).one_or_none()
+        if row is None or (data := loads(row.data)) is None:
+            return None
+        return row.expires_at.timestamp(), data
+
+    async def set(self, key: str, data: Data, expires_at: float) -> None:
+        values = {"key": key, "expires_at": datetime.fromtimestamp(expires_at), "data": dumps(data)}
+        stmt = insert(meta.ResponseCache).values(**values)
+        stmt = stmt.on_conflict_do_update(index_elements=["key"], set_={k: v for k, v in values.items() if k != "key"})
+        async with AsyncSession(self.engine) as session:
+            await session.execute(stmt)
+            await session.commit()
+
+
+class _Abandoned(Exception):
+    """Set on an in-flight call whose caller was cancelled, so that a waiting caller takes it over."""
+
+
+class ResponseCache:
+    """Two-tier cache of router responses, keyed by provider, router and payload.
+
+    Concurrent misses on the same key make a single upstream call: the first caller runs the router, the others wait
+    for its result.
+
+    Args:
+        memory: The in-memory tier
+        shared: The optional Postgres tier, checked on a memory miss
+        logger: Logger for errors writing to the shared tier, which do not fail the request
+    """
+
+    def __init__(
+        self, memory: LRUCache | None = None, shared: PostgresCache | None = None, *, logger: Logger | None = None
+    ):
+        self.memory = memory or LRUCache()
+        self.shared = shared
+        self.logger = logger
+        self.hits = 0
+        self.misses = 0
+        self._inflight: dict[str, asyncio.Future[Data]] = {}
+
+    def __repr__(self) -> str:
+        return f"<ResponseCache({self.memory}, shared={self.shared is not None})>"
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.memory), "inflight": len(self._inflight)}
+
+    async def _lookup(self, key: str) -> Data | None:
+        if (data := self.memory.get(key)) is not None:
+            return data
+        if self.shared is not None and (entry := await self.shared.get(key)) is not None:
+            expires_at, data = entry
+            self.memory.set(key, data, expires_at)
+            return data
+        return None
+
+    async def fetch(self, key: str, ttl: float, factory: Callable[[], ResponseFactory]) -> Data:
+        """The cached data for `key`, calling `factory` for fresh responses on a miss.
+
+        If the caller making the upstream call is cancelled, the call is handed to one of the callers waiting on it,
+        rather than cancelling them all.
+        """
+        while True:
+            if (data := await self._lookup(key)) is not None:
+                self.hits += 1
+                return data
+            if (future := self._inflight.get(key)) is None:
+                return await self._lead(key, ttl, factory)
+            try:
+                data = await asyncio.shield(future)
+            except _Abandoned:
+                continue
+            self.hits += 1
+            return data
+
+    async def _lead(self, key: str, ttl: float, factory: Callable[[], ResponseFactory]) -> Data:
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())  # NOTE: no waiters is not an error
+        self._inflight[key] = future
+        try:
+            data = [response.data async for response in factory()]
+            expires_at = time() + ttl
+            self.memory.set(key, data, expires_at)
+            if self.shared is not None:
+                await self._share(key, data, expires_at)
+        except asyncio.CancelledError:
+            future.set_exception(_Abandoned())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            del self._inflight[key]
+
+    async def _share(self, key: str, data: Data, expires_at: float) -> None:
+        try:
+            await self.shared.set(key, data, expires_at)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error writing {key} to the shared cache: {e}")
+
+    async def stream(
+        self, key: str, ttl: float, factory: Callable[[], ResponseFactory], request: Request
+    ) -> ResponseFactory:
+        """As `fetch`, yielding the data as responses to `request`."""
+        for data in await self.fetch(key, ttl, factory):
+            yield Response(request, data)
+
+    def clear(self) -> None:
+        self.memory.clear()
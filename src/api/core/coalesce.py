@@ -0,0 +1,106 @@
+import asyncio
+from collections.abc import Callable
+
+from .request import Request
+from .response import Response, ResponseFactory
+
+BUFFER_SIZE = 256
+
+_END = object()
+
+
+class _Error:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class _Broadcast:
+    """A single upstream router call, fanned out to every subscriber through its own bounded queue.
+
+    A full queue holds up the upstream call, so a slow consumer slows its peers down rather than growing a buffer.
+    """
+
+    def __init__(self, factory: Callable[[], ResponseFactory], maxsize: int, release: Callable[[], None]):
+        self.factory = factory
+        self.maxsize = maxsize
+        self.queues: list[asyncio.Queue] = []
+        self._release = release
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.maxsize)
+        self.queues.append(queue)
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue not in self.queues:
+            return
+        self.queues.remove(queue)
+        while not queue.empty():
+            queue.get_nowait()  # NOTE: unblocks the upstream call if it is waiting on this queue
+        if not self.queues and self._task is not None and not self._task.done():
+            self._release()
+            self._task.cancel()
+
+    async def _pump(self) -> None:
+        try:
+            async for response in self.factory():
+                # NOTE: subscribers joining after the first response would miss it, so they start a call of their own
+                self._release()
+                for queue in list(self.queues):
+                    await queue.put(response)
+        except Exception as e:
+            end = _Error(e)
+        else:
+            end = _END
+        finally:
+            self._release()
+        for queue in list(self.queues):
+            await queue.put(end)
+
+
+class Coalescer:
+    """Shares one upstream call among identical requests that are in flight at the same time.
+
+    Requests are identical if they have the same key. A request joins a call that has not produced its first response
+    yet; later ones start a new call.
+
+    Args:
+        maxsize: Responses buffered per consumer
+    """
+
+    def __init__(self, maxsize: int = BUFFER_SIZE):
+        self.maxsize = maxsize
+        self.coalesced = 0
+        self._inflight: dict[str, _Broadcast] = {}
+
+    def __repr__(self) -> str:
+        return f"<Coalescer({len(self._inflight)} in flight, {self.coalesced} coalesced)>"
+
+    def _broadcast(self, key: str, factory: Callable[[], ResponseFactory]) -> _Broadcast:
+        if (broadcast := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            return broadcast
+
+        def _release() -> None:
+            if self._inflight.get(key) is broadcast:
+                del self._inflight[key]
+
+        broadcast = self._inflight[key] = _Broadcast(factory, self.maxsize, _release)
+        return broadcast
+
+    async def stream(self, key: str, factory: Callable[[], ResponseFactory], request: Request) -> ResponseFactory:
+        """Yield the responses of `factory`, or of an identical call already in flight, as responses to `request`."""
+        broadcast = self._broadcast(key, factory)
+        queue = broadcast.subscribe()
+        try:
+            while (item := await queue.get()) is not _END:
+                if isinstance(item, _Error):
+                    raise item.error
+                yield Response(request, item.data)
+        finally:
+            broadcast.unsubscribe(queue)
@@ -1,8 +1,8 @@
-from . import db, http, mixin
-from .dependency import Dependency, Dependencies
+from . import db, http, mixin, stats
+from .dependency import Dependency, Dependencies, setting
 
 core_dependencies = [
     db.DBEngine,
 ]
 
-__all__ = ["Dependency", "Dependencies", "core_dependencies", "http", "mixin"]
+__all__ = ["Dependency", "Dependencies", "core_dependencies", "http", "mixin", "setting", "stats"]
@@ -1,19 +1,79 @@
 from asyncio import AbstractEventLoop
+from time import perf_counter
 from typing import ClassVar
 
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from .dependency import Dependency
+from .dependency import Dependency, setting
+from .stats import PoolStats
+
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+POOL_TIMEOUT = 30.0
+POOL_RECYCLE = -1  # NOTE: seconds; -1 never recycles
+POOL_PRE_PING = False
+STATEMENT_CACHE_SIZE = 100
+SERVER_PREPARED = True
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool recording checkout wait times, overflow connections and checkout timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedPool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        start = perf_counter()
+        overflow = self.overflow()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeout()
+            raise
+        self.stats.checkout(perf_counter() - start, overflow=self.overflow() > max(overflow, 0))
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        self.stats.checkin()
+        super()._do_return_conn(record)
 
 
 class DBEngine(Dependency[AsyncEngine]):
+    """Shared database engine. The pool and statement caching are read from the environment:
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE and
+    DB_SERVER_PREPARED. Set DB_SERVER_PREPARED=false behind a transaction-pooling proxy such as pgbouncer.
+    """
+
     instance: ClassVar[AsyncEngine | None] = None
     name = "db"
 
     @classmethod
     async def start(cls, env: dict[str, str], loop: AbstractEventLoop):
         url = f"postgresql+asyncpg://{env.get('DBUSER')}@{env.get('DBHOST')}:{env.get('DBPORT')}/{env.get('DBNAME')}"
-        cls.instance = create_async_engine(url)
+        cache_size = setting(env, "DB_STATEMENT_CACHE_SIZE", STATEMENT_CACHE_SIZE, int)
+        if not setting(env, "DB_SERVER_PREPARED", SERVER_PREPARED, bool):
+            cache_size = 0
+        # NOTE: asyncpg caches statements per connection; SQLAlchemy keeps its own cache of prepared statements on top
+        url += f"?prepared_statement_cache_size={cache_size}"
+        cls.instance = create_async_engine(
+            url,
+            poolclass=InstrumentedPool,
+            pool_size=setting(env, "DB_POOL_SIZE", POOL_SIZE, int),
+            max_overflow=setting(env, "DB_MAX_OVERFLOW", MAX_OVERFLOW, int),
+            pool_timeout=setting(env, "DB_POOL_TIMEOUT", POOL_TIMEOUT, float),
+            pool_recycle=setting(env, "DB_POOL_RECYCLE", POOL_RECYCLE, int),
+            pool_pre_ping=setting(env, "DB_POOL_PRE_PING", POOL_PRE_PING, bool),
+            connect_args={"statement_cache_size": cache_size},
+        )
         return cls
 
     @classmethod
@@ -22,6 +82,16 @@ class DBEngine(Dependency[AsyncEngine]):
         cls.instance = None
         return cls
 
+    @classmethod
+    def pool(cls) -> dict:
+        """Checked-out connections, overflow and checkout wait-time percentiles."""
+        if cls.instance is None:
+            raise RuntimeError("DBEngine not initialized")
+        pool = cls.instance.sync_engine.pool
+        summary = pool.stats.summary() if isinstance(pool, InstrumentedPool) else {}
+        summary.update({"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()})
+        return summary
+
     async def __aenter__(self) -> AsyncEngine:
         return self.instance
 
@@ -1,8 +1,10 @@
 from asyncio import AbstractEventLoop
 from contextvars import ContextVar
-from typing import AsyncContextManager, ClassVar, Generic, Protocol, TypeVar
+from typing import Any, AsyncContextManager, Callable, ClassVar, Generic, Protocol, TypeVar
 
 DependencyT = TypeVar("DependencyT", bound=AsyncContextManager)
+T = TypeVar("T")
+TRUE = {"1", "true", "yes", "on"}
 
 
 class Dependency(Protocol, Generic[DependencyT]):
@@ -22,3 +24,21 @@ Dependencies = dict[str, Dependency]
 DependencyDict = dict[str, ContextVar[DependencyT]]
 
 
+def setting(env: dict[str, Any], key: str, default: T, cast: Callable[[str], T] = str) -> T:
+    """Read a tuning knob from the environment, falling back to `default` when it is unset or empty.
+
+    Args:
+        env: The session environment
+        key: The environment variable, e.g. `HTTP_MAX_CONNECTIONS`
+        default: Value used when `key` is not set
+        cast: Converts the raw string. `bool` accepts 1/true/yes/on, case-insensitively
+    """
+    value = env.get(key)
+    if value is None or value == "":
+        return default
+    if cast is bool:
+        return str(value).strip().lower() in TRUE
+    try:
+        return cast(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid value for {key}: {value!r}") from e
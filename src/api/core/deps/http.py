@@ -1,18 +1,112 @@
 from asyncio import AbstractEventLoop
-from typing import ClassVar
+from time import perf_counter
+from typing import AsyncIterator, ClassVar
 
+import httpx
 from httpx import AsyncClient
 
 from . import dependency
+from .stats import PoolStats
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE = 20
+KEEPALIVE_EXPIRY = 5.0
+HTTP2 = False
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+POOL_TIMEOUT = 30.0
+
+
+class _Stream(httpx.AsyncByteStream):
+    """Wraps a response body to hand its connection back to the stats once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, stats: PoolStats):
+        self._stream = stream
+        self._stats = stats
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._stats.checkin()
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport recording how long each request waits for a pooled connection.
+
+    The wait is measured from the request entering the pool to the first connection-level trace event, i.e. the
+    moment a connection, new or reused, is assigned to it.
+    """
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    @property
+    def connections(self) -> dict[str, int]:
+        connections = self._pool.connections
+        return {"open": len(connections), "idle": sum(connection.is_idle() for connection in connections)}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = perf_counter()
+        assigned = None
+        inner = request.extensions.get("trace")
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal assigned
+            if assigned is None:
+                assigned = perf_counter()
+            if inner is not None:
+                await inner(event, info)
+
+        request.extensions["trace"] = trace
+        try:
+            response = await super().handle_async_request(request)
+        except httpx.PoolTimeout:
+            self.stats.timeout()
+            raise
+        self.stats.checkout((assigned or perf_counter()) - start)
+        response.stream = _Stream(response.stream, self.stats)
+        return response
 
 
 class HttpClient(dependency.Dependency[AsyncClient]):
+    """Shared HTTP client. Pool size, keep-alive, HTTP/2 and timeouts are read from the environment:
+
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY, HTTP_HTTP2, HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT and HTTP_POOL_TIMEOUT.
+    """
+
     instance: ClassVar[AsyncClient | None] = None
     name = "http"
+    stats: ClassVar[PoolStats] = PoolStats()
+    transport: ClassVar[httpx.AsyncBaseTransport | None] = None  # NOTE: overrides the pooled transport, e.g. in tests
 
     @classmethod
     async def start(cls, env: dict[str, str], loop: AbstractEventLoop):
-        cls.instance = AsyncClient(verify=False)
+        setting = dependency.setting
+        limits = httpx.Limits(
+            max_connections=setting(env, "HTTP_MAX_CONNECTIONS", MAX_CONNECTIONS, int),
+            max_keepalive_connections=setting(env, "HTTP_MAX_KEEPALIVE", MAX_KEEPALIVE, int),
+            keepalive_expiry=setting(env, "HTTP_KEEPALIVE_EXPIRY", KEEPALIVE_EXPIRY, float),
+        )
+        timeout = httpx.Timeout(
+            setting(env, "HTTP_READ_TIMEOUT", READ_TIMEOUT, float),
+            connect=setting(env, "HTTP_CONNECT_TIMEOUT", CONNECT_TIMEOUT, float),
+            pool=setting(env, "HTTP_POOL_TIMEOUT", POOL_TIMEOUT, float),
+        )
+        cls.stats = PoolStats()
+        transport = cls.transport or InstrumentedTransport(
+            cls.stats, verify=False, http2=setting(env, "HTTP_HTTP2", HTTP2, bool), limits=limits
+        )
+        cls.instance = AsyncClient(verify=False, transport=transport, timeout=timeout)
         return cls
 
     @classmethod
@@ -22,6 +116,14 @@ class HttpClient(dependency.Dependency[AsyncClient]):
             cls.instance = None
         return cls
 
+    @classmethod
+    def pool(cls) -> dict:
+        """Pool occupancy and checkout wait-time percentiles."""
+        summary = cls.stats.summary()
+        if cls.instance is not None and isinstance(transport := cls.instance._transport, InstrumentedTransport):
+            summary["connections"] = transport.connections
+        return summary
+
     async def __aenter__(self) -> AsyncClient:
         if self.instance is None:
             raise RuntimeError("HttpClient not initialized")
@@ -0,0 +1,49 @@
+from collections import deque
+
+from ..history import HISTORY_CAPACITY, PERCENTILES, _percentile
+
+
+class PoolStats:
+    """Occupancy and checkout wait times of a connection pool. Wait times are in seconds.
+
+    Args:
+        capacity: Number of recent wait times kept for percentiles
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.in_use = 0
+        self.peak = 0
+        self.checkouts = 0
+        self.overflows = 0
+        self.timeouts = 0
+        self._waits: deque[float] = deque(maxlen=capacity)
+
+    def __repr__(self) -> str:
+        return f"<PoolStats({self.in_use} in use, peak {self.peak}, {self.checkouts} checkouts)>"
+
+    def checkout(self, wait: float, *, overflow: bool = False) -> None:
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        self.checkouts += 1
+        self.overflows += overflow
+        self._waits.append(wait)
+
+    def checkin(self) -> None:
+        self.in_use = max(0, self.in_use - 1)
+
+    def timeout(self) -> None:
+        self.timeouts += 1
+
+    def percentiles(self, qs: tuple[int, ...] = PERCENTILES) -> dict[str, float | None]:
+        waits = sorted(self._waits)
+        return {f"p{q}": _percentile(waits, q) if waits else None for q in qs}
+
+    def summary(self) -> dict:
+        return {
+            "in_use": self.in_use,
+            "peak": self.peak,
+            "checkouts": self.checkouts,
+            "overflows": self.overflows,
+            "timeouts": self.timeouts,
+            "wait": self.percentiles(),
+        }
@@ -15,6 +15,7 @@ BridgeT = TypeVar("BridgeT", bound=Callable[[Router], Response])
 
 
 class FactoryBase(Symbol, ABC):
+    interned = False  # NOTE: factories carry their own target and bound payload
     target: Router
 
     def __init__(self, name: str):
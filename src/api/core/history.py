@@ -0,0 +1,87 @@
+from time import perf_counter
+from uuid import UUID
+
+from src.util import dt
+
+HISTORY_CAPACITY = 1024
+PERCENTILES = (50, 95, 99)
+
+
+class Entry:
+    """A single request made through a router. Latencies are in seconds, relative to `started_at`."""
+
+    __slots__ = ("request_id", "started_at", "first_byte", "total", "count", "error", "_t0")
+
+    def __init__(self, request_id: UUID | None):
+        self.request_id = request_id
+        self.started_at = dt.utcnow()
+        self.first_byte: float | None = None
+        self.total: float | None = None
+        self.count = 0
+        self.error: str | None = None
+        self._t0 = perf_counter()
+
+    def __repr__(self) -> str:
+        return f"<Entry({self.request_id}, count={self.count}, total={self.total}, error={self.error})>"
+
+    def record(self) -> None:
+        """Record a response."""
+        if self.first_byte is None:
+            self.first_byte = perf_counter() - self._t0
+        self.count += 1
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.total = perf_counter() - self._t0
+        if error is not None:
+            self.error = repr(error)
+
+
+def _percentile(values: list[float], q: int) -> float:
+    # NOTE: nearest-rank; `values` must be sorted
+    rank = max(1, -(-q * len(values) // 100))
+    return values[rank - 1]
+
+
+class History:
+    """Fixed-capacity ring buffer of the most recent requests made through a router."""
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.capacity = capacity
+        self._entries: list[Entry | None] = [None] * capacity
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        """Entries from oldest to newest."""
+        start = (self._next - self._size) % self.capacity
+        for i in range(self._size):
+            yield self._entries[(start + i) % self.capacity]
+
+    def __repr__(self) -> str:
+        return f"<History({self._size}/{self.capacity})>"
+
+    def start(self, request_id: UUID | None) -> Entry:
+        """Open an entry for a new request, evicting the oldest one if the buffer is full."""
+        entry = Entry(request_id)
+        self._entries[self._next] = entry
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return entry
+
+    def percentiles(self, attr: str = "total", qs: tuple[int, ...] = PERCENTILES) -> dict[str, float | None]:
+        """Percentiles of a latency attribute (`first_byte` or `total`) over finished entries."""
+        values = sorted(v for entry in self if (v := getattr(entry, attr)) is not None and entry.total is not None)
+        return {f"p{q}": _percentile(values, q) if values else None for q in qs}
+
+    def summary(self) -> dict:
+        finished = [entry for entry in self if entry.total is not None]
+        return {
+            "count": len(finished),
+            "errors": sum(entry.error is not None for entry in finished),
+            "responses": sum(entry.count for entry in finished),
+            "first_byte": self.percentiles("first_byte"),
+            "total": self.percentiles("total"),
+        }
@@ -0,0 +1,100 @@
+from asyncio import Lock, sleep
+from time import monotonic
+
+RateLimit = tuple[int, float]  # (limit, seconds)
+
+
+class TokenBucket:
+    """Async token bucket. Holds up to `limit` tokens, refilled continuously at `limit / seconds` tokens per second.
+
+    Callers that find the bucket empty queue up and are served in arrival order.
+
+    Args:
+        limit: Bucket capacity, i.e. the burst size
+        seconds: Time taken to refill an empty bucket
+    """
+
+    def __init__(self, limit: int, seconds: float):
+        if limit < 1 or seconds <= 0:
+            raise ValueError(f"Invalid rate limit: ({limit}, {seconds})")
+        self.limit = limit
+        self.seconds = seconds
+        self._rate = limit / seconds
+        self._tokens = float(limit)
+        self._updated = monotonic()
+        self._lock = Lock()
+        self._waiting = 0
+
+    def __repr__(self) -> str:
+        return f"<TokenBucket({self.limit}/{self.seconds}s)>"
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.limit, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a token."""
+        return self._waiting
+
+    @property
+    def wait_time(self) -> float:
+        """Estimated seconds a caller arriving now would wait for a token."""
+        self._refill()
+        deficit = self._waiting + 1 - self._tokens
+        return max(0.0, deficit / self._rate)
+
+    async def acquire(self) -> float:
+        """Take a token, waiting in line for one if the bucket is empty. Returns the time spent waiting."""
+        start = monotonic()
+        self._waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await sleep((1 - self._tokens) / self._rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+        return monotonic() - start
+
+
+class Limiter:
+    """Rate limiter for a single router, optionally chained to a provider-wide limiter.
+
+    The router's own bucket is acquired before the parent's, so a router that is being throttled does not hold a
+    place in the provider-wide queue.
+
+    Args:
+        rate_limit: The router's rate limit, in (limit, seconds). No router-level limiting if None
+        parent: Provider-wide limiter shared by every router of the provider
+    """
+
+    def __init__(self, rate_limit: RateLimit | None = None, parent: "Limiter | None" = None):
+        self.bucket = TokenBucket(*rate_limit) if rate_limit else None
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return f"<Limiter({self.bucket}, parent={self.parent})>"
+
+    @property
+    def queue_depth(self) -> int:
+        depth = self.bucket.queue_depth if self.bucket else 0
+        return depth + (self.parent.queue_depth if self.parent else 0)
+
+    @property
+    def wait_time(self) -> float:
+        wait = self.bucket.wait_time if self.bucket else 0.0
+        return wait + (self.parent.wait_time if self.parent else 0.0)
+
+    @property
+    def stats(self) -> dict[str, float | int]:
+        return {"wait_time": self.wait_time, "queue_depth": self.queue_depth}
+
+    async def acquire(self) -> float:
+        waited = await self.bucket.acquire() if self.bucket else 0.0
+        if self.parent:
+            waited += await self.parent.acquire()
+        return waited
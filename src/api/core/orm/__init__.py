@@ -1,3 +1,3 @@
-from . import meta, raw, derived, mixin
+from . import meta, raw, derived, mixin, parquet, partition, writer
 
-__all__ = ["meta", "raw", "derived", "mixin"]
+__all__ = ["meta", "raw", "derived", "mixin", "parquet", "partition", "writer"]
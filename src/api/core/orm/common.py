@@ -12,23 +12,24 @@ class SelectFilter:
     op: Literal["==", "!=", ">", ">=", "<", "<=", "in", "not in"]
 
     def filter_query(self, query: Select, table: Table) -> Select:
+        column = table.c[self.attr] if isinstance(table, Table) else getattr(table, self.attr)
         match self.op:
             case "==":
-                return query.where(getattr(table, self.attr) == self.value)
+                return query.where(column == self.value)
             case "!=":
-                return query.where(getattr(table, self.attr) != self.value)
+                return query.where(column != self.value)
             case ">":
-                return query.where(getattr(table, self.attr) > self.value)
+                return query.where(column > self.value)
             case ">=":
-                return query.where(getattr(table, self.attr) >= self.value)
+                return query.where(column >= self.value)
             case "<":
-                return query.where(getattr(table, self.attr) < self.value)
+                return query.where(column < self.value)
             case "<=":
-                return query.where(getattr(table, self.attr) <= self.value)
+                return query.where(column <= self.value)
             case "in":
-                return query.where(getattr(table, self.attr).in_(self.value))
+                return query.where(column.in_(self.value))
             case "not in":
-                return query.where(getattr(table, self.attr).notin_(self.value))
+                return query.where(column.notin_(self.value))
         return query
 
 
@@ -1,4 +1,4 @@
-from datetime import timedelta, time
+from datetime import datetime, timedelta, time
 
 from sqlalchemy import ForeignKey, MetaData
 from sqlalchemy import types as t
@@ -41,3 +41,11 @@ class Schedule(base):
     start: Mapped[time] = mapped_column(TIME, nullable=True)
     end: Mapped[time] = mapped_column(TIME, nullable=True)
     interval: Mapped[timedelta] = mapped_column(TIME, default=timedelta(days=1))
+
+
+class ResponseCache(base):
+    __tablename__ = "response_cache"
+    key: Mapped[str] = mapped_column(t.String, primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(t.DateTime, index=True)
+    # NOTE: JSON text rather than JSONB, which rejects the NaNs columnar data marks missing values with
+    data: Mapped[str] = mapped_column(t.Text)
@@ -1,18 +1,37 @@
-from typing import Sequence
+from functools import partial
+from typing import Any, Sequence
 
-from sqlalchemy import MetaData, RowMapping
+from sqlalchemy import MetaData, RowMapping, Table
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.sql import select
 
+from ..request import SerializableObj
+from ..response import Columnar
+from . import partition, raw
 from .meta import metadata
+from .writer import BatchWriter, columnar, datetimes, row
 
 SESSION_NOT_INITIALIZED = "Database session not initialized"
 
 
+async def _write(dbengine: AsyncEngine, table: Table | type[DeclarativeBase], rows: list[dict[str, Any]]) -> None:
+    async with AsyncSession(dbengine) as session:
+        await raw.insert_many(session, table, data=datetimes(rows, table), bulk=True)
+
+
+async def _copy(dbengine: AsyncEngine, table: Table | type[DeclarativeBase], data: Columnar) -> None:
+    columns, records = columnar(data, table)
+    async with AsyncSession(dbengine) as session:
+        await raw.copy_upsert(session, table, columns=columns, records=records)
+
+
 class OrmSessionMixin:
     """Mixin class for managing database session and metadata."""
 
     _session: AsyncSession | None = None
+    _writer: BatchWriter | None = None
+    _dbengine: AsyncEngine | None = None
 
     @property
     def session(self) -> AsyncSession:
@@ -26,23 +45,61 @@ class OrmSessionMixin:
             raise ValueError(SESSION_NOT_INITIALIZED)
         return self._session
 
+    @property
+    def writer(self) -> BatchWriter:
+        """Get the batching writer behind `store`.
+
+        Raises:
+            ValueError: If database session is not initialized
+
+        """
+        if not self._writer:
+            raise ValueError(SESSION_NOT_INITIALIZED)
+        return self._writer
+
     async def init_db(
         self,
         dbengine: AsyncEngine,
         provider_metadata: list[MetaData],
+        *,
+        partitioned: bool = False,
+        partitions_ahead: int = partition.PARTITIONS_AHEAD,
     ) -> None:
-        """Initialize the database connection and create tables."""
+        """Initialize the database connection and create tables.
+
+        Args:
+            dbengine: The database engine
+            provider_metadata: Metadata of every loaded provider
+            partitioned: Create tables opting into it (`info={"partition_by": ...}`) as range-partitioned by month, and
+                create their partitions for the next `partitions_ahead` months. Tables that already exist are not
+                converted
+            partitions_ahead: Months past the current one to create partitions for
+        """
         async with dbengine.begin() as conn:
             await conn.run_sync(metadata.create_all)
             for md in provider_metadata:
+                if partitioned:
+                    partition.declare(md)
                 await conn.run_sync(md.create_all)
+                for table in partition.tables(md) if partitioned else ():
+                    await partition.maintain(conn, table, ahead=partitions_ahead, logger=getattr(self, "logger", None))
+        self._dbengine = dbengine
         self._session = AsyncSession(dbengine)
+        self._writer = BatchWriter(partial(_write, dbengine), logger=getattr(self, "logger", None)).start()
 
     async def stop_db(self, *, commit: bool = True) -> None:
-        """Close the database session, optionally committing changes."""
-        if commit:
-            await self.session.commit()
-        await self.session.close()
+        """Flush pending writes and close the database session, optionally committing changes.
+
+        Raises:
+            Exception: If the pending writes could not be flushed. The session is closed regardless
+        """
+        try:
+            if self._writer:
+                await self._writer.close()
+        finally:
+            if commit:
+                await self.session.commit()
+            await self.session.close()
 
     async def load_metadata(self, md: MetaData) -> None:
         """Create tables for the given metadata."""
@@ -54,7 +111,14 @@ class OrmSessionMixin:
         result = await self.session.execute(stmt)
         return result.mappings().all()
 
-    async def store(self, table) -> None:
-        """Store a response in the database."""
-        await self.session.add(response)
-        await self.session.commit()
+    async def store(self, response: SerializableObj, table: Table | type[DeclarativeBase]) -> None:
+        """Queue a response for a bulk write to `table`. Blocks while the writer's buffer is full.
+
+        Columnar responses skip the buffer and are copied in directly, after any rows already buffered for `table`.
+        """
+        data = getattr(response, "data", response)
+        if isinstance(data, Columnar):
+            await self.writer.flush(table)
+            await _copy(self._dbengine, table, data)
+            return
+        await self.writer.put(table, row(response.json, table))
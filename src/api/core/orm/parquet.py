@@ -0,0 +1,204 @@
+import json
+from collections.abc import AsyncIterable, Iterator, Mapping, Sequence
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Table
+from sqlalchemy import types as t
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase
+
+from . import raw
+from .common import SelectFilter
+
+BATCH_SIZE = 50_000
+PARTITION = "month"
+PARTITION_FORMAT = "%Y-%m"
+FILE_NAME = "part-0.parquet"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# NOTE: checked in order, so subclasses (e.g. `Enum` of `String`) must come before their bases
+TYPES: list[tuple[type[t.TypeEngine], pa.DataType]] = [
+    (t.Boolean, pa.bool_()),
+    (t.Integer, pa.int64()),
+    (t.Float, pa.float64()),
+    (t.Numeric, pa.float64()),
+    (t.DateTime, pa.timestamp("us")),
+    (t.Date, pa.date32()),
+    (t.Time, pa.time64("us")),
+    (t.Interval, pa.duration("us")),
+    (t.Enum, pa.string()),
+    (t.String, pa.string()),
+]
+
+
+def _arrow_type(column_type: t.TypeEngine) -> pa.DataType:
+    if isinstance(column_type, t.ARRAY):
+        return pa.list_(_arrow_type(column_type.item_type))
+    for sql_type, arrow_type in TYPES:
+        if isinstance(column_type, sql_type):
+            return arrow_type
+    return pa.string()  # NOTE: JSON and anything unknown are stored as their JSON text
+
+
+def schema(table: Table | type[DeclarativeBase]) -> pa.Schema:
+    """The Arrow schema of `table`, one field per column, named as the column."""
+    table = raw._table(table)
+    return pa.schema([pa.field(c.name, _arrow_type(c.type), nullable=c.nullable) for c in table.columns])
+
+
+def _json(value: Any) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _converters(table: Table) -> dict[str, Any]:
+    converters = {}
+    for c in table.columns:
+        if isinstance(c.type, t.Enum):
+            converters[c.name] = lambda value: value.name if isinstance(value, Enum) else value
+        elif pa.types.is_string(_arrow_type(c.type)) and not isinstance(c.type, t.String):
+            converters[c.name] = _json
+    return converters
+
+
+def batch(rows: Sequence[Mapping[str, Any]], table: Table | type[DeclarativeBase]) -> pa.RecordBatch:
+    """Rows keyed by column name as an Arrow record batch of `table`'s schema."""
+    table = raw._table(table)
+    converters = _converters(table)
+    columns = {}
+    for c in table.columns:
+        values = [row[c.name] for row in rows]
+        if (convert := converters.get(c.name)) is not None:
+            values = [convert(value) for value in values]
+        columns[c.name] = values
+    return pa.RecordBatch.from_pydict(columns, schema=schema(table))
+
+
+class Summary:
+    """Rows and files written by an export."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+        self.files: list[Path] = []
+
+    def __repr__(self) -> str:
+        return f"<Summary({self.rows} rows, {len(self.files)} files in {self.path})>"
+
+
+async def write(
+    batches: AsyncIterable[Sequence[Mapping[str, Any]]],
+    table: Table | type[DeclarativeBase],
+    path: Path,
+    *,
+    partition_by: str | None = None,
+) -> Summary:
+    """Write batches of rows as Parquet under `path`, one Hive partition (`month=YYYY-MM`) per month of `partition_by`.
+
+    Rows must arrive sorted by `partition_by`, so that only one file is open, and only one batch held, at a time.
+
+    Args:
+        batches: Lists of rows keyed by column name
+        table: The table the rows come from
+        path: Directory of the dataset. Partitions already in it are overwritten
+        partition_by: A datetime column to partition on. Everything goes to a single file if None
+    """
+    path = Path(path)
+    summary = Summary(path)
+    arrow_schema = schema(table)
+    writer: pq.ParquetWriter | None = None
+    current = None
+    try:
+        async for rows in batches:
+            record_batch = batch(rows, table)
+            for key, start, length in _runs(rows, partition_by):
+                if writer is None or key != current:
+                    if writer is not None:
+                        writer.close()
+                    fp = path / f"{PARTITION}={key}" / FILE_NAME if partition_by else path / FILE_NAME
+                    fp.parent.mkdir(parents=True, exist_ok=True)
+                    writer, current = pq.ParquetWriter(fp, arrow_schema), key
+                    summary.files.append(fp)
+                writer.write_batch(record_batch.slice(start, length))
+            summary.rows += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return summary
+
+
+def _runs(rows: Sequence[Mapping[str, Any]], partition_by: str | None) -> Iterator[tuple[str | None, int, int]]:
+    """(partition, offset, length) of each run of consecutive rows sharing a partition."""
+    if partition_by is None:
+        yield None, 0, len(rows)
+        return
+    start, key = 0, None
+    for i, row in enumerate(rows):
+        value = row[partition_by]
+        row_key = NULL_PARTITION if value is None else value.strftime(PARTITION_FORMAT)
+        if row_key != key:
+            if i > start:
+                yield key, start, i - start
+            start, key = i, row_key
+    if len(rows) > start:
+        yield key, start, len(rows) - start
+
+
+def read(
+    path: Path,
+    table: Table | type[DeclarativeBase],
+    *,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[tuple[list[str], Iterator[tuple]]]:
+    """Read a dataset written by `write` in batches of at most `batch_size` rows.
+
+    Yields (columns, records) pairs ready for `raw.copy_upsert`. Only columns of `table` are read, so the partition
+    column is dropped.
+    """
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    columns = [c.name for c in raw._table(table).columns if c.name in dataset.schema.names]
+    for record_batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        if record_batch.num_rows:
+            yield columns, zip(*(record_batch.column(c).to_pylist() for c in columns))
+
+
+async def export(
+    session: AsyncSession,
+    table: Table | type[DeclarativeBase],
+    path: Path,
+    *filters: SelectFilter,
+    partition_by: str | None = "timestamp",
+    batch_size: int = BATCH_SIZE,
+) -> Summary:
+    """Stream the rows of `table` matching `filters` into a partitioned Parquet dataset under `path`.
+
+    Memory is bounded by `batch_size`, whatever the size of the table.
+    """
+    if partition_by is not None and partition_by not in raw._table(table).c:
+        partition_by = None
+    batches = raw.fetch_batches(session, table, *filters, size=batch_size, mappings=True, order_by=partition_by)
+    return await write(batches, table, path, partition_by=partition_by)
+
+
+async def load(
+    session: AsyncSession,
+    table: Table | type[DeclarativeBase],
+    path: Path,
+    *,
+    batch_size: int = BATCH_SIZE,
+    do_update: bool = True,
+) -> int:
+    """Upsert a Parquet dataset into `table` through COPY, a batch at a time. Returns the number of rows loaded."""
+    rows = 0
+    for columns, records in read(path, table, batch_size=batch_size):
+        records = list(records)
+        await raw.copy_upsert(session, table, columns=columns, records=records, do_update=do_update, _commit=False)
+        rows += len(records)
+    await session.commit()
+    return rows
@@ -0,0 +1,233 @@
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from logging import Logger
+
+from sqlalchemy import MetaData, Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+PARTITIONS_AHEAD = 3
+PARTITION_SUFFIX = "_p"
+DEFAULT_SUFFIX = "_default"
+MONTH_FORMAT = "%Y%m"
+
+
+def partition_by(table: Table) -> str | None:
+    """The column a table opts into monthly range partitioning on, via `info={"partition_by": ...}`."""
+    return table.info.get("partition_by")
+
+
+def tables(md: MetaData) -> list[Table]:
+    return [table for table in md.sorted_tables if partition_by(table)]
+
+
+def declare(md: MetaData) -> None:
+    """Have `create_all` create the opted-in tables of `md` as range-partitioned.
+
+    Existing tables are left as they are.
+    """
+    for table in tables(md):
+        table.dialect_kwargs["postgresql_partition_by"] = f"RANGE ({partition_by(table)})"
+
+
+def month(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def shift(value: date, n: int) -> date:
+    """The first day of the month `n` months after that of `value`."""
+    index = value.year * 12 + value.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def next_month(value: date) -> date:
+    return shift(value, 1)
+
+
+def months(start: date, end: date) -> Iterator[date]:
+    """First days of the months from `start` through `end`, inclusive."""
+    current, end = month(start), month(end)
+    while current <= end:
+        yield current
+        current = next_month(current)
+
+
+def name(table: Table, value: date) -> str:
+    return f"{table.name}{PARTITION_SUFFIX}{value.strftime(MONTH_FORMAT)}"
+
+
+def parse(table: Table, partition: str) -> date | None:
+    """The month a partition of `table` covers, or None if it is not one of its monthly partitions."""
+    prefix = f"{table.name}{PARTITION_SUFFIX}"
+    if not partition.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(partition.removeprefix(prefix), MONTH_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def _qualified(table: Table, relation: str) -> str:
+    return f'"{table.schema}"."{relation}"' if table.schema else f'"{relation}"'
+
+
+def create_statement(table: Table, value: date) -> str:
+    bounds = f"FROM ('{value.isoformat()}') TO ('{next_month(value).isoformat()}')"
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_qualified(table, name(table, value))} "
+        f"PARTITION OF {_qualified(table, table.name)} FOR VALUES {bounds}"
+    )
+
+
+def default_statement(table: Table) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_qualified(table, table.name + DEFAULT_SUFFIX)} "
+        f"PARTITION OF {_qualified(table, table.name)} DEFAULT"
+    )
+
+
+def move_statements(table: Table, value: date) -> list[str]:
+    """Statements creating the partition for `value` out of the rows the default partition holds for it.
+
+    A partition cannot be created over a range that rows of the default partition fall in, so the rows are moved into
+    a detached table first, which is then attached.
+    """
+    column = partition_by(table)
+    partition, default = _qualified(table, name(table, value)), _qualified(table, table.name + DEFAULT_SUFFIX)
+    bounds = (value.isoformat(), next_month(value).isoformat())
+    return [
+        f"CREATE TABLE {partition} (LIKE {_qualified(table, table.name)} INCLUDING DEFAULTS)",
+        f"WITH moved AS (DELETE FROM {default} WHERE \"{column}\" >= '{bounds[0]}' AND \"{column}\" < '{bounds[1]}' "
+        f"RETURNING *) INSERT INTO {partition} SELECT * FROM moved",
+        f"ALTER TABLE {_qualified(table, table.name)} ATTACH PARTITION {partition} "
+        f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')",
+    ]
+
+
+def drop_statement(table: Table, value: date) -> str:
+    return f"DROP TABLE IF EXISTS {_qualified(table, name(table, value))}"
+
+
+class Plan:
+    """Partitions to create, to carve out of the default partition, and to drop.
+
+    Args:
+        create: Months to create an empty partition for
+        move: Months to create a partition for from rows held by the default partition
+        drop: Months whose partition has fallen out of retention
+    """
+
+    def __init__(self, create: list[date], move: list[date], drop: list[date]):
+        self.create = create
+        self.move = move
+        self.drop = drop
+
+    def __repr__(self) -> str:
+        return f"<Plan(create={len(self.create)}, move={len(self.move)}, drop={len(self.drop)})>"
+
+    def __bool__(self) -> bool:
+        return bool(self.create or self.move or self.drop)
+
+    def summary(self) -> dict[str, list[str]]:
+        steps = {"create": self.create, "move": self.move, "drop": self.drop}
+        return {key: [value.strftime(MONTH_FORMAT) for value in values] for key, values in steps.items()}
+
+
+def plan(
+    existing: Iterable[date],
+    defaulted: Iterable[date],
+    today: date,
+    *,
+    ahead: int = PARTITIONS_AHEAD,
+    retention: int | None = None,
+) -> Plan:
+    """Decide which monthly partitions to create, move and drop.
+
+    Args:
+        existing: Months that already have a partition
+        defaulted: Months the default partition holds rows for
+        today: The current date
+        ahead: Months past the current one to create partitions for
+        retention: Months of history to keep, counting the current one. Older partitions are dropped. Kept forever
+            if None
+
+    Raises:
+        ValueError: If `retention` is less than a month
+    """
+    if retention is not None and retention < 1:
+        raise ValueError(f"Retention must be at least a month, got {retention}")
+    existing, current = set(existing), month(today)
+    wanted = list(months(current, shift(current, ahead)))
+    move = sorted(set(defaulted) - existing)
+    create = [value for value in wanted if value not in existing and value not in move]
+    drop = []
+    if retention is not None:
+        cutoff = shift(current, 1 - retention)
+        drop = sorted(value for value in existing if value < cutoff)
+    return Plan(create, move, drop)
+
+
+async def is_partitioned(conn: AsyncConnection, table: Table) -> bool:
+    query = text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema AND c.relname = :name"
+    )
+    result = await conn.execute(query, {"schema": table.schema or "public", "name": table.name})
+    return result.first() is not None
+
+
+async def partitions(conn: AsyncConnection, table: Table) -> list[date]:
+    """Months that have a partition of `table`."""
+    query = text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent JOIN pg_namespace n ON n.oid = p.relnamespace "
+        "WHERE n.nspname = :schema AND p.relname = :name"
+    )
+    result = await conn.execute(query, {"schema": table.schema or "public", "name": table.name})
+    return sorted(value for (relname,) in result.all() if (value := parse(table, relname)) is not None)
+
+
+async def defaulted(conn: AsyncConnection, table: Table) -> list[date]:
+    """Months the default partition of `table` holds rows for."""
+    column = partition_by(table)
+    query = text(
+        f"SELECT DISTINCT date_trunc('month', \"{column}\")::date FROM {_qualified(table, table.name + DEFAULT_SUFFIX)}"
+    )
+    result = await conn.execute(query)
+    return sorted(value for (value,) in result.all() if value is not None)
+
+
+async def maintain(
+    conn: AsyncConnection,
+    table: Table,
+    *,
+    ahead: int = PARTITIONS_AHEAD,
+    retention: int | None = None,
+    today: date | None = None,
+    logger: Logger | None = None,
+) -> Plan | None:
+    """Bring the monthly partitions of `table` up to date, and make sure its indexes exist.
+
+    Creates the default partition and the partitions for the next `ahead` months, moves rows the default partition
+    caught into partitions of their own, and drops partitions older than `retention` months. Returns None if `table`
+    is not partitioned, e.g. because it was created before partitioning was turned on.
+    """
+    if not await is_partitioned(conn, table):
+        if logger:
+            logger.warning(f"{table.fullname} is not partitioned; recreate it with partitioning turned on")
+        return None
+    await conn.execute(text(default_statement(table)))
+    today = today or date.today()
+    steps = plan(await partitions(conn, table), await defaulted(conn, table), today, ahead=ahead, retention=retention)
+    for value in steps.move:
+        for statement in move_statements(table, value):
+            await conn.execute(text(statement))
+    for value in steps.create:
+        await conn.execute(text(create_statement(table, value)))
+    for value in steps.drop:
+        await conn.execute(text(drop_statement(table, value)))
+    for index in table.indexes:
+        await conn.execute(CreateIndex(index, if_not_exists=True))
+    if logger and steps:
+        logger.info(f"Partitions of {table.fullname}: {steps.summary()}")
+    return steps
@@ -1,14 +1,21 @@
-from collections.abc import AsyncGenerator
+import json
+from collections.abc import AsyncGenerator, Iterable, Sequence
 from typing import Any
 
-from sqlalchemy import MetaData, Table
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import MetaData, Table, column, func, literal_column, table as table_clause, text
+from sqlalchemy import types as t
+from sqlalchemy.dialects.postgresql import distinct_on, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, declarative_base
 from sqlalchemy.sql import select
 
+from src.util import dt, ident
+
 from .common import SelectFilter, filter_select
 
+STAGING_PREFIX = "_staging"
+YIELD_PER = 1000
+
 
 def metadata(provider_name: str) -> MetaData:
     return MetaData(schema=f"raw_{provider_name}")
@@ -18,16 +25,138 @@ def base(provider_name: str) -> DeclarativeBase:
     return declarative_base(metadata=metadata(provider_name))
 
 
+def _table(table: Table | type[DeclarativeBase]) -> Table:
+    return getattr(table, "__table__", table)
+
+
+def _index_elements(table: Table) -> list[str]:
+    return [c.name for c in table.primary_key.columns] or [c.name for c in table.columns]
+
+
+def _coerce(column_type: t.TypeEngine, value: Any) -> Any:
+    # NOTE: COPY bypasses SQLAlchemy bind processing, so JSON and ISO timestamps have to be converted by hand
+    if value is None:
+        return value
+    if isinstance(column_type, t.JSON):
+        return json.dumps(value)
+    if isinstance(column_type, t.DateTime) and isinstance(value, str):
+        return dt.parse_iso(value)
+    return value
+
+
+def _records(table: Table, columns: Sequence[str], data: Iterable[dict[str, Any]]) -> list[tuple]:
+    types = [table.columns[c].type for c in columns]
+    return [tuple(_coerce(type_, row.get(c)) for c, type_ in zip(columns, types)) for row in data]
+
+
+def merge_statement(table: Table, staging: str, columns: Sequence[str], *, do_update: bool = True):
+    """Build the `INSERT ... SELECT ... ON CONFLICT` statement merging a staging table into `table`.
+
+    Only the last staged row of each key is merged, as a single statement cannot touch a row twice. Like `insert`,
+    a NULL never overwrites a value already stored.
+    """
+    staged = table_clause(staging, *[column(c) for c in columns])
+    index_elements = _index_elements(table)
+    source = select(*staged.c)
+    if key := [staged.c[c] for c in index_elements if c in columns]:
+        # NOTE: COPY fills the fresh staging table in order, so the highest ctid of a key is the row copied last
+        source = source.ext(distinct_on(*key)).order_by(*key, literal_column("ctid").desc())
+    query = pg_insert(table).from_select(list(columns), source)
+    set_ = {c: func.coalesce(query.excluded[c], table.c[c]) for c in columns if c not in index_elements}
+    if not do_update or not set_:
+        return query.on_conflict_do_nothing(index_elements=index_elements)
+    return query.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+
+async def copy_upsert(
+    session: AsyncSession,
+    table: Table,
+    *,
+    columns: Sequence[str],
+    records: Iterable[tuple],
+    do_update: bool = True,
+    _commit: bool = True,
+) -> None:
+    """Stream `records` into a temporary staging table with COPY, then merge them into `table` in one statement.
+
+    The staging table is dropped when the transaction commits.
+
+    Args:
+        session: The session to execute in
+        table: The target table
+        columns: Column names, in the order of each record
+        records: Row tuples, already converted to driver types
+        do_update: Update conflicting rows in place rather than skipping them
+        _commit: Commit once the merge has been executed
+    """
+    table = _table(table)
+    conn = await session.connection()
+    staging = f"{STAGING_PREFIX}_{table.name}_{ident.uuid().hex[:8]}"
+    target = conn.dialect.identifier_preparer.format_table(table)
+    await conn.execute(
+        text(f'CREATE TEMPORARY TABLE "{staging}" (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP')
+    )
+    raw_conn = await conn.get_raw_connection()
+    await raw_conn.driver_connection.copy_records_to_table(staging, records=records, columns=list(columns))
+    await conn.execute(merge_statement(table, staging, columns, do_update=do_update))
+    if _commit:
+        await session.commit()
+
+
 async def fetch(
     session: AsyncSession,
     table: Table,
     *filters: SelectFilter,
+    yield_per: int = YIELD_PER,
 ) -> AsyncGenerator[dict, None]:
+    """Stream rows through a server-side cursor, buffering at most `yield_per` rows at a time."""
     query = select(table)
     query = filter_select(query, table, *filters)
-    result = await session.execute(query)
-    for row in result.scalars().all():
-        yield row
+    result = await session.stream(query.execution_options(yield_per=yield_per))
+    try:
+        async for row in result.scalars():
+            yield row
+    finally:
+        # NOTE: a consumer that stops early would otherwise leave the server-side cursor open
+        await result.close()
+
+
+async def fetch_batches(
+    session: AsyncSession,
+    table: Table,
+    *filters: SelectFilter,
+    size: int = YIELD_PER,
+    mappings: bool = False,
+    order_by: str | None = None,
+) -> AsyncGenerator[list, None]:
+    """Stream rows through a server-side cursor in lists of at most `size` rows.
+
+    Args:
+        session: The session to execute in
+        table: The table to read
+        filters: Filters narrowing down the rows
+        size: Rows per batch, and per round trip to the server
+        mappings: Yield rows as mappings of column name -> value rather than as scalars
+        order_by: Column to sort the rows by
+    """
+    query = select(*_table(table).columns) if mappings else select(table)
+    query = filter_select(query, table, *filters)
+    if order_by is not None:
+        query = query.order_by(_table(table).c[order_by])
+    result = await session.stream(query.execution_options(yield_per=size))
+    rows = result.mappings() if mappings else result.scalars()
+    try:
+        async for batch in rows.partitions(size):
+            yield batch
+    finally:
+        await result.close()
+
+
+def mirror(table: Table | type[DeclarativeBase], provider_name: str) -> Table:
+    """The copy of `table` in the provider's raw schema, with the same columns and primary key."""
+    md = metadata(provider_name)
+    source = _table(table)
+    return Table(source.name, md, *(c._copy() for c in source.columns))
 
 
 async def fetch_one(
@@ -50,13 +179,15 @@ async def insert(
     **kwargs: dict[str, Any],
 ) -> None:
     query = pg_insert(table)
-    if do_update:
-        index_elements = [c.name for c in table.columns]
-        set_ = {k: v for k, v in kwargs.items() if v is not None}
+    index_elements = _index_elements(_table(table))
+    set_ = {k: v for k, v in kwargs.items() if v is not None and k not in index_elements}
+    if do_update and set_:
         query = query.on_conflict_do_update(
             index_elements=index_elements,
             set_=set_,
         )
+    else:
+        query = query.on_conflict_do_nothing(index_elements=index_elements)
     query = query.values(**kwargs)
     await session.execute(query)
     if _commit:
@@ -69,7 +200,33 @@ async def insert_many(
     *,
     do_update: bool = True,
     data: list[dict[str, Any]],
+    bulk: bool = False,
 ) -> None:
+    """Upsert many rows.
+
+    Args:
+        session: The session to execute in
+        table: The target table
+        do_update: Update conflicting rows in place rather than skipping them
+        data: Rows to insert, keyed by column name
+        bulk: COPY the rows through a staging table instead of issuing one statement per row. Rows are grouped
+            by their keys, so columns missing from a row fall back to their server defaults
+    """
+    if not bulk:
+        for row in data:
+            await insert(session, table, do_update=do_update, _commit=False, **row)
+        await session.commit()
+        return
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
     for row in data:
-        await insert(session, table, do_update=do_update, _commit=False, **row)
+        groups.setdefault(tuple(row), []).append(row)
+    for columns, rows in groups.items():
+        await copy_upsert(
+            session,
+            table,
+            columns=columns,
+            records=_records(_table(table), columns, rows),
+            do_update=do_update,
+            _commit=False,
+        )
     await session.commit()
@@ -0,0 +1,236 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from functools import cache
+from logging import Logger
+from time import monotonic
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Table, inspect
+from sqlalchemy import types as t
+from sqlalchemy.orm import DeclarativeBase
+
+from src.util import dt
+
+from ..response import Columnar
+from ..symbols import Timestamp
+
+BATCH_SIZE = 5000
+MAX_PENDING = 50_000
+FLUSH_INTERVAL = 1.0
+MAX_RETRY_DELAY = 60.0
+ALIASES = {"symbol": "identifier"}  # NOTE: column name -> response key it falls back to
+
+Flush = Callable[[Table | type[DeclarativeBase], list[dict[str, Any]]], Awaitable[None]]
+
+
+@cache
+def _columns(table: Table | type[DeclarativeBase]) -> dict[str, str]:
+    """Map of response key -> column name, accepting both attribute keys (`open_`) and column names (`open`)."""
+    if isinstance(table, Table):
+        columns = {c.key: c.name for c in table.columns}
+    else:
+        columns = {attr.key: attr.columns[0].name for attr in inspect(table).column_attrs}
+    columns.update({name: name for name in list(columns.values())})
+    return columns
+
+
+def row(data: dict[str, Any], table: Table | type[DeclarativeBase]) -> dict[str, Any]:
+    """Pick the columns of `table` out of a response's json."""
+    out = {name: data[key] for key, name in _columns(table).items() if key in data}
+    for name, key in ALIASES.items():
+        if name not in out and name in _columns(table) and key in data:
+            out[name] = data[key]
+    return out
+
+
+@cache
+def _datetime_columns(table: Table | type[DeclarativeBase]) -> tuple[str, ...]:
+    return tuple(c.name for c in getattr(table, "__table__", table).columns if isinstance(c.type, t.DateTime))
+
+
+def datetimes(rows: list[dict[str, Any]], table: Table | type[DeclarativeBase]) -> list[dict[str, Any]]:
+    """Parse, in place, the ISO strings in the datetime columns of `rows`, a batch of equal-length values at a time.
+
+    Records carry their timestamp as a symbol, e.g. `^20240101T000000` or, for a date, `^20240101`, which the
+    database would not accept.
+
+    Raises:
+        ValueError: If a value is not a datetime or date in any ISO format, e.g. a bare time of day
+    """
+    for name in _datetime_columns(table):
+        batches: dict[int, list[int]] = {}
+        for i, data in enumerate(rows):
+            if isinstance(value := data.get(name), str):
+                batches.setdefault(len(value), []).append(i)
+        for batch in batches.values():
+            values = np.strings.lstrip(np.array([rows[i][name] for i in batch]), Timestamp.discriminator)
+            for i, value in zip(batch, dt.iso_to_datetime64(values, unit="us").tolist()):
+                rows[i][name] = value
+    return rows
+
+
+def _nulls(records: Iterator[tuple], positions: list[int]) -> Iterator[tuple]:
+    for record in records:
+        record = list(record)
+        for i in positions:
+            if record[i] != record[i]:
+                record[i] = None
+        yield tuple(record)
+
+
+def columnar(data: Columnar, table: Table | type[DeclarativeBase]) -> tuple[list[str], Iterator[tuple]]:
+    """Column names of `table` and row tuples for a columnar response, ready for `raw.copy_upsert`.
+
+    Float columns mark missing values with NaN; they are written as NULL, as the per-record path writes them.
+    """
+    keys = {name: key for key, name in _columns(table).items() if key in data.columns}
+    for name, key in ALIASES.items():
+        if name not in keys and name in _columns(table) and getattr(data, key, None) is not None:
+            keys[name] = key
+    arrays = data.arrays
+    positions = [
+        i
+        for i, key in enumerate(keys.values())
+        if key in arrays and np.issubdtype(arrays[key].dtype, np.floating) and np.isnan(arrays[key]).any()
+    ]
+    records = data.records(list(keys.values()))
+    return list(keys), _nulls(records, positions) if positions else records
+
+
+class BatchWriter:
+    """Buffers rows per table and writes them in bulk.
+
+    A table's buffer is flushed once it holds `batch_size` rows, or once its oldest row is `interval` seconds old.
+    When `max_pending` rows are buffered or being written, `put` blocks until space frees up, which in turn stalls the
+    router generator feeding it. Rows whose write fails go back to the front of their buffer, and flushes back off
+    exponentially: until the backoff expires, neither `put` nor the background flush write, so `put` only raises once
+    `max_pending` rows pile up. Nothing is dropped; `close` raises if its final flush fails.
+
+    Args:
+        flush: Coroutine function writing a list of rows to a table
+        logger: Logger for errors raised by background and inline flushes
+        batch_size: Rows per table that trigger a flush
+        max_pending: Rows buffered or in flight before `put` blocks
+        interval: Maximum age, in seconds, of a buffered row
+        max_retry_delay: Longest wait, in seconds, before retrying a failed write
+    """
+
+    def __init__(
+        self,
+        flush: Flush,
+        *,
+        logger: Logger | None = None,
+        batch_size: int = BATCH_SIZE,
+        max_pending: int = MAX_PENDING,
+        interval: float = FLUSH_INTERVAL,
+        max_retry_delay: float = MAX_RETRY_DELAY,
+    ):
+        self._flush = flush
+        self.logger = logger
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.interval = interval
+        self.max_retry_delay = max_retry_delay
+        self._buffers: dict[Table, list[dict[str, Any]]] = {}
+        self._oldest: dict[Table, float] = {}
+        self._pending = 0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._delay = 0.0
+        self._retry_at = 0.0
+
+    def __repr__(self) -> str:
+        return f"<BatchWriter({self._pending} pending, {len(self._buffers)} tables)>"
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def backing_off(self) -> bool:
+        """Whether a write failed recently enough that flushes are on hold."""
+        return monotonic() < self._retry_at
+
+    def start(self) -> "BatchWriter":
+        if self._task is None:
+            self._task = asyncio.create_task(self._tick())
+        return self
+
+    async def close(self) -> None:
+        """Stop the background flush and write out everything still buffered.
+
+        Raises:
+            Exception: The first error of the final flush. The rows that failed are still buffered
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def put(self, table: Table | type[DeclarativeBase], row: dict[str, Any]) -> None:
+        while self._pending >= self.max_pending:
+            await self.flush()
+        buffer = self._buffers.setdefault(table, [])
+        if not buffer:
+            self._oldest[table] = monotonic()
+        buffer.append(row)
+        self._pending += 1
+        if len(buffer) >= self.batch_size and not self.backing_off:
+            try:
+                await self.flush(table)
+            except Exception as e:
+                # NOTE: the rows stay buffered; `put` raises only once they reach `max_pending`
+                if self.logger:
+                    self.logger.error(f"Error flushing {len(buffer)} rows, retrying in {self._delay}s: {e}")
+
+    async def flush(self, *tables: Table | type[DeclarativeBase]) -> None:
+        """Write out the buffers of `tables`, or of every table if none are given.
+
+        Every table is attempted even if one fails. A failed table's rows go back to the front of its buffer.
+
+        Raises:
+            Exception: The first error raised writing a table
+        """
+        error = None
+        async with self._lock:
+            for table in tables or list(self._buffers):
+                rows = self._buffers.pop(table, None)
+                oldest = self._oldest.pop(table, None)
+                if not rows:
+                    continue
+                try:
+                    await self._flush(table, rows)
+                except Exception as e:
+                    # NOTE: rows put while this write was in flight stay behind the ones being retried
+                    self._buffers[table] = rows + self._buffers.get(table, [])
+                    self._oldest[table] = oldest
+                    error = error or e
+                else:
+                    self._pending -= len(rows)
+            if error is None:
+                self._delay = self._retry_at = 0.0
+            else:
+                self._delay = min(2 * self._delay or self.interval, self.max_retry_delay)
+                self._retry_at = monotonic() + self._delay
+        if error is not None:
+            raise error
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.backing_off:
+                continue
+            now = monotonic()
+            stale = [table for table, t in self._oldest.items() if now - t >= self.interval]
+            if not stale:
+                continue
+            try:
+                await self.flush(*stale)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error flushing {len(stale)} tables, retrying in {self._delay}s: {e}")
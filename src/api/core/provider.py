@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from importlib import import_module
 from logging import Logger
 from pathlib import Path
@@ -8,13 +9,18 @@ from pydantic import BaseModel
 from sqlalchemy import MetaData
 from sqlalchemy.orm import DeclarativeMeta
 
+from . import registry
 from .deps.dependency import Dependencies
+from .limiter import Limiter
 from .router import Router
 
+LAZY_MODULES = ("models_generated",)
+
 
 class Provider:
     dependencies: Dependencies
     metadata: MetaData
+    limiter: Limiter
 
     def __repr__(self):
         return f"<Provider {self.name}>"
@@ -70,22 +76,23 @@ class Provider:
         self._routers = {}
         self._models = {}
         self._tables = {}
+        self.limiter = Limiter(getattr(routers, "RATE_LIMIT", None))
         if routers:
             for fname, fn in routers.__dict__.items():
                 if hasattr(fn, "info") and hasattr(fn, "metadata"):
                     logger.info(f"Found router {fname}")
                     self._routers[fname] = fn
+                    if hasattr(fn, "limiter"):
+                        fn.limiter.parent = self.limiter
                     if "requires" in fn.info:
                         logger.info(f"Adding dependencies for {fname}")
                         self.dependencies.update(fn.info["requires"])
         if models:
             if isinstance(models, ModuleType):
                 models = [models]
-            for mod in models:
-                for name, obj in mod.__dict__.items():
-                    if isinstance(obj, BaseModel):
-                        logger.info(f"Found model {name}")
-                        self._models[f"{mod.__name__}.{name}"] = obj  # NOTE addition of module name to avoid collisions
+            # NOTE keys include the module name to avoid collisions; lazy modules resolve models on lookup
+            self._models = registry.ModelRegistry(*models)
+            logger.info(f"Found {len(self._models)} models")
         if tables:
             for name, obj in tables.__dict__.items():
                 if isinstance(obj, DeclarativeMeta):
@@ -101,7 +108,7 @@ class Provider:
         return self._routers
 
     @property
-    def models(self) -> dict[str, BaseModel]:
+    def models(self) -> Mapping[str, type[BaseModel]]:
         return self._models
 
     @property
@@ -113,10 +120,16 @@ class ProviderDirectoryMixin:
     providers: ClassVar[dict[str, Provider]] = {}
 
     @classmethod
-    def load_provider(cls, provider_fp: Path, logger: Logger):
+    def load_provider(cls, provider_fp: Path, logger: Logger, *, lazy: bool = True):
         provider_metadata = None
         provider_routers_mod = None
         provider_models_mods = []
+        if lazy:
+            # NOTE: installed before anything else is imported, so that sibling imports pick up the lazy module too
+            for stem in LAZY_MODULES:
+                if (fp := provider_fp / f"{stem}.py").exists():
+                    logger.info(f"Indexing provider {provider_fp.stem} {stem}")
+                    registry.install(".".join(["src", "ext", provider_fp.stem, stem]), fp)
         for fp in provider_fp.glob("*.py"):
             if fp.stem == "routers":
                 logger.info(f"Scanning provider {fp.stem} routers")
@@ -147,12 +160,22 @@ class ProviderDirectoryMixin:
     def routers(cls, provider: str) -> dict[str, Router]:
         return cls.providers[provider].routers
 
+    @classmethod
+    def limits(cls, provider: str) -> dict[str, dict[str, float | int]]:
+        """Current wait time and queue depth of each router of a provider."""
+        return {name: router.limiter.stats for name, router in cls.providers[provider].routers.items()}
+
+    @classmethod
+    def metrics(cls, provider: str) -> dict[str, dict]:
+        """Request counts and p50/p95/p99 latencies of each router of a provider, over its recent history."""
+        return {name: router.metadata.history.summary() for name, router in cls.providers[provider].routers.items()}
+
     @classmethod
     def dependencies(cls, provider: str) -> Dependencies:
         return cls.providers[provider].dependencies
 
     @classmethod
-    def models(cls, provider: str) -> dict[str, BaseModel]:
+    def models(cls, provider: str) -> Mapping[str, type[BaseModel]]:
         return cls.providers[provider].models
 
     @classmethod
@@ -0,0 +1,238 @@
+import __future__
+import ast
+import json
+import sys
+from collections.abc import Iterator, Mapping
+from importlib import import_module
+from pathlib import Path
+from types import ModuleType
+
+from pydantic import BaseModel
+
+INDEX_VERSION = 2
+
+
+def _cache_path(fp: Path) -> Path:
+    return fp.parent / "__pycache__" / f"{fp.stem}.index.json"
+
+
+def _names(node: ast.AST) -> set[str]:
+    return {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+
+
+def _span(node: ast.stmt) -> list[int]:
+    start = min([node.lineno, *[d.lineno for d in getattr(node, "decorator_list", [])]])
+    return [start, node.end_lineno]
+
+
+class ModelIndex:
+    """Index of the top-level classes of a module, built from its source without importing it.
+
+    Args:
+        header: Line spans of the module's import statements
+        classes: Class name -> {"span": line span, "bases": base class names, "deps": referenced class names,
+            "post": trailing statement spans}
+        flags: Compiler flags from the module's `__future__` imports
+    """
+
+    def __init__(self, header: list[list[int]], classes: dict[str, dict], flags: int = 0):
+        self.header = header
+        self.classes = classes
+        self.flags = flags
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.classes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.classes)
+
+    def __len__(self) -> int:
+        return len(self.classes)
+
+    @staticmethod
+    def _stamp(fp: Path) -> dict:
+        stat = fp.stat()
+        return {"version": INDEX_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    @classmethod
+    def build(cls, fp: Path) -> "ModelIndex":
+        tree = ast.parse(fp.read_text(), filename=str(fp))
+        defined = {node.name for node in tree.body if isinstance(node, ast.ClassDef)}
+        header, classes, flags = [], {}, 0
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                deps = (_names(node) & defined) - {node.name}
+                bases = set().union(*[_names(base) for base in [*node.bases, *node.keywords]]) & deps
+                classes[node.name] = {"span": _span(node), "bases": sorted(bases), "deps": sorted(deps), "post": []}
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+                    for alias in node.names:
+                        flags |= getattr(__future__, alias.name).compiler_flag
+                header.append(_span(node))
+            elif owners := [name for name in _names(node) & defined if name in classes]:
+                # NOTE: trailing statements (e.g. `Model.model_rebuild()`) run once their last-defined owner resolves
+                owner = max(owners, key=lambda name: classes[name]["span"][0])
+                classes[owner]["post"].append(_span(node))
+            else:
+                header.append(_span(node))
+        return cls(header, classes, flags)
+
+    @classmethod
+    def load(cls, fp: Path) -> "ModelIndex":
+        """Load the index for `fp` from its on-disk cache, rebuilding the cache if the source has changed."""
+        cache_fp = _cache_path(fp)
+        stamp = cls._stamp(fp)
+        if cache_fp.exists():
+            try:
+                cached = json.loads(cache_fp.read_text())
+                if cached["stamp"] == stamp:
+                    return cls(cached["header"], cached["classes"], cached["flags"])
+            except (ValueError, KeyError):
+                pass
+        index = cls.build(fp)
+        try:
+            cache_fp.parent.mkdir(exist_ok=True)
+            cache_fp.write_text(
+                json.dumps({"stamp": stamp, "header": index.header, "classes": index.classes, "flags": index.flags})
+            )
+        except OSError:
+            pass
+        return index
+
+
+class LazyModule(ModuleType):
+    """A module whose top-level classes are compiled one at a time, on first attribute access.
+
+    Accessing a class resolves it together with the classes it references, so only the slice of the module that is
+    actually used is ever built.
+    """
+
+    def __init__(self, name: str, fp: Path, index: ModelIndex):
+        super().__init__(name)
+        self.__file__ = str(fp)
+        self.__package__ = name.rpartition(".")[0]
+        self.__dict__["__lazy_index__"] = index
+        self.__dict__["__lazy_lines__"] = fp.read_text().splitlines(keepends=True)
+        for span in index.header:
+            self.__lazy_exec__(span)
+
+    def __lazy_exec__(self, span: list[int]) -> None:
+        start, end = span
+        lines = self.__dict__["__lazy_lines__"]
+        # NOTE: pad with blank lines so tracebacks point at the original source lines
+        source = "\n" * (start - 1) + "".join(lines[start - 1 : end])
+        code = compile(source, self.__file__, "exec", flags=self.__lazy_index__.flags, dont_inherit=True)
+        exec(code, self.__dict__)
+
+    def __getattr__(self, name: str):
+        index = self.__dict__["__lazy_index__"]
+        if name not in index:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        resolve(self, name)
+        return self.__dict__[name]
+
+    def __dir__(self) -> list[str]:
+        return sorted(set(self.__dict__) | set(self.__dict__["__lazy_index__"]))
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self.__name__!r} from {self.__file__!r}>"
+
+
+def _bases_first(order: list[str], index: ModelIndex) -> list[str]:
+    """Reorder `order` so that every class comes after those of its bases in it, otherwise keeping its order.
+
+    A reference cycle can reach a subclass before its base, e.g. a base annotated with its own subclass. Annotations
+    are deferred, but a base has to exist before its subclass executes.
+    """
+    members, placed, out = set(order), set(), []
+    for name in order:
+        chain = [name]
+        while chain:
+            current = chain[-1]
+            bases = index.classes[current]["bases"]
+            pending = [base for base in bases if base in members and base not in placed and base not in chain]
+            if pending:
+                chain.append(pending[0])
+                continue
+            chain.pop()
+            if current not in placed:
+                placed.add(current)
+                out.append(current)
+    return out
+
+
+def resolve(module: LazyModule, name: str) -> type:
+    """Compile `name` and every class it references, dependencies first and bases before their subclasses."""
+    namespace = module.__dict__
+    index = namespace["__lazy_index__"]
+    order, visiting = [], set()
+    stack = [(name, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if current in namespace and not expanded:
+            continue
+        if expanded:
+            order.append(current)
+            continue
+        if current in visiting:
+            continue  # NOTE: cyclic references are left to pydantic's deferred rebuild
+        visiting.add(current)
+        stack.append((current, True))
+        for dep in index.classes[current]["deps"]:
+            if dep not in namespace and dep not in visiting:
+                stack.append((dep, False))
+    order = _bases_first(order, index)
+    for current in order:
+        module.__lazy_exec__(index.classes[current]["span"])
+    for current in order:
+        for span in index.classes[current]["post"]:
+            module.__lazy_exec__(span)
+    for current in order:
+        obj = namespace[current]
+        if isinstance(obj, type) and issubclass(obj, BaseModel) and not obj.__pydantic_complete__:
+            obj.model_rebuild(raise_errors=False)
+    return namespace[name]
+
+
+def names(module: ModuleType) -> list[str]:
+    """Names of the classes a module defines, without resolving them."""
+    if isinstance(module, LazyModule):
+        return list(module.__dict__["__lazy_index__"])
+    return [
+        name for name, obj in module.__dict__.items() if isinstance(obj, type) and obj.__module__ == module.__name__
+    ]
+
+
+def install(name: str, fp: Path) -> ModuleType:
+    """Register a lazy module under `name`, so that subsequent imports of it are lazy too.
+
+    Returns the already-imported module unchanged if `name` has been imported eagerly.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    module = LazyModule(name, fp, ModelIndex.load(fp))
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(import_module(parent), child, module)
+    return module
+
+
+class ModelRegistry(Mapping[str, type]):
+    """Models of a provider, keyed by `<module>.<name>`. Models of lazy modules are resolved on lookup."""
+
+    def __init__(self, *modules: ModuleType):
+        self._modules = {}
+        for module in modules:
+            for name in names(module):
+                self._modules[f"{module.__name__}.{name}"] = (module, name)
+
+    def __getitem__(self, key: str) -> type:
+        module, name = self._modules[key]
+        return getattr(module, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
@@ -12,6 +12,8 @@ RequestModel = type[BaseModel]
 
 
 class SerializableObj(Serializable):
+    __slots__ = ()
+
     @property
     def json(self) -> dict: ...
 
@@ -1,61 +1,226 @@
-from collections.abc import AsyncGenerator
-from dataclasses import dataclass, field
+import sys
+from collections import UserString
+from collections.abc import AsyncGenerator, Iterator, Sequence
+from dataclasses import FrozenInstanceError, dataclass
+from itertools import repeat
 from json import dumps
-from typing import Any
+from typing import Any, ClassVar
 from uuid import UUID
 
+import numpy as np
 from pydantic import BaseModel
 
 from .request import Request, SerializableObj
 from .symbols import Attribute, Identifier, Timestamp
 
 
-@dataclass(frozen=True)
-class Record(SerializableObj):
-    identifier: Identifier | None = None
-    timestamp: Timestamp | None = None
-    attribute: Attribute | None = None
-    _data: dict[str, Any] = field(default_factory=dict)
+def _intern(symbol: UserString | str | None) -> str | None:
+    if symbol is None:
+        return None
+    return sys.intern(symbol.data if isinstance(symbol, UserString) else symbol)
+
 
-    def __post_init__(self):
-        if self.identifier is None:
+class Record(SerializableObj):
+    """A single record, keyed by an identifier and optionally a timestamp and attribute.
+
+    Records are immutable and slotted. Symbols are kept as interned strings, and rebuilt into `Symbol`s on access.
+
+    Args:
+        identifier: What the record describes
+        timestamp: When the record applies
+        attribute: What the record measures
+        _data: The record's fields
+    """
+
+    __slots__ = ("_identifier", "_timestamp", "_attribute", "_data")
+    _fields: ClassVar[tuple[str, ...]] = __slots__  # NOTE: compared, pickled and shown in repr
+
+    def __init__(
+        self,
+        identifier: Identifier | None = None,
+        timestamp: Timestamp | None = None,
+        attribute: Attribute | None = None,
+        _data: dict[str, Any] | None = None,
+    ):
+        if identifier is None:
             raise ValueError("Identifier is required")
+        set_ = object.__setattr__
+        set_(self, "_identifier", _intern(identifier))
+        set_(self, "_timestamp", _intern(timestamp))
+        set_(self, "_attribute", _intern(attribute))
+        set_(self, "_data", {} if _data is None else _data)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    __hash__ = None  # NOTE: `_data` is a dict
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name.removeprefix('_')}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self._fields, state):
+            object.__setattr__(self, name, value)
+
+    @property
+    def identifier(self) -> Identifier:
+        return Identifier(self._identifier)
+
+    @property
+    def timestamp(self) -> Timestamp | None:
+        return None if self._timestamp is None else Timestamp(self._timestamp)
+
+    @property
+    def attribute(self) -> Attribute | None:
+        return None if self._attribute is None else Attribute(self._attribute)
+
+    def _symbols(self) -> dict[str, str]:
+        """The `.json` of each symbol set, built straight from the stored strings."""
+        record = {"identifier": Identifier.discriminator + self._identifier}
+        if self._timestamp is not None:
+            record["timestamp"] = Timestamp.discriminator + self._timestamp
+        if self._attribute is not None:
+            record["attribute"] = Attribute.discriminator + self._attribute
+        return record
 
     @property
     def json(self) -> dict:
-        record = {}
-        for attr in ["identifier", "timestamp", "attribute"]:
-            value = getattr(self, attr)
-            if value is not None:
-                record[attr] = value.json
+        record = self._symbols()
         record.update(self._data)
         return record
 
 
-@dataclass(frozen=True)
 class Object(Record):
-    model: type[BaseModel] | None = None
-
-    def __post_init__(self):
-        super().__post_init__()
-        if self.model is None:
+    """A record validated against a pydantic model. The model instance and its dump are built once, on first use.
+
+    Args:
+        model: The model `_data` is validated against
+    """
+
+    __slots__ = ("model", "_instance", "_dumped")
+    _fields: ClassVar[tuple[str, ...]] = (*Record._fields, "model")
+
+    def __init__(
+        self,
+        identifier: Identifier | None = None,
+        timestamp: Timestamp | None = None,
+        attribute: Attribute | None = None,
+        _data: dict[str, Any] | None = None,
+        model: type[BaseModel] | None = None,
+    ):
+        super().__init__(identifier, timestamp, attribute, _data)
+        if model is None:
             raise ValueError("Model is required")
+        object.__setattr__(self, "model", model)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_dumped", None)
+
+    def __setstate__(self, state: tuple) -> None:
+        super().__setstate__(state)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_dumped", None)
+
+    @property
+    def instance(self) -> BaseModel:
+        """The validated model. Validated once, on first access."""
+        if self._instance is None:
+            object.__setattr__(self, "_instance", self.model(**self._data))
+        return self._instance
 
     @property
     def json(self) -> dict:
-        model_instance = self.model(**self._data)
-        data = model_instance.model_dump(exclude_none=True)
-        for attr in ["identifier", "timestamp", "attribute"]:
-            value = getattr(self, attr)
-            if value is not None:
-                data[attr] = value.json
-        return data
+        if self._dumped is None:
+            data = self.instance.model_dump(exclude_none=True)
+            data.update(self._symbols())
+            object.__setattr__(self, "_dumped", data)
+        # NOTE: shallow copy, so callers cannot mutate the memoized dict
+        return dict(self._dumped)
 
 
-@dataclass(frozen=True)
+def _tolist(array: np.ndarray) -> list:
+    if np.issubdtype(array.dtype, np.datetime64):
+        # NOTE: microsecond precision converts to `datetime`; nanoseconds would come back as ints
+        return array.astype("datetime64[us]").tolist()
+    return array.tolist()
+
+
+class Columnar(Record):
+    """A batch of records sharing an identifier and attribute, held as equal-length NumPy arrays.
+
+    Timestamps vary per row, so they are stored as a `datetime64` column rather than in the shared `timestamp`.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        identifier: Identifier | None = None,
+        timestamp: Timestamp | None = None,
+        attribute: Attribute | None = None,
+        _data: dict[str, np.ndarray] | None = None,
+    ):
+        super().__init__(identifier, timestamp, attribute, _data)
+        if len({len(array) for array in self._data.values()}) > 1:
+            raise ValueError("Columns must be of equal length")
+
+    # NOTE: arrays do not compare to a single bool, so batches compare by identity
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __len__(self) -> int:
+        return len(next(iter(self._data.values()))) if self._data else 0
+
+    def __repr__(self) -> str:
+        return f"<Columnar({self.identifier}, {len(self)} rows, {', '.join(self._data)})>"
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(self._data)
+
+    @property
+    def arrays(self) -> dict[str, np.ndarray]:
+        return dict(self._data)
+
+    def records(self, keys: Sequence[str]) -> Iterator[tuple]:
+        """Row tuples of Python scalars, one value per key. `identifier` and `attribute` repeat on every row."""
+        columns = []
+        for key in keys:
+            if key in self._data:
+                columns.append(_tolist(self._data[key]))
+            elif key in ("identifier", "attribute") and getattr(self, f"_{key}") is not None:
+                columns.append(repeat(self._symbols()[key], len(self)))
+            else:
+                raise KeyError(key)
+        return zip(*columns)
+
+    @property
+    def json(self) -> dict:
+        record = self._symbols()
+        record.pop("timestamp", None)
+        for key, array in self._data.items():
+            if np.issubdtype(array.dtype, np.datetime64):
+                record[key] = np.datetime_as_string(array).tolist()
+            else:
+                record[key] = array.tolist()
+        return record
+
+
+@dataclass(frozen=True, slots=True)
 class Response(SerializableObj):
     request: Request
-    _data: Object | Record
+    _data: Object | Record | Columnar
 
     def __repr__(self):
         return f"<Response({self.id})>"
@@ -64,6 +229,10 @@ class Response(SerializableObj):
     def id(self) -> UUID:
         return self.request.id
 
+    @property
+    def data(self) -> Object | Record | Columnar:
+        return self._data
+
     @property
     def json(self) -> dict:
         return self._data.json
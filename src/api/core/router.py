@@ -1,29 +1,28 @@
 from collections.abc import AsyncGenerator
 from dataclasses import dataclass, field
 from functools import partial
+from inspect import signature
 from typing import Callable, TypedDict, Unpack, Protocol, TypeVar
 
 import pydantic
 from sqlalchemy import Table
 
-from src.util import dt
-
 from .deps import Dependencies
+from .history import History
+from .limiter import Limiter, RateLimit
 from .request import Request
 from .response import Response
 
-RateLimit = tuple[int, float]  # (limit, seconds)
 RouterReturnType = AsyncGenerator[Response, None]
 BoundRouterReturnType = partial[RouterReturnType]
 
 
 @dataclass(slots=True)
 class Metadata:
-    history: dict[float, Request] = field(default_factory=dict)
+    history: History = field(default_factory=History)
     rate_limit: RateLimit | None = None
-
-    def __post_init__(self):
-        self.history = {}
+    ttl: float | None = None
+    coalesce: bool = False
 
 
 class Info(TypedDict, total=False):
@@ -31,6 +30,9 @@ class Info(TypedDict, total=False):
     returns: type[pydantic.BaseModel] | None
     stores: Table | None
     requires: Dependencies | None
+    rate_limit: RateLimit | None
+    ttl: float | None
+    coalesce: bool
 
 
 RouterT = TypeVar("RouterT", bound=Callable[..., RouterReturnType])
@@ -39,6 +41,7 @@ RouterT = TypeVar("RouterT", bound=Callable[..., RouterReturnType])
 class Router(Protocol):
     info: Info
     metadata: Metadata
+    limiter: Limiter
     async def __call__(
         self,
         request: Request,
@@ -50,13 +53,31 @@ class WrappedRouter:
     def __init__(self, router: RouterT, info: Info):
         self.router = router
         self.info = info
-        self.metadata = Metadata()
+        self.metadata = Metadata(
+            rate_limit=info.get("rate_limit"), ttl=info.get("ttl"), coalesce=info.get("coalesce", False)
+        )
+        self.limiter = Limiter(self.metadata.rate_limit)
+        self.parameters = frozenset(signature(router).parameters)
 
     async def __call__(self, request: Request, **dependencies: Dependencies) -> AsyncGenerator[Response, None]:
-        now = dt.utcnow()
-        self.metadata.history[now] = request
-        async for response in self.router(request, **dependencies):
-            yield response
+        await self.limiter.acquire()
+        entry = self.metadata.history.start(request.id if request is not None else None)
+        error = None
+        if "request" in self.parameters:
+            # NOTE: routers take their dependencies first, so the request is passed by keyword
+            dependencies["request"] = request
+        if "limiter" in self.parameters:
+            # NOTE: for routers making more than one external call per request
+            dependencies["limiter"] = self.limiter
+        try:
+            async for response in self.router(**dependencies):
+                entry.record()
+                yield response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            entry.finish(error)
 
 
 def define(**info: Unpack[Info]) -> Callable[[RouterT], Router]:
@@ -71,9 +92,16 @@ def define(**info: Unpack[Info]) -> Callable[[RouterT], Router]:
         stores (Table | None):
             The database table where the data is stored.
         requires (list[protocols.Dependency] | None):
-            A list of dependencies required by the API route.
+            A list of dependencies required by the API route. A router declaring a `limiter` parameter is also passed
+            its own limiter, and must acquire it for every external call after the first.
         rate_limit (RateLimit | None):
-            The external rate limit, in (limit, seconds).
+            The external rate limit, in (limit, seconds). Enforced with a token bucket; calls over the limit wait
+            their turn rather than fail.
+        ttl (float | None):
+            Seconds for which responses may be served from the session's response cache. Not cached if None.
+        coalesce (bool):
+            Whether identical requests in flight at the same time share one call. Defaults to False; only read-only
+            routers, whose calls have no side effects, should opt in.
 
     Returns
     -------
@@ -7,15 +7,15 @@ from pydantic_core import CoreSchema, core_schema
 
 from src.util import dt
 
-ILLEGAL = {",", "(", ")"}
-MAP = dict()
-
-
-def _reserved() -> set[str]:
-    return set(MAP.keys()) | ILLEGAL
+ILLEGAL = frozenset({",", "(", ")"})
+INTERN_SIZE = 65_536
+MAP: dict[str, type["_ABCSymbol"]] = {}
+RESERVED = ILLEGAL  # NOTE: grows with every registered discriminator; rebuilt at class creation, never per symbol
 
 
 class Serializable(Protocol):
+    __slots__ = ()
+
     @property
     def json(self) -> Any: ...
 
@@ -26,7 +26,29 @@ class SerializableStr(Protocol):
 
 
 class _ABCSymbol(UserString, Serializable):
+    """A string tagged with a one-character discriminator, e.g. `$265598` for an identifier.
+
+    Symbols are built in `__new__`. Classes with `interned` set hand back one shared instance per value, for up to
+    `INTERN_SIZE` values per class, so the handful of identifiers and attributes seen on every response are only
+    validated once.
+    """
+
     discriminator: ClassVar[str] = ""
+    interned: ClassVar[bool] = False
+    _pool: ClassVar[dict[str, "_ABCSymbol"]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        global RESERVED
+        super().__init_subclass__(**kwargs)
+        cls._pool = {}
+        if not (discriminator := cls.__dict__.get("discriminator")):
+            return
+        if len(discriminator) != 1:
+            raise ValueError(f"Discriminator of {cls.__name__} must be a single character: {discriminator}")
+        if MAP.get(discriminator, cls) is not cls:
+            raise ValueError(f"Duplicate symbol encountered for {cls.__name__}: {MAP[discriminator]} ({discriminator})")
+        MAP[discriminator] = cls
+        RESERVED = ILLEGAL | frozenset(MAP)
 
     @classmethod
     def __get_pydantic_core_schema__(
@@ -38,23 +60,35 @@ class _ABCSymbol(UserString, Serializable):
             coerce_numbers_to_str=True
         )
 
-    def __new__(cls, data: str):
-        if cls.discriminator in MAP:
-            raise ValueError(
-                f"Duplicate symbol encountered for {cls.__name__}: {MAP[cls.discriminator]} ({cls.discriminator})"
-            )
-        MAP[cls.discriminator] = cls
-        return super().__new__(cls)
-
-    def __init__(self, data: str):
-        if any(char in data for char in _reserved()):
+    def __new__(cls, data: str | int | UserString = "", *args, **kwargs):
+        if type(data) is not str:
+            if isinstance(data, UserString):
+                data = data.data
+            elif isinstance(data, (str, int)) and not isinstance(data, bool):
+                data = str(data)
+            else:
+                raise TypeError(f"{cls.__name__} must be built from a string or an integer, not {type(data).__name__}")
+        data = data.removeprefix(cls.discriminator)
+        if cls.interned and (symbol := cls._pool.get(data)) is not None:
+            return symbol
+        if not RESERVED.isdisjoint(data):
             raise ValueError(f"Invalid symbol encountered: {data}")
-        super().__init__(data.removeprefix(self.discriminator))
+        symbol = super().__new__(cls)
+        symbol.data = data
+        if cls.interned and len(cls._pool) < INTERN_SIZE:
+            cls._pool[data] = symbol
+        return symbol
+
+    def __init__(self, data: str | int | UserString = "", *args, **kwargs):
+        pass  # NOTE: built in `__new__`, so that interned instances are not re-initialised
+
+    def __reduce__(self):
+        # NOTE: the default reduce would call `__new__` without a value and then overwrite `data` on the result
+        return type(self), (self.data,)
 
 
 class Symbol(_ABCSymbol):
-    def __init__(self, value: str):
-        super().__init__(value)
+    interned: ClassVar[bool] = True
 
     def __repr__(self) -> str:
         return self.json
@@ -82,15 +116,14 @@ class Provider(Symbol):
 
 class Timestamp(Symbol):
     discriminator: ClassVar[str] = "^"
+    interned: ClassVar[bool] = False
 
-    def __init__(self, value: str | datetime | date | timedelta | time | None = None):
+    def __new__(cls, value: str | datetime | date | timedelta | time | None = None):
         if value is None:
-            value = f"@{dt.isotoday()}"
-        elif isinstance(value, str):
-            value = f"@{value}"
-        else:
-            value = f"@{dt.convert(value)}"
-        super().__init__(value)
+            value = dt.isotoday()
+        elif not isinstance(value, str):
+            value = dt.convert(value)
+        return super().__new__(cls, value)
 
 
 class Collection(UserList[Symbol]):
@@ -109,42 +142,23 @@ class Collection(UserList[Symbol]):
     def _concat(*symbols: _ABCSymbol) -> str:
         return ",".join([symbol.data for symbol in symbols])
 
+    @staticmethod
+    def _parse(symbol: str) -> Symbol:
+        if (cls := MAP.get(symbol[:1])) is None:
+            raise ValueError(f"Invalid symbol encountered: {symbol}")
+        return cls(symbol)
+
     @staticmethod
     def _parse_str(symbols: str) -> list[Symbol]:
-        symbols_in = symbols.split(",")
-        symbols_out = []
-        while symbols_in:
-            symbol = symbols_in.pop()
-            discriminator = None
-            for cls in MAP.values():
-                if symbol.startswith(cls.discriminator):
-                    discriminator = cls.discriminator
-                    break
-            if discriminator is None:
-                raise ValueError(f"Invalid symbol encountered: {symbol}")
-            symbols_out.append(
-                MAP[discriminator](symbol.removeprefix(discriminator))
-            )
-        return symbols_out
+        return [Collection._parse(symbol) for symbol in symbols.split(",")]
 
     @classmethod
     def parse_li(cls, *symbols: str):
-        symbols_out = []
-        for symbol in symbols:
-            if symbol.startswith(Identifier.discriminator):
-                symbols_out.append(Identifier(symbol))
-            elif symbol.startswith(Attribute.discriminator):
-                symbols_out.append(Attribute(symbol))
-            elif symbol.startswith(Timestamp.discriminator):
-                symbols_out.append(Timestamp(symbol))
-            else:
-                raise ValueError(f"Invalid symbol encountered: {symbol}")
-        return cls(*symbols_out)
+        return cls(*map(cls._parse, symbols))
 
     @classmethod
     def parse_str(cls, symbols: str):
-        symbols_li = list({symbol.strip() for symbol in symbols.split(",")})
-        return cls.parse_li(*symbols_li)
+        return cls.parse_li(*dict.fromkeys(symbol.strip() for symbol in symbols.split(",")))
 
     @classmethod
     def parse_strs(cls, symbols: list[str]):
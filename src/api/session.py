@@ -6,9 +6,11 @@ from typing import Sequence
 
 from sqlalchemy import RowMapping
 
-from .core.deps import Dependency
+from .core import cache, coalesce
+from .core.deps import Dependency, setting
 from .core.deps.mixin import DependencyManagerMixin
 from .core.orm import meta
+from .core.orm.partition import PARTITIONS_AHEAD
 from .core.orm.mixin import OrmSessionMixin
 from .core.provider import ProviderDirectoryMixin
 from .core.request import Payload, Request
@@ -24,7 +26,10 @@ class Session(ProviderDirectoryMixin, OrmSessionMixin, DependencyManagerMixin):
         provider_dir: The directory containing the provider modules
         loop: The event loop to use for the session
         logger: The logger to use for the session
-        env: The environment variables to use for the session
+        env: The environment variables to use for the session. RESPONSE_CACHE_SIZE bounds the in-memory response
+            cache; RESPONSE_CACHE_SHARED=true backs it with `meta.response_cache`. COALESCE_BUFFER_SIZE bounds the
+            responses buffered per consumer of a shared in-flight request. DB_PARTITIONED=true creates tables that opt
+            into it as partitioned by month, with partitions for the next DB_PARTITIONS_AHEAD months
         dependencies: The dependencies to use for the session
 
     """
@@ -44,6 +49,10 @@ class Session(ProviderDirectoryMixin, OrmSessionMixin, DependencyManagerMixin):
         self._env = env
         self._loop = loop
         self._provider_dir = provider_dir
+        self.cache = cache.ResponseCache(
+            cache.LRUCache(setting(env, "RESPONSE_CACHE_SIZE", cache.CACHE_SIZE, int)), logger=logger
+        )
+        self.coalescer = coalesce.Coalescer(setting(env, "COALESCE_BUFFER_SIZE", coalesce.BUFFER_SIZE, int))
 
     def _resolve_providers(self, providers: list[str] | bool | str) -> list[str]:
         if isinstance(providers, bool):
@@ -80,13 +89,18 @@ class Session(ProviderDirectoryMixin, OrmSessionMixin, DependencyManagerMixin):
             await self.init_db(
                 dbengine=db_engine,
                 provider_metadata=[p.metadata for p in self.providers.values()],
+                partitioned=setting(self.env, "DB_PARTITIONED", False, bool),
+                partitions_ahead=setting(self.env, "DB_PARTITIONS_AHEAD", PARTITIONS_AHEAD, int),
             )
+            if setting(self.env, "RESPONSE_CACHE_SHARED", False, bool):
+                self.cache.shared = cache.PostgresCache(db_engine)
             return self
         raise RuntimeError("Database engine not found")
 
     async def stop(self, commit: bool = True) -> "Session":
-        await self.stop_dependencies(self._env)
+        # NOTE: pending writes are flushed before the engine is disposed
         await self.stop_db(commit=commit)
+        await self.stop_dependencies(self._env)
         return self
 
     @property
@@ -114,7 +128,12 @@ class Session(ProviderDirectoryMixin, OrmSessionMixin, DependencyManagerMixin):
         }
         request = Request(provider=provider, router=router, payload=kwargs)
         # NOTE: ensure request is executed in same event loop
-        return partial(router_instance, request=request, **deps)
+        bound = partial(router_instance, request=request, **deps)
+        if ttl := router_instance.metadata.ttl:
+            return partial(self.cache.stream, cache.key(provider, router, kwargs), ttl, bound, request)
+        if router_instance.metadata.coalesce:
+            return partial(self.coalescer.stream, cache.key(provider, router, kwargs), bound, request)
+        return bound
 
     def __repr__(self) -> str:
         return f"<Session({', '.join(self.providers.keys())})>"
@@ -1 +1 @@
-from .schedule import Schedule
\ No newline at end of file
+from .common.schedule import Schedule
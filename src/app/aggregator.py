@@ -0,0 +1,248 @@
+import asyncio
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import time
+
+import numpy as np
+
+from src import api
+
+PROVIDER = "ibkr"
+ROUTER = "iserver_historical_bars"
+# NOTE: like `producer.ROUTER`, names where bars come from rather than a registered router
+BAR_ROUTER = "aggregator"
+BAR_SIZES: dict[str, int] = {"1s": 1_000, "5s": 5_000, "1min": 60_000, "5mins": 300_000}  # NOTE: bar length in ms
+DEFAULT_SIZE = "1min"
+CAPACITY = 64
+GRACE = 0.5
+TRADE_KEYS = frozenset({"last", "last_size", "volume"})  # NOTE: tick keys only a trade updates
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True, slots=True)
+class Bar:
+    size: str
+    symbol: str
+    start: int  # NOTE: unix milliseconds, like the gateway's historical bars
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    @property
+    def timestamp(self) -> datetime:
+        return _EPOCH + timedelta(milliseconds=self.start)
+
+    def record(self) -> api.core.Record:
+        return api.core.Record(
+            identifier=api.core.symbols.Identifier(self.symbol),
+            attribute=api.core.symbols.Attribute("price"),
+            _data={
+                "timestamp": self.timestamp,
+                "open_": self.open,
+                "high": self.high,
+                "low": self.low,
+                "close": self.close,
+                "volume": self.volume,
+            },
+        )
+
+
+class Aggregator:
+    """Rolling OHLCV bars of several sizes for every symbol, built one tick at a time.
+
+    State lives in `(symbols, sizes)` arrays, so a tick touches a single row, `close` sweeps every open bar in one
+    vectorized pass, and memory grows only with the number of symbols. A bar finishes when a tick for a later bar
+    arrives, or when `close` is called past its end; ticks for a bar that has already finished are counted as late and
+    skipped. Volume is taken from the difference between successive cumulative volumes.
+
+    Args:
+        sizes: Bar sizes to build, keys of `BAR_SIZES`
+        capacity: Initial number of symbols; doubled whenever it runs out
+    """
+
+    def __init__(self, sizes: Iterable[str] = BAR_SIZES, *, capacity: int = CAPACITY):
+        self.sizes = tuple(sizes)
+        if unknown := [size for size in self.sizes if size not in BAR_SIZES]:
+            raise ValueError(f"Unsupported bar sizes: {unknown}")
+        self._lengths = [BAR_SIZES[size] for size in self.sizes]
+        self._ms = np.array(self._lengths, dtype=np.int64)
+        self._index: dict[str, int] = {}
+        self._symbols: list[str] = []
+        self._allocate(capacity)
+        self._pending: list[Bar] = []
+        self.ticks = 0
+        self.late = 0
+        self.bars = 0
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __repr__(self) -> str:
+        return f"<Aggregator({', '.join(self.sizes)}; {len(self)} symbols, {self.bars} bars)>"
+
+    def _allocate(self, capacity: int) -> None:
+        shape = (capacity, len(self.sizes))
+        n = len(self._symbols)
+        arrays = {
+            "_start": np.full(shape, -1, dtype=np.int64),
+            "_closed": np.full(shape, -1, dtype=np.int64),
+            "_open": np.full(shape, np.nan),
+            "_high": np.full(shape, np.nan),
+            "_low": np.full(shape, np.nan),
+            "_close": np.full(shape, np.nan),
+            "_volume": np.zeros(shape),
+        }
+        for name, array in arrays.items():
+            if n:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        cumulative = np.full(capacity, np.nan)
+        if n:
+            cumulative[:n] = self._cumulative[:n]
+        self._cumulative = cumulative
+
+    def _add(self, symbol: str) -> int:
+        i = len(self._symbols)
+        if i == len(self._start):
+            self._allocate(2 * i)
+        self._index[symbol] = i
+        self._symbols.append(symbol)
+        return i
+
+    def _finish(self, i: int, k: int) -> None:
+        self._pending.append(
+            Bar(
+                self.sizes[k],
+                self._symbols[i],
+                int(self._start[i, k]),
+                float(self._open[i, k]),
+                float(self._high[i, k]),
+                float(self._low[i, k]),
+                float(self._close[i, k]),
+                float(self._volume[i, k]),
+            )
+        )
+        self._closed[i, k] = self._start[i, k]
+        self._start[i, k] = -1
+        self.bars += 1
+
+    def update(self, symbol: str, timestamp: int, price: float, volume: float | None = None) -> None:
+        """Fold a trade into every bar size of `symbol`.
+
+        Args:
+            symbol: The symbol traded
+            timestamp: Time of the trade, in unix milliseconds
+            price: Trade price
+            volume: Cumulative volume as of the trade, if known
+        """
+        i = self._index.get(symbol)
+        if i is None:
+            i = self._add(symbol)
+        self.ticks += 1
+        delta = 0.0
+        if volume is not None:
+            previous = self._cumulative[i]
+            # NOTE: the first tick only sets the baseline; a drop means the session's volume was reset
+            if previous == previous and volume >= previous:
+                delta = volume - previous
+            self._cumulative[i] = volume
+        start, closed = self._start[i], self._closed[i]
+        high, low, close, volumes = self._high[i], self._low[i], self._close[i], self._volume[i]
+        late = False
+        # NOTE: a scalar loop over the few bar sizes beats vectorizing them, which pays NumPy's call overhead per tick
+        for k, length in enumerate(self._lengths):
+            bucket = timestamp - timestamp % length
+            if bucket != start[k]:
+                if bucket < start[k] or bucket <= closed[k]:
+                    late = True
+                    continue
+                if start[k] >= 0:
+                    self._finish(i, k)
+                start[k] = bucket
+                self._open[i, k] = high[k] = low[k] = close[k] = price
+                volumes[k] = delta
+                continue
+            if price > high[k]:
+                high[k] = price
+            elif price < low[k]:
+                low[k] = price
+            close[k] = price
+            volumes[k] += delta
+        self.late += late
+
+    def add(self, response: api.core.Response) -> bool:
+        """Fold a tick response from `producer` into the bars.
+
+        Returns False, and folds nothing, for ticks without a last price, and for quote-only ticks: a tick carries the
+        last known trade, so folding one whose `changed` keys are all quotes would replay a stale trade.
+        """
+        tick = response.data
+        last = tick._data.get("last")
+        if last is None or tick.identifier is None:
+            return False
+        if (changed := tick._data.get("changed")) is not None and TRADE_KEYS.isdisjoint(changed):
+            return False
+        timestamp = tick._data.get("timestamp") or int(time() * 1000)
+        self.update(str(tick.identifier), int(timestamp), last, tick._data.get("volume"))
+        return True
+
+    def close(self, now: int) -> None:
+        """Finish every bar that ended at or before `now`, in unix milliseconds, whether or not a later tick arrived."""
+        n = len(self._symbols)
+        start = self._start[:n]
+        for i, k in np.argwhere((start >= 0) & (start + self._ms <= now)):
+            self._finish(i, k)
+
+    def drain(self) -> list[Bar]:
+        """Finished bars since the last call, oldest first per symbol and size."""
+        bars, self._pending = self._pending, []
+        return bars
+
+
+def _request(bar: Bar) -> api.core.Request:
+    return api.core.Request(provider=PROVIDER, router=BAR_ROUTER, payload={"conid": bar.symbol, "bar": bar.size})
+
+
+async def _consume(aggregator: Aggregator, queue: asyncio.Queue) -> None:
+    while True:
+        aggregator.add(await queue.get())
+
+
+async def run(
+    session: api.Session,
+    queue: asyncio.Queue,
+    *,
+    sizes: Iterable[str] = BAR_SIZES,
+    tables: Mapping[str, object] | None = None,
+    grace: float = GRACE,
+) -> Aggregator:
+    """Build bars from the tick responses on `queue` and store them as they finish, until cancelled.
+
+    Args:
+        session: A started session
+        queue: Tick responses, as put by `producer`
+        sizes: Bar sizes to build, keys of `BAR_SIZES`
+        tables: Table to store each bar size in. Bars of a size without a table are dropped. By default `1min` bars
+            go to the table historical bars are stored in, so live and backfilled bars line up
+        grace: Seconds to wait past a bar's end for late ticks before finishing it
+    """
+    aggregator = Aggregator(sizes)
+    if tables is None:
+        tables = {DEFAULT_SIZE: session.router(PROVIDER, ROUTER).info.get("stores")}
+    interval = min(BAR_SIZES[size] for size in aggregator.sizes) / 1000
+    consumer = asyncio.create_task(_consume(aggregator, queue))
+    try:
+        while True:
+            done, _ = await asyncio.wait({consumer}, timeout=interval - time() % interval + grace)
+            if done:
+                consumer.result()  # NOTE: re-raises whatever stopped the consumer, rather than leaving bars unbuilt
+            aggregator.close(int((time() - grace) * 1000))
+            for bar in aggregator.drain():
+                if (table := tables.get(bar.size)) is not None:
+                    await session.store(api.core.Response(_request(bar), bar.record()), table)
+    finally:
+        consumer.cancel()
+        session.logger.info(f"Aggregator stopped: {aggregator}")
@@ -0,0 +1,249 @@
+import asyncio
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import Logger
+from time import monotonic
+
+import numpy as np
+from sqlalchemy import func, select
+
+from src import api, util
+from src.api.core.orm import meta
+
+PROVIDER = "ibkr"
+ROUTER = "hmds_historical_bars_columnar"
+BACKFILL_CONCURRENCY = 4
+PROGRESS_INTERVAL = 5.0
+START_TIME = "%Y%m%d-%H:%M:%S"
+
+# NOTE: the longest period the gateway serves for each bar size in one request (it caps responses at 1000 bars),
+# as (bar length, period parameter, period length)
+BAR_PERIODS: dict[str, tuple[timedelta, str, timedelta]] = {
+    "1min": (timedelta(minutes=1), "8h", timedelta(hours=8)),
+    "2mins": (timedelta(minutes=2), "1d", timedelta(days=1)),
+    "3mins": (timedelta(minutes=3), "2d", timedelta(days=2)),
+    "5mins": (timedelta(minutes=5), "3d", timedelta(days=3)),
+    "10mins": (timedelta(minutes=10), "6d", timedelta(days=6)),
+    "15mins": (timedelta(minutes=15), "10d", timedelta(days=10)),
+    "30mins": (timedelta(minutes=30), "20d", timedelta(days=20)),
+    "1h": (timedelta(hours=1), "40d", timedelta(days=40)),
+    "2h": (timedelta(hours=2), "80d", timedelta(days=80)),
+    "4h": (timedelta(hours=4), "160d", timedelta(days=160)),
+    "8h": (timedelta(hours=8), "320d", timedelta(days=320)),
+    "1d": (timedelta(days=1), "1000d", timedelta(days=1000)),
+    "1w": (timedelta(weeks=1), "792w", timedelta(weeks=792)),
+}
+PERIOD_UNITS = {"h": timedelta(hours=1), "d": timedelta(days=1), "w": timedelta(weeks=1)}
+
+
+@dataclass(frozen=True, slots=True)
+class Chunk:
+    conid: str
+    start: datetime
+    bar: str
+    period: str
+    end: datetime
+
+    @property
+    def payload(self) -> dict[str, str]:
+        return {
+            "conid": self.conid,
+            "bar": self.bar,
+            "period": self.period,
+            "startTime": self.start.strftime(START_TIME),
+            "direction": "1",  # NOTE: forwards from `startTime`
+        }
+
+
+def _period(period: str, remaining: timedelta) -> str:
+    """`period` shortened to the fewest of its units covering `remaining`."""
+    unit = period.lstrip("0123456789")
+    count = -(-remaining // PERIOD_UNITS[unit])
+    return f"{min(count, int(period.removesuffix(unit)))}{unit}"
+
+
+def chunks(conid: str, start: datetime, end: datetime, bar: str) -> Iterator[Chunk]:
+    """Split `[start, end)` into windows no longer than the gateway allows for `bar`.
+
+    The last window's period is cut down to the units it still needs. The gateway may still return bars past its
+    `end`, so callers should `clip` what comes back.
+    """
+    if bar not in BAR_PERIODS:
+        raise ValueError(f"Unsupported bar size: {bar}")
+    _, period, length = BAR_PERIODS[bar]
+    while start < end:
+        stop = min(start + length, end)
+        yield Chunk(conid, start, bar, period if stop - start == length else _period(period, stop - start), stop)
+        start = stop
+
+
+def clip(data: api.core.Record, end: datetime) -> api.core.Record | None:
+    """`data` without the bars at or after `end`, or None if none are left."""
+    if isinstance(data, api.core.response.Columnar):
+        keep = data.arrays["timestamp"] < np.datetime64(end)
+        if keep.all():
+            return data
+        if not keep.any():
+            return None
+        arrays = {key: array[keep] for key, array in data.arrays.items()}
+        return api.core.response.Columnar(identifier=data.identifier, attribute=data.attribute, _data=arrays)
+    if data.timestamp is not None and util.dt.convert(d_str=data.timestamp.data) >= end:
+        return None
+    return data
+
+
+def plan(
+    conids: Iterable[str],
+    start: datetime,
+    end: datetime,
+    bar: str,
+    last: Mapping[str, datetime] | None = None,
+) -> list[Chunk]:
+    """Chunks covering `[start, end)` for every conid, skipping what is already stored.
+
+    Args:
+        conids: Contracts to backfill
+        start: Start of the range
+        end: End of the range (exclusive)
+        bar: Bar size, one of `BAR_PERIODS`
+        last: Last stored timestamp per conid; each conid resumes one bar after it
+    """
+    step = BAR_PERIODS[bar][0] if bar in BAR_PERIODS else timedelta(0)
+    last = last or {}
+    out = []
+    for conid in conids:
+        resume = last.get(conid)
+        out.extend(chunks(conid, max(start, resume + step) if resume else start, end, bar))
+    return out
+
+
+class Progress:
+    """Counters for a running backfill. Throughput is in bars per second."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bars = 0
+        self._t0 = monotonic()
+
+    def __repr__(self) -> str:
+        return f"<Progress({self.done + self.failed}/{self.total} chunks, {self.bars} bars, {self.throughput:.0f}/s)>"
+
+    @property
+    def elapsed(self) -> float:
+        return monotonic() - self._t0
+
+    @property
+    def throughput(self) -> float:
+        return self.bars / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        finished = self.done + self.failed
+        return self.elapsed / finished * (self.total - finished) if finished else None
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "bars": self.bars,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "eta": self.eta,
+        }
+
+
+async def collection(session: api.Session, name: str) -> list[str]:
+    """Conids held by a `meta.collections` collection."""
+    query = (
+        select(meta.CollectionItems.name)
+        .join(meta.Collections, meta.Collections.id == meta.CollectionItems.collection_id)
+        .where(meta.Collections.name == name)
+    )
+    result = await session.session.execute(query)
+    return list(result.scalars())
+
+
+async def last_timestamps(session: api.Session, table, conids: Iterable[str]) -> dict[str, datetime]:
+    """Latest stored timestamp per conid. Symbols are stored with their discriminator, e.g. `$265598`."""
+    symbols = {api.core.symbols.Identifier(conid).json: conid for conid in conids}
+    query = (
+        select(table.symbol, func.max(table.timestamp)).where(table.symbol.in_(list(symbols))).group_by(table.symbol)
+    )
+    result = await session.session.execute(query)
+    return {symbols[symbol]: timestamp for symbol, timestamp in result.all()}
+
+
+async def _report(progress: Progress, logger: Logger, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"Backfill: {progress}")
+
+
+async def backfill(
+    session: api.Session,
+    conids: Iterable[str],
+    start: datetime,
+    end: datetime,
+    *,
+    bar: str = "1min",
+    provider: str = PROVIDER,
+    router: str = ROUTER,
+    concurrency: int = BACKFILL_CONCURRENCY,
+    resume: bool = True,
+    interval: float = PROGRESS_INTERVAL,
+) -> Progress:
+    """Backfill historical bars for `conids` over `[start, end)`, storing them as they arrive.
+
+    Chunks run on `concurrency` workers; the router's rate limit paces the requests themselves. A failed chunk is
+    logged and counted, and does not stop the others.
+
+    Args:
+        session: A started session
+        conids: Contracts to backfill
+        start: Start of the range
+        end: End of the range (exclusive)
+        bar: Bar size, one of `BAR_PERIODS`
+        provider: Provider of the bars router
+        router: A router yielding columnar bars
+        concurrency: Number of chunks in flight
+        resume: Skip bars older than the last stored timestamp of each conid
+        interval: Seconds between progress reports
+    """
+    conids = list(conids)
+    table = session.router(provider, router).info.get("stores")
+    last = await last_timestamps(session, table, conids) if resume and table is not None else {}
+    queue: asyncio.Queue[Chunk] = asyncio.Queue()
+    for chunk in plan(conids, start, end, bar, last):
+        queue.put_nowait(chunk)
+    progress = Progress(queue.qsize())
+
+    async def _worker() -> None:
+        while not queue.empty():
+            chunk = queue.get_nowait()
+            try:
+                async for response in session(provider, router, **chunk.payload)():
+                    if (data := clip(response.data, chunk.end)) is None:
+                        continue
+                    if data is not response.data:
+                        response = api.core.Response(response.request, data)
+                    progress.bars += len(data) if isinstance(data, api.core.response.Columnar) else 1
+                    if table is not None:
+                        await session.store(response, table)
+                progress.done += 1
+            except Exception as e:
+                progress.failed += 1
+                session.logger.error(f"Backfill of {chunk.conid} from {chunk.start} failed: {e}")
+
+    reporter = asyncio.create_task(_report(progress, session.logger, interval))
+    try:
+        async with asyncio.TaskGroup() as tasks:
+            for _ in range(min(concurrency, progress.total)):
+                tasks.create_task(_worker())
+    finally:
+        reporter.cancel()
+    session.logger.info(f"Backfill finished: {progress}")
+    return progress
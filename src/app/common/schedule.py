@@ -1,6 +1,8 @@
+import heapq
 from collections import UserList
-from datetime import datetime, time
-from typing import TypedDict, Unpack, Generator
+from datetime import datetime, time, timedelta
+from itertools import count
+from typing import TypedDict, Unpack
 
 from src import util
 from src.api import core
@@ -33,36 +35,105 @@ class ItemGroup(UserList[Item]):
         self.t = t
 
 
-class Schedule(UserList[Item]):
-    def __init__(self, *items: Item):
-        super().__init__(items)
-        self._items = items
-
-    @staticmethod
-    def parse_record(record: dict) -> Generator[dict, None]:
-        record_end = record["end"] or datetime.today().replace(hour=23, minute=59, second=59)
-        record_time = record["start"]
-        while record_time <= record_end:
-            i_n = record.copy()
-            i_n["time"] = record_time
-            record_time += record["interval"]
-            yield i_n
+def _interval(value: timedelta | time) -> timedelta:
+    # NOTE: `meta.schedule.interval` is stored as TIME, so it may come back as a time of day
+    if isinstance(value, time):
+        return timedelta(hours=value.hour, minutes=value.minute, seconds=value.second, microseconds=value.microsecond)
+    return value
+
+
+class Rule:
+    """A recurring schedule entry, firing every `interval` from `start` through `end` (inclusive)."""
+
+    __slots__ = ("id", "provider", "router", "payload", "start", "end", "interval")
+
+    def __init__(self, record: dict, day: datetime | None = None):
+        day = (day or util.dt.timestamp()).date()
+        self.id = record["id"]
+        self.provider = record["provider"]
+        self.router = record["router"]
+        self.payload = record.get("request") or {}
+        self.start = datetime.combine(day, record.get("start") or util.dt._NULL_TIME)
+        self.end = datetime.combine(day, record.get("end") or util.dt._EOD)
+        self.interval = _interval(record.get("interval") or timedelta(days=1))
+        if self.interval <= timedelta(0):
+            raise ValueError(f"Schedule {self.id} has a non-positive interval")
+
+    def __repr__(self) -> str:
+        return f"<Rule({self.id}, {self.provider}.{self.router}, every {self.interval})>"
+
+    def first(self, after: datetime | None = None) -> datetime | None:
+        """The first occurrence at or after `after`, or None if the rule has no occurrences left."""
+        if after is None or after <= self.start:
+            return self.start
+        steps = -(-(after - self.start) // self.interval)
+        t = self.start + steps * self.interval
+        return t if t <= self.end else None
+
+    def next(self, t: datetime) -> datetime | None:
+        t += self.interval
+        return t if t <= self.end else None
+
+    def item(self, t: datetime) -> Item:
+        return Item(id=self.id, t=t.time(), provider=self.provider, router=self.router, payload=dict(self.payload))
+
+
+class Schedule:
+    """A min-heap of pending schedule occurrences.
+
+    Each rule keeps a single pending occurrence on the heap; its successor is computed only when it fires, so memory is
+    O(rules) and taking the next item is O(log rules).
+    """
+
+    def __init__(self, *items: Item, rules: tuple[Rule, ...] = (), after: datetime | None = None):
+        self._seq = count()  # NOTE: tie-breaker, keeps items due at the same time in insertion order
+        self._heap: list[tuple[datetime, int, Item | None, Rule | None]] = []
+        for item in items:
+            self._heap.append((util.dt.schedule_time(item.t), next(self._seq), item, None))
+        for rule in rules:
+            if (t := rule.first(after)) is not None:
+                self._heap.append((t, next(self._seq), None, rule))
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        """Number of pending occurrences, i.e. one per active rule plus any one-off items."""
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __iter__(self) -> "Schedule":
+        return self
+
+    def __next__(self) -> Item:
+        if not self._heap:
+            raise StopIteration
+        return self.pop()
 
     @classmethod
-    def from_orm(cls, schedule: list[dict]):
-        data = []
-        for record in schedule:
-            for item in cls.parse_record(record):
-                data.append(Item(**item))
-        return cls(*sorted(data, key=lambda x: x.t))
+    def from_orm(cls, schedule: list[dict], *, after: datetime | None = None) -> "Schedule":
+        """Build a schedule from `meta.schedule` records, skipping disabled ones and occurrences before `after`."""
+        return cls(rules=tuple(Rule(record) for record in schedule if record.get("enabled", True)), after=after)
+
+    def peek(self) -> datetime | None:
+        return self._heap[0][0] if self._heap else None
+
+    def pop(self) -> Item:
+        t, _, item, rule = self._heap[0]
+        if rule is None:
+            heapq.heappop(self._heap)
+            return item
+        if (t_next := rule.next(t)) is not None:
+            heapq.heapreplace(self._heap, (t_next, next(self._seq), None, rule))
+        else:
+            heapq.heappop(self._heap)
+        return rule.item(t)
 
     def next_group(self, duration: util.dt.timedelta = util.dt._1S) -> ItemGroup | None:
-        group = None
-        while item := self.pop(0):
-            if group:
-                if util.dt.within_duration(item.t, group.t, duration):
-                    group.append(item)
-            else:
-                group = ItemGroup(item.t)
-                group.append(item)
+        if not self._heap:
+            return None
+        start = self.peek()
+        group = ItemGroup(start.time())
+        while self._heap and self.peek() - start <= duration:
+            group.append(self.pop())
         return group
@@ -2,14 +2,40 @@ import asyncio
 
 from src import api, util
 
+from .common.request_handler import handle_request
 from .common.schedule import Schedule, Item
 
+PROVIDER_CONCURRENCY = 8
+ROUTER_CONCURRENCY = 2
 
-async def handle_request(
-    request: api.core.Request,
-    session: api.Session,
-):
-    ...
+
+class ConcurrencyLimits:
+    """Semaphores bounding the number of in-flight requests per provider and per router."""
+
+    def __init__(self, provider: int = PROVIDER_CONCURRENCY, router: int = ROUTER_CONCURRENCY):
+        self._provider_limit = provider
+        self._router_limit = router
+        self._providers: dict[str, asyncio.Semaphore] = {}
+        self._routers: dict[tuple[str, str], asyncio.Semaphore] = {}
+
+    def provider(self, provider: str) -> asyncio.Semaphore:
+        return self._providers.setdefault(provider, asyncio.Semaphore(self._provider_limit))
+
+    def router(self, provider: str, router: str) -> asyncio.Semaphore:
+        return self._routers.setdefault((provider, router), asyncio.Semaphore(self._router_limit))
+
+
+async def dispatch(item: Item, session: api.Session, limits: ConcurrencyLimits) -> None:
+    request = item.request
+    # NOTE: router slot first, so a backed-up router does not hold provider slots while it waits
+    async with limits.router(request.provider, request.router), limits.provider(request.provider):
+        try:
+            async for _ in handle_request(request, session):
+                pass
+        except Exception as e:
+            session.logger.error(f"Error processing request {request.id}: {e}")
+            return
+    session.logger.info(f"Processed request: {request}")
 
 
 async def process(
@@ -17,16 +43,24 @@ async def process(
     session: api.Session,
     *,
     padding: float = 0.0,
+    window: util.dt.timedelta = util.dt._1S,
+    limits: ConcurrencyLimits | None = None,
 ):
-    async def _next_schedule_item(current_schedule_item: Item):
-        session.logger.info(f"Sleeping until {current_schedule_item.t}")
-        await asyncio.sleep(current_schedule_item.t - util.dt.timestamp() - padding)
-        await handle_request(current_schedule_item.request, session)
-        session.logger.info(f"Processed request: {current_schedule_item.request}")
+    """Run a schedule, dispatching each group of items concurrently.
+
+    Sleeps are measured against the wall clock rather than accumulated, so a request that overruns its slot does not
+    delay the groups scheduled after it.
+    """
+    limits = limits or ConcurrencyLimits()
     try:
-        while current_schedule_item := next(schedule):
-            await _next_schedule_item(current_schedule_item)
-    except StopIteration:
+        async with asyncio.TaskGroup() as tasks:
+            while (group := schedule.next_group(window)) is not None:
+                session.logger.info(f"Sleeping until {group.t}")
+                delay = (util.dt.schedule_time(group.t) - util.dt.timestamp()).total_seconds() - padding
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                for item in group:
+                    tasks.create_task(dispatch(item, session, limits))
         session.logger.info("Shutting down (schedule exhausted)")
     except KeyboardInterrupt:
         session.logger.info("Shutting down (ctrl-c pressed)")
@@ -40,4 +74,8 @@ async def process(
 async def start(schedule: Schedule, settings: util.settings.Settings, loop: asyncio.AbstractEventLoop, *, debug: bool = False):
     logger = util.log.get_logger("daemon", level=util.log.logging.INFO if debug else util.log.logging.WARNING)
     session = await api.connect(loop=loop, logger=logger)
-    await process(schedule, session, padding=settings["server_daemon_padding"])
+    limits = ConcurrencyLimits(
+        provider=settings.get("server_provider_concurrency", PROVIDER_CONCURRENCY),
+        router=settings.get("server_router_concurrency", ROUTER_CONCURRENCY),
+    )
+    await process(schedule, session, padding=settings["server_daemon_padding"], limits=limits)
@@ -1,11 +1,234 @@
 import asyncio
+import json
+import ssl
+from collections.abc import Iterable
+from logging import Logger
 
-import websockets
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
 
 from src import api
 
+from . import backfill
+
+# NOTE: Client Portal market data field ids -> tick keys
+FIELDS = {
+    "31": "last",
+    "84": "bid",
+    "86": "ask",
+    "88": "bid_size",
+    "85": "ask_size",
+    "7059": "last_size",
+    "7762": "volume",
+}
+# NOTE: ticks come off the websocket rather than from a router, so their requests name the stream instead. No router
+# is registered under this name, so a tick's request can never be dispatched or mistaken for a router's
+ROUTER = "websocket_smd"
+QUEUE_SIZE = 10_000
+HEARTBEAT = 55.0
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+
+class TickQueue(asyncio.Queue):
+    """Bounded queue that drops its oldest item rather than blocking when full, so a slow consumer sees fresh ticks."""
+
+    def __init__(self, maxsize: int = QUEUE_SIZE):
+        super().__init__(maxsize)
+        self.dropped = 0
+
+    def put_nowait(self, item) -> None:
+        if self.full():
+            self.get_nowait()
+            self.dropped += 1
+        super().put_nowait(item)
+
+
+def url(env: dict[str, str]) -> str:
+    return f"wss://{env['IBKR_HOST']}:{env['IBKR_PORT']}/v1/api/ws"
+
+
+def subscribe_message(conid: str, fields: Iterable[str] = FIELDS) -> str:
+    return f"smd+{conid}+{json.dumps({'fields': list(fields)})}"
+
+
+def unsubscribe_message(conid: str) -> str:
+    return f"umd+{conid}+{{}}"
+
+
+def _number(value) -> float | None:
+    # NOTE: prices may carry a one-letter prefix, e.g. "C" for a prior close or "H" for a halted contract
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).lstrip("CH").replace(",", ""))
+    except ValueError:
+        return None
+
+
+class Decoder:
+    """Turns market data messages into ticks.
+
+    The gateway only sends the fields that changed since the previous message, so the last known value of every field
+    is kept per conid and each tick carries the full set, along with the keys the message updated under `changed`.
+    """
+
+    def __init__(self, fields: dict[str, str] = FIELDS):
+        self.fields = fields
+        self.state: dict[str, dict[str, float | None]] = {}
+
+    def decode(self, message: str | bytes) -> tuple[str, dict] | None:
+        """The conid and tick of a market data message, or None for any other message."""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or not str(data.get("topic", "")).startswith("smd+"):
+            return None
+        conid = str(data.get("conid") or data["topic"].split("+", 1)[1])
+        state = self.state.setdefault(conid, dict.fromkeys(self.fields.values()))
+        changed = []
+        for field, key in self.fields.items():
+            if field in data and (value := _number(data[field])) is not None:
+                state[key] = value
+                changed.append(key)
+        if not changed:
+            return None
+        return conid, {"timestamp": data.get("_updated"), **state, "changed": changed}
+
+
+class Producer:
+    """Streams market data for a set of conids into a queue of `Response`s.
+
+    Reconnects with exponential backoff when the connection drops, and resubscribes every conid on each new connection.
+
+    Args:
+        uri: The gateway websocket, see `url`
+        conids: Contracts to subscribe to
+        queue: Destination of the tick responses. A `TickQueue` by default
+        fields: Market data field ids to subscribe to, mapped to tick keys
+        heartbeat: Seconds between the keep-alive messages the gateway expects
+        logger: Logger for connection events
+        verify: Verify the gateway's TLS certificate. The gateway ships with a self-signed one
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        conids: Iterable[str],
+        *,
+        queue: asyncio.Queue | None = None,
+        fields: dict[str, str] = FIELDS,
+        heartbeat: float = HEARTBEAT,
+        logger: Logger | None = None,
+        verify: bool = False,
+    ):
+        self.uri = uri
+        self.conids = {str(conid) for conid in conids}
+        self.queue = queue if queue is not None else TickQueue()
+        self.decoder = Decoder(fields)
+        self.heartbeat = heartbeat
+        self.logger = logger
+        self.messages = 0
+        self.ticks = 0
+        self.reconnects = 0
+        self._ssl = None
+        if uri.startswith("wss") and not verify:
+            self._ssl = ssl.create_default_context()
+            self._ssl.check_hostname = False
+            self._ssl.verify_mode = ssl.CERT_NONE
+        self._requests = {conid: self._request(conid) for conid in self.conids}
+        self._socket = None
+
+    def __repr__(self) -> str:
+        return f"<Producer({len(self.conids)} conids, {self.ticks} ticks, {self.reconnects} reconnects)>"
+
+    @staticmethod
+    def _request(conid: str) -> api.core.Request:
+        return api.core.Request(provider="ibkr", router=ROUTER, payload={"conid": conid})
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "messages": self.messages,
+            "ticks": self.ticks,
+            "reconnects": self.reconnects,
+            "dropped": getattr(self.queue, "dropped", 0),
+        }
+
+    async def subscribe(self, conid: str) -> None:
+        conid = str(conid)
+        self.conids.add(conid)
+        self._requests.setdefault(conid, self._request(conid))
+        if self._socket is not None:
+            await self._socket.send(subscribe_message(conid, self.decoder.fields))
+
+    async def unsubscribe(self, conid: str) -> None:
+        conid = str(conid)
+        self.conids.discard(conid)
+        if self._socket is not None:
+            await self._socket.send(unsubscribe_message(conid))
+
+    def _publish(self, conid: str, tick: dict) -> None:
+        record = api.core.Record(
+            identifier=api.core.symbols.Identifier(conid),
+            attribute=api.core.symbols.Attribute("tick"),
+            _data=tick,
+        )
+        self.queue.put_nowait(api.core.Response(self._requests.get(conid) or self._request(conid), record))
+        self.ticks += 1
+
+    async def _keepalive(self, socket) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            await socket.send("tic")
+
+    async def _session(self) -> None:
+        async with connect(self.uri, ssl=self._ssl) as socket:
+            self._socket = socket
+            try:
+                for conid in sorted(self.conids):
+                    await socket.send(subscribe_message(conid, self.decoder.fields))
+                async with asyncio.TaskGroup() as tasks:
+                    keepalive = tasks.create_task(self._keepalive(socket))
+                    async for message in socket:
+                        self.messages += 1
+                        if (decoded := self.decoder.decode(message)) is not None:
+                            self._publish(*decoded)
+                    keepalive.cancel()
+            finally:
+                self._socket = None
+
+    async def run(self, *, reconnect_delay: float = RECONNECT_DELAY, max_delay: float = MAX_RECONNECT_DELAY) -> None:
+        """Stream until cancelled."""
+        delay = reconnect_delay
+        while True:
+            messages = self.messages
+            try:
+                await self._session()
+            except* (OSError, WebSocketException) as e:
+                if self.logger:
+                    self.logger.warning(f"Market data connection lost: {e.exceptions[0]!r}")
+            if self.messages > messages:
+                delay = reconnect_delay  # NOTE: the connection was healthy, so start backing off afresh
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
 
 async def run(
-    session: api.Session, message_queue: asyncio.LifoQueue[api.core.Request], *, interval: float = 0.25
-) -> asyncio.LifoQueue[api.core.Request]: ...
- 
\ No newline at end of file
+    session: api.Session,
+    queue: asyncio.Queue | None = None,
+    *,
+    conids: Iterable[str] = (),
+    collection: str | None = None,
+) -> Producer:
+    """Stream market data for `conids`, or for the conids of a `meta.collections` collection, until cancelled."""
+    if collection is not None:
+        conids = [*conids, *await backfill.collection(session, collection)]
+    producer = Producer(url(session.env), conids, queue=queue, logger=session.logger)
+    try:
+        await producer.run()
+    finally:
+        session.logger.info(f"Producer stopped: {producer.stats}")
+    return producer
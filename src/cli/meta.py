@@ -1,13 +1,19 @@
 import asyncio
 import json
 from enum import Enum
-from typing import Annotated
+from pathlib import Path
+from typing import Annotated, Any
 
 import rich
 import typer
+from sqlalchemy import Table
+from sqlalchemy import types as t
+from sqlalchemy.schema import CreateSchema
 from sqlalchemy.sql import select
 
-from src.api import connect
+from src import util
+from src.api import Session, connect
+from src.api.core.orm import parquet, partition, raw
 
 app = typer.Typer(add_completion=False)
 
@@ -157,5 +163,99 @@ def provider_metadata(
     asyncio.run(_set())
 
 
+def _provider_table(session: Session, provider: str, name: str) -> Table:
+    md = session.metadata(provider)
+    key = f"{md.schema}.{name}" if md.schema else name
+    if key not in md.tables:
+        raise typer.BadParameter(f"Table {name} not found for provider {provider}")
+    return md.tables[key]
+
+
+def _filters(table: Table, filters: str | None) -> tuple[tuple[str, Any, str], ...]:
+    out = []
+    for attr, value, op in json.loads(filters) if filters else ():
+        if isinstance(table.c[attr].type, t.DateTime) and isinstance(value, str):
+            value = util.dt.convert(d_str=value)
+        out.append((attr, value, op))
+    return tuple(out)
+
+
+@app.command(name="export")
+def export(
+    provider: Annotated[str, typer.Argument(help="The provider the table belongs to")],
+    table: Annotated[str, typer.Argument(help="The table to export, e.g. ohlc")],
+    path: Annotated[Path, typer.Argument(help="The directory to write the Parquet dataset to")],
+    filters: Annotated[
+        str | None,
+        typer.Option("--filter", help='Filters as a JSON list of [column, value, op], e.g. [["symbol", "$1", "=="]]'),
+    ] = None,
+    partition_by: Annotated[
+        str | None, typer.Option(help="The datetime column to partition by month on. Not partitioned if empty")
+    ] = "timestamp",
+    batch_size: Annotated[int, typer.Option(help="Rows fetched and written at a time")] = parquet.BATCH_SIZE,
+) -> None:
+    async def _export():
+        session = await connect(providers=[provider])
+        table_ = _provider_table(session, provider, table)
+        return await parquet.export(
+            session.session,
+            table_,
+            path,
+            *_filters(table_, filters),
+            partition_by=partition_by or None,
+            batch_size=batch_size,
+        )
+
+    summary = asyncio.run(_export())
+    rich.print(f"Exported {summary.rows} rows to {len(summary.files)} files in {path}")
+
+
+@app.command(name="import")
+def import_(
+    provider: Annotated[str, typer.Argument(help="The provider the table belongs to")],
+    table: Annotated[str, typer.Argument(help="The table the dataset was exported from, e.g. ohlc")],
+    path: Annotated[Path, typer.Argument(help="The directory of the Parquet dataset")],
+    raw_schema: Annotated[
+        bool, typer.Option("--raw/--no-raw", help="Load into the provider's raw schema rather than the table itself")
+    ] = True,
+    batch_size: Annotated[int, typer.Option(help="Rows read and copied at a time")] = parquet.BATCH_SIZE,
+) -> None:
+    async def _import():
+        session = await connect(providers=[provider])
+        target = _provider_table(session, provider, table)
+        if raw_schema:
+            target = raw.mirror(target, provider)
+            conn = await session.session.connection()
+            await conn.execute(CreateSchema(target.schema, if_not_exists=True))
+            await conn.run_sync(target.metadata.create_all)
+        return target, await parquet.load(session.session, target, path, batch_size=batch_size)
+
+    target, rows = asyncio.run(_import())
+    rich.print(f"Loaded {rows} rows into {target.fullname}")
+
+
+@app.command(name="partitions")
+def partitions(
+    provider: Annotated[str, typer.Argument(help="The provider whose partitioned tables to maintain")],
+    ahead: Annotated[int, typer.Option(help="Months past the current one to create partitions for")] = (
+        partition.PARTITIONS_AHEAD
+    ),
+    retention: Annotated[
+        int | None, typer.Option(help="Months of history to keep, counting the current one. Kept forever if empty")
+    ] = None,
+) -> None:
+    async def _partitions():
+        session = await connect(providers=[provider])
+        conn = await session.session.connection()
+        plans = {}
+        for table in partition.tables(session.metadata(provider)):
+            plans[table.fullname] = await partition.maintain(conn, table, ahead=ahead, retention=retention)
+        await session.session.commit()
+        return plans
+
+    for name, plan in asyncio.run(_partitions()).items():
+        rich.print(f"{name}: not partitioned" if plan is None else f"{name}: {plan.summary()}")
+
+
 if __name__ == "__main__":
     asyncio.run(app())
@@ -1,10 +1,12 @@
+import asyncio
+
 import yarl
 from httpx import AsyncClient
 from pydantic import ValidationError
 
 from src import api, util
 from . import models, models_generated, tables
-from .util import unix_to_iso
+from .util import bar_timestamps, columnar_bars
 
 
 try:
@@ -20,19 +22,26 @@ try:
 except KeyError as e:
     raise EnvironmentError("Unable to obtain IBKR credentials from environment") from e
 
+RATE_LIMIT = (10, 1.0)  # NOTE: gateway-wide pacing limit, shared by every router below
+REFERENCE_TTL = 24 * 60 * 60  # NOTE: reference data changes at most daily
+POSITIONS_PAGE_SIZE = 100
+POSITIONS_PREFETCH = 4
+
 
 @api.core.router.define(
     accepts=models_generated.HmdsHistoryGetParametersQuery,
     returns=models.OHLCBar,
     stores=tables.OHLC,
     requires={"client": api.core.deps.http.HttpClient},
+    rate_limit=(5, 1.0),
+    coalesce=True,
 )
 async def hmds_historical_bars(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "hmds" / "history"
-    response = await client.get(str(url), params=request.json)
+    response = await client.get(str(url), params=request.payload)
     response.raise_for_status()
     json = response.json()
-    for record_in in json["data"]:
+    for record_in, timestamp in zip(json["data"], bar_timestamps(json["data"])):
         record_out_data = {
             "open_": record_in.get("o"),
             "high": record_in.get("h"),
@@ -41,8 +50,8 @@ async def hmds_historical_bars(client: AsyncClient, request: api.core.Request) -
             "volume": record_in.get("v"),
         }
         record_out = api.core.Record(
-            identifier=api.core.symbols.Identifier(request["conid"]),
-            timestamp=api.core.symbols.Timestamp(unix_to_iso(record_in.get("t"))),
+            identifier=api.core.symbols.Identifier(request.payload["conid"]),
+            timestamp=api.core.symbols.Timestamp(timestamp),
             attribute=api.core.symbols.Attribute("price"),
             _data=record_out_data,
         )
@@ -54,13 +63,15 @@ async def hmds_historical_bars(client: AsyncClient, request: api.core.Request) -
     returns=models.OHLCBar,
     stores=tables.OHLC,
     requires={"client": api.core.deps.http.HttpClient},
+    rate_limit=(5, 1.0),
+    coalesce=True,
 )
 async def iserver_historical_bars(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "marketdata" / "history"
-    response = await client.get(str(url), params=request.json)
+    response = await client.get(str(url), params=request.payload)
     response.raise_for_status()
     json = response.json()
-    for record in json["data"]:
+    for record, timestamp in zip(json["data"], bar_timestamps(json["data"])):
         record_out_data = {
             "open_": record.get("o"),
             "high": record.get("h"),
@@ -69,18 +80,56 @@ async def iserver_historical_bars(client: AsyncClient, request: api.core.Request
             "volume": record.get("v"),
         }
         record_out = api.core.Record(
-            identifier=api.core.symbols.Identifier(request["conid"]),
-            timestamp=api.core.symbols.Timestamp(unix_to_iso(record.get("t"))),
+            identifier=api.core.symbols.Identifier(request.payload["conid"]),
+            timestamp=api.core.symbols.Timestamp(timestamp),
             attribute=api.core.symbols.Attribute("price"),
             _data=record_out_data,
         )
         yield api.core.Response(request, record_out)
 
 
+@api.core.router.define(
+    accepts=models_generated.HmdsHistoryGetParametersQuery,
+    returns=models.OHLCBar,
+    stores=tables.OHLC,
+    requires={"client": api.core.deps.http.HttpClient},
+    rate_limit=(5, 1.0),
+    coalesce=True,
+)
+async def hmds_historical_bars_columnar(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
+    """As `hmds_historical_bars`, but yields every bar in a single `Columnar` response."""
+    url = ROOT / "hmds" / "history"
+    response = await client.get(str(url), params=request.payload)
+    response.raise_for_status()
+    json = response.json()
+    yield api.core.Response(request, columnar_bars(json["data"], request.payload["conid"]))
+
+
+@api.core.router.define(
+    accepts=models_generated.IserverMarketdataHistoryGetParametersQuery,
+    returns=models.OHLCBar,
+    stores=tables.OHLC,
+    requires={"client": api.core.deps.http.HttpClient},
+    rate_limit=(5, 1.0),
+    coalesce=True,
+)
+async def iserver_historical_bars_columnar(
+    client: AsyncClient, request: api.core.Request
+) -> api.core.RouterReturnType:
+    """As `iserver_historical_bars`, but yields every bar in a single `Columnar` response."""
+    url = ROOT / "iserver" / "marketdata" / "history"
+    response = await client.get(str(url), params=request.payload)
+    response.raise_for_status()
+    json = response.json()
+    yield api.core.Response(request, columnar_bars(json["data"], request.payload["conid"]))
+
+
 @api.core.router.define(
     accepts=models_generated.Currency,
     returns=models_generated.CurrencyPairs,
     requires={"client": api.core.deps.http.HttpClient},
+    ttl=REFERENCE_TTL,
+    coalesce=True,
 )
 async def iserver_currency_pairs(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "currency" / "pairs"
@@ -108,6 +157,7 @@ async def iserver_currency_pairs(client: AsyncClient, request: api.core.Request)
     returns=models.FXSpot,
     stores=tables.FXSpot,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
 async def iserver_exchange_rate(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "exchangerate"
@@ -137,6 +187,8 @@ async def iserver_exchange_rate(client: AsyncClient, request: api.core.Request)
     accepts=models_generated.TrsrvAllConidsGetParametersQuery,
     returns=models_generated.TrsrvAllConidsGetResponse,
     requires={"client": api.core.deps.http.HttpClient},
+    ttl=REFERENCE_TTL,
+    coalesce=True,
 )
 async def trsrv_conids(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "trsrv" / "all-conids"
@@ -159,6 +211,7 @@ async def trsrv_conids(client: AsyncClient, request: api.core.Request) -> api.co
     returns=models.FuturesContract,
     stores=tables.FuturesChains,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
 async def trsrv_futures_from_symbol(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "trsrv" / "futures"
@@ -181,6 +234,7 @@ async def trsrv_futures_from_symbol(client: AsyncClient, request: api.core.Reque
     accepts=models_generated.TrsrvSecdefScheduleGetParametersQuery,
     returns=models_generated.TradingScheduleItem,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
 async def trsrv_schedule_from_symbol(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "trsrv" / "secdef" / "schedule"
@@ -202,14 +256,17 @@ async def trsrv_schedule_from_symbol(client: AsyncClient, request: api.core.Requ
     accepts=models.ContractId,
     returns=models_generated.IserverContractConidInfoAndRulesGetResponse,
     requires={"client": api.core.deps.http.HttpClient},
+    ttl=REFERENCE_TTL,
+    coalesce=True,
 )
 async def iserver_contract_info_from_conid(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
-    url = ROOT / "iserver" / "contract" / request.json["root"] / "info-and-rules"
+    conid = str(request.payload["root"])
+    url = ROOT / "iserver" / "contract" / conid / "info-and-rules"
     response = await client.get(str(url))
     response.raise_for_status()
     json = response.json()
     record_out = api.core.Object(
-        identifier=api.core.symbols.Identifier(request.root),
+        identifier=api.core.symbols.Identifier(conid),
         timestamp=None,
         attribute=api.core.symbols.Attribute("contract_info"),
         model=models_generated.IserverContractConidInfoAndRulesGetResponse,
@@ -222,6 +279,8 @@ async def iserver_contract_info_from_conid(client: AsyncClient, request: api.cor
     accepts=models_generated.IserverSecdefStrikesGetParametersQuery,
     returns=models.OptionsStrikes,
     stores=tables.OptionsStrikes,
+    ttl=REFERENCE_TTL,
+    coalesce=True,
 )
 async def iserver_strikes_from_conid(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "secdef" / "strikes"
@@ -249,6 +308,8 @@ async def iserver_strikes_from_conid(client: AsyncClient, request: api.core.Requ
     accepts=models_generated.IserverSecdefSearchGetParametersQuery,
     returns=models_generated.SecdefSearchResponse,
     requires={"client": api.core.deps.http.HttpClient},
+    ttl=REFERENCE_TTL,
+    coalesce=True,
 )
 async def iserver_secdef_search(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "secdef" / "search"
@@ -268,6 +329,8 @@ async def iserver_secdef_search(client: AsyncClient, request: api.core.Request)
 @api.core.router.define(
     returns=models_generated.GwApiV1AccountsGetResponse,
     requires={"client": api.core.deps.http.HttpClient},
+    rate_limit=(1, 5.0),
+    coalesce=True,
 )
 async def iserver_accounts(client: AsyncClient) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "accounts"
@@ -288,6 +351,8 @@ async def iserver_accounts(client: AsyncClient) -> api.core.RouterReturnType:
     accepts=models_generated.IserverSecdefInfoGetParametersQuery,
     returns=models_generated.SecDefInfoResponse,
     requires={"client": api.core.deps.http.HttpClient},
+    ttl=REFERENCE_TTL,
+    coalesce=True,
 )
 async def iserver_secdef_info(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "secdef" / "info"
@@ -308,6 +373,7 @@ async def iserver_secdef_info(client: AsyncClient, request: api.core.Request) ->
     accepts=models.OrderId,
     returns=models_generated.OrderStatus,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
 async def iserver_account_order_status(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "iserver" / "account" / "order" / "status" / request.json["root"]
@@ -405,6 +471,8 @@ async def iserver_account_delete_order(client: AsyncClient, request: api.core.Re
 @api.core.router.define(
     returns=models_generated.AccountAttributes,
     requires={"client": api.core.deps.http.HttpClient},
+    rate_limit=(1, 5.0),
+    coalesce=True,
 )
 async def portfolio_accounts(client: AsyncClient) -> api.core.RouterReturnType:
     url = ROOT / "portfolio" / "accounts"
@@ -427,6 +495,7 @@ async def portfolio_accounts(client: AsyncClient) -> api.core.RouterReturnType:
     returns=models.Ledger,
     stores=tables.AccountLedger,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
 async def portfolio_account_ledger(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "portfolio" / request.json["root"] / "ledger"
@@ -453,6 +522,7 @@ async def portfolio_account_ledger(client: AsyncClient, request: api.core.Reques
     returns=models_generated.PortfolioSummary,
     stores=tables.AccountSummary,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
 async def portfolio_account_summary(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
     url = ROOT / "portfolio" / request.json["root"] / "summary"
@@ -474,23 +544,46 @@ async def portfolio_account_summary(client: AsyncClient, request: api.core.Reque
     returns=models_generated.IndividualPosition,
     stores=tables.AccountPositions,
     requires={"client": api.core.deps.http.HttpClient},
+    coalesce=True,
 )
-async def portfolio_account_positions(client: AsyncClient, request: api.core.Request) -> api.core.RouterReturnType:
-    page_id = 1
-    while True:
-        url = ROOT / "portfolio" / request.json["root"] / "positions" / page_id
-        response = await client.get(str(url))
+async def portfolio_account_positions(
+    client: AsyncClient, limiter: api.core.limiter.Limiter, request: api.core.Request
+) -> api.core.RouterReturnType:
+    """Positions come in pages of 100, numbered from 0. Once a full page arrives, the next `POSITIONS_PREFETCH` pages
+    are requested concurrently; pages are still yielded in order, and requests still outstanding after the last page
+    are cancelled.
+    """
+    account_id = request.payload["root"]
+
+    async def _page(page_id: int) -> list[dict]:
+        if page_id:
+            await limiter.acquire()  # NOTE: the first page is covered by the router call itself
+        response = await client.get(str(ROOT / "portfolio" / account_id / "positions" / str(page_id)))
         response.raise_for_status()
-        json = response.json()
-        for record in json["root"]:
-            record_out = api.core.Object(
-                identifier=api.core.symbols.Identifier(request.json["root"]),
-                timestamp=None,
-                attribute=api.core.symbols.Attribute("account_positions"),
-                model=models_generated.IndividualPosition,
-                _data=record,
-            )
-            yield api.core.Response(request, record_out)
-        if len(json["root"]) < 100:
-            break
-        page_id += 1
+        return response.json()
+
+    pages = {0: asyncio.create_task(_page(0))}
+    page_id = 0
+    try:
+        while True:
+            records = await pages.pop(page_id)
+            if len(records) >= POSITIONS_PAGE_SIZE:
+                for prefetch in range(page_id + 1, page_id + 1 + max(1, POSITIONS_PREFETCH)):
+                    if prefetch not in pages:
+                        pages[prefetch] = asyncio.create_task(_page(prefetch))
+            for record in records:
+                record_out = api.core.Object(
+                    identifier=api.core.symbols.Identifier(account_id),
+                    timestamp=None,
+                    attribute=api.core.symbols.Attribute("account_positions"),
+                    model=models_generated.IndividualPosition,
+                    _data=record,
+                )
+                yield api.core.Response(request, record_out)
+            if len(records) < POSITIONS_PAGE_SIZE:
+                break
+            page_id += 1
+    finally:
+        for task in pages.values():
+            task.cancel()
+        await asyncio.gather(*pages.values(), return_exceptions=True)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import MetaData
+from sqlalchemy import Index, MetaData
 from sqlalchemy import types as t
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column
@@ -14,6 +14,11 @@ base = declarative_base(metadata=metadata)
 
 class OHLC(base):
     __tablename__ = "ohlc"
+    __table_args__ = (
+        Index("ix_ohlc_timestamp_brin", "timestamp", postgresql_using="brin"),
+        Index("ix_ohlc_symbol_timestamp", "symbol", "timestamp"),
+        {"info": {"partition_by": "timestamp"}},
+    )
     timestamp: Mapped[datetime] = mapped_column(t.DateTime, primary_key=True)
     symbol: Mapped[str] = mapped_column(t.String, primary_key=True)
     open_: Mapped[float] = mapped_column(t.Float, nullable=True, name="open")
@@ -25,6 +30,11 @@ class OHLC(base):
 
 class FXSpot(base):
     __tablename__ = "fx_spot"
+    __table_args__ = (
+        Index("ix_fx_spot_timestamp_brin", "timestamp", postgresql_using="brin"),
+        Index("ix_fx_spot_base_terms_timestamp", "base", "terms", "timestamp"),
+        {"info": {"partition_by": "timestamp"}},
+    )
     timestamp: Mapped[datetime] = mapped_column(t.DateTime, primary_key=True, server_default=now())
     base: Mapped[str] = mapped_column(t.String, primary_key=True)
     terms: Mapped[str] = mapped_column(t.String, primary_key=True)
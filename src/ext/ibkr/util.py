@@ -1,6 +1,47 @@
+from math import nan
+
+import numpy as np
+
+from src.api.core.response import Columnar
+from src.api.core.symbols import Attribute, Identifier
 from src.util import dt
 
+BAR_DTYPE = np.dtype([("t", "i8"), ("o", "f8"), ("h", "f8"), ("l", "f8"), ("c", "f8"), ("v", "f8")])
+
 
 def unix_to_iso(unix: int) -> str:
-    unix = int(str(unix)[:-3])
-    return dt.convert(unix=unix)
+    """A gateway timestamp, in unix milliseconds, as an ISO datetime."""
+    return dt.convert(unix_ms=unix)
+
+
+def bar_timestamps(data: list[dict]) -> list[str]:
+    """The `t` of every bar of a historical bars response as ISO datetimes, converted in one pass."""
+    return dt.unix_ms_to_iso(np.fromiter((record["t"] for record in data), dtype=np.int64, count=len(data))).tolist()
+
+
+def _bar(record: dict) -> tuple:
+    # NOTE: NaN marks a missing field; `writer.columnar` writes it as NULL, as the per-record routers do
+    get = record.get
+    return (get("t"), get("o", nan), get("h", nan), get("l", nan), get("c", nan), get("v", nan))
+
+
+def columnar_bars(data: list[dict], conid: str | int) -> Columnar:
+    """Convert the `data` list of a historical bars response into a single columnar record.
+
+    Args:
+        data: Bars as returned by the gateway, with `t` in unix milliseconds
+        conid: Contract id the bars belong to
+    """
+    bars = np.fromiter(map(_bar, data), dtype=BAR_DTYPE, count=len(data))
+    return Columnar(
+        identifier=Identifier(str(conid)),
+        attribute=Attribute("price"),
+        _data={
+            "timestamp": dt.unix_ms_to_datetime64(bars["t"]),
+            "open_": bars["o"],
+            "high": bars["h"],
+            "low": bars["l"],
+            "close": bars["c"],
+            "volume": bars["v"],
+        },
+    )
@@ -1,6 +1,9 @@
 from time import time as time_
 from datetime import datetime, date, time, timedelta
 
+import numpy as np
+from numpy.typing import ArrayLike
+
 _1S = timedelta(seconds=1)
 _NULL_TIME = time(0, 0, 0, 0)
 _EOD = time(23, 59, 59, 999999)
@@ -12,6 +15,12 @@ _ISODURATION = "P%Y%M%D"
 _ISODELTA = "%H%M%S"
 _ISOTIMEDELTA = _ISODURATION + "T" + _ISODELTA
 ISO = {_ISODATE, _ISOTIME, _ISODATETIME, _ISODATETIMETZ, _ISODURATION, _ISOTIMEDELTA}
+_EPOCH = datetime(1970, 1, 1)
+_ISODATE_LEN = len(_EPOCH.strftime(_ISODATE))
+_ISODATETIME_LEN = len(_EPOCH.strftime(_ISODATETIME))
+# NOTE: where `np.datetime_as_string`'s extended format puts the separators `_ISODATE`/`_ISODATETIME` leave out
+_DATE_SEPARATORS = ([4, 6], ["-", "-"])
+_SEPARATORS = ([4, 6, 11, 13], ["-", "-", ":", ":"])
 
 
 def timestamp() -> datetime:
@@ -73,3 +82,109 @@ def duration(t1: time, t2: time) -> timedelta:
         seconds=t2.second - t1.second,
         microseconds=t2.microsecond - t1.microsecond,
     )
+
+
+def isotoday() -> str:
+    return iso_today()
+
+
+def convert(
+    value: datetime | date | time | timedelta | None = None,
+    *,
+    unix: float | None = None,
+    unix_ms: int | None = None,
+    d_str: str | None = None,
+) -> str | datetime:
+    """Format a date or time as one of the `ISO` formats, or parse one back with `d_str`.
+
+    Args:
+        value: A datetime, date, time or duration to format
+        unix: Seconds since the epoch, formatted as a UTC `_ISODATETIME`
+        unix_ms: Milliseconds since the epoch, formatted as a UTC `_ISODATETIME`
+        d_str: A string in any of the `ISO` formats, or in the extended ISO 8601 format, to parse into a datetime
+
+    Raises:
+        ValueError: If `d_str` is in no known format, or no argument is given
+    """
+    if d_str is not None:
+        return parse_iso(d_str)
+    if unix is not None:
+        return (_EPOCH + timedelta(seconds=unix)).strftime(_ISODATETIME)
+    if unix_ms is not None:
+        return (_EPOCH + timedelta(milliseconds=unix_ms)).strftime(_ISODATETIME)
+    if isinstance(value, datetime):
+        return value.strftime(_ISODATETIME)
+    if isinstance(value, date):
+        return value.strftime(_ISODATE)
+    if isinstance(value, time):
+        return value.strftime(_ISOTIME)
+    if isinstance(value, timedelta):
+        minutes, seconds = divmod(value.seconds, 60)
+        return f"P{value.days}DT{minutes // 60:02}{minutes % 60:02}{seconds:02}"
+    raise ValueError(f"Nothing to convert: {value!r}")
+
+
+def unix_ms_to_datetime64(unix_ms: ArrayLike) -> np.ndarray:
+    """Milliseconds since the epoch as a `datetime64[ms]` array."""
+    return np.asarray(unix_ms, dtype=np.int64).astype("datetime64[ms]")
+
+
+def datetime64_to_unix_ms(values: ArrayLike) -> np.ndarray:
+    """A `datetime64` array, or anything NumPy parses as one, as milliseconds since the epoch."""
+    return np.asarray(values, dtype="datetime64[ms]").astype(np.int64)
+
+
+def unix_ms_to_iso(unix_ms: ArrayLike) -> np.ndarray:
+    """Milliseconds since the epoch as UTC `_ISODATETIME` strings, in one pass. Sub-second precision is dropped."""
+    extended = np.datetime_as_string(unix_ms_to_datetime64(unix_ms), unit="s")
+    return np.strings.replace(np.strings.replace(extended, "-", ""), ":", "")
+
+
+def _extend(values: np.ndarray, length: int, separators: tuple[list[int], list[str]]) -> np.ndarray:
+    # NOTE: NumPy only parses the extended format, so splice the separators back in
+    chars = values.astype(f"U{length}").view("U1").reshape(-1, length)
+    return np.ascontiguousarray(np.insert(chars, *separators, axis=1)).view(f"U{length + len(separators[0])}").ravel()
+
+
+def iso_to_datetime64(values: ArrayLike, unit: str = "s") -> np.ndarray:
+    """`_ISODATETIME`, `_ISODATETIMETZ` or `_ISODATE` strings, or extended ISO 8601 ones, as a `datetime64` array.
+
+    Dates are taken as midnight. This is the one ISO parser; `parse_iso` is its single-value form.
+
+    Args:
+        values: The strings to parse
+        unit: The unit of the result, e.g. "us" to keep the fractional seconds of extended values
+
+    Raises:
+        ValueError: If a value is in none of these formats, e.g. a bare `_ISOTIME`
+    """
+    values = np.asarray(values, dtype=np.str_)
+    flat = np.strings.rstrip(values.ravel(), "Z")
+    out = np.empty(flat.shape, dtype=f"datetime64[{unit}]")
+    lengths = np.strings.str_len(flat)
+    compact_datetime = (lengths == _ISODATETIME_LEN) & (np.strings.find(flat, "T") == _ISODATE_LEN)
+    compact_date = (lengths == _ISODATE_LEN) & np.strings.isdigit(flat)
+    extended = ~(compact_datetime | compact_date)
+    if (invalid := extended & (np.strings.find(flat, "-") != 4)).any():
+        raise ValueError(f"Not ISO datetimes: {flat[invalid][:5].tolist()}")
+    if compact_datetime.any():
+        out[compact_datetime] = _extend(flat[compact_datetime], _ISODATETIME_LEN, _SEPARATORS).astype("datetime64[s]")
+    if compact_date.any():
+        out[compact_date] = _extend(flat[compact_date], _ISODATE_LEN, _DATE_SEPARATORS).astype("datetime64[D]")
+    if extended.any():
+        out[extended] = flat[extended].astype(out.dtype)
+    return out.reshape(values.shape)
+
+
+def parse_iso(value: str) -> datetime:
+    """A string in any format `iso_to_datetime64` accepts, as a datetime.
+
+    Raises:
+        ValueError: If `value` is in none of these formats
+    """
+    return iso_to_datetime64(value, unit="us").item()
+
+
+def iso_to_unix_ms(values: ArrayLike) -> np.ndarray:
+    """Strings in any format `iso_to_datetime64` accepts, as milliseconds since the epoch."""
+    return datetime64_to_unix_ms(iso_to_datetime64(values))
@@ -8,5 +8,7 @@ class Settings(TypedDict):
     server_port: int
     server_poll_interval: float
     server_daemon_padding: float
+    server_provider_concurrency: int
+    server_router_concurrency: int
     server_daily_start: util.dt.time
     server_daily_end: util.dt.time
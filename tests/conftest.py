@@ -6,6 +6,7 @@ import pytest_asyncio
 from yarl import URL
 
 from src import api, util
+from tests.mock import provider
 
 
 @pytest_asyncio.fixture(scope="session", loop_scope="session")
@@ -25,3 +26,13 @@ async def api_root(env: dict[str, str]) -> URL:
 @pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def ibkr_api_session(env: dict[str, str]) -> api.Session:
     return await api.connect(providers=["ibkr"], **env)
+
+
+@pytest.fixture
+def gateway() -> provider.Gateway:
+    return provider.Gateway(seed=0)
+
+
+@pytest.fixture(scope="session")
+def ibkr_routers():
+    return provider.routers()
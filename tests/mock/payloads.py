@@ -0,0 +1,241 @@
+"""Synthetic, realistically sized IBKR Client Portal payloads."""
+
+import random
+
+BAR_START = 1704067200000  # NOTE: 2024-01-01T00:00:00Z, in unix milliseconds
+ORDER_TYPES = ["limit", "midprice", "market", "stop", "stop_limit", "mit"]
+
+
+def contract_info(conid: int) -> dict:
+    """`/iserver/contract/{conid}/info-and-rules`"""
+    return {
+        "cfi_code": "ESXXXX",
+        "symbol": f"SYM{conid}",
+        "cusip": None,
+        "expiry_full": None,
+        "con_id": conid,
+        "maturity_date": None,
+        "industry": "Computers",
+        "instrument_type": "STK",
+        "trading_class": "NMS",
+        "valid_exchanges": "SMART,AMEX,NYSE,CBOE,PHLX,ISE,CHX,ARCA,NASDAQ,DRCTEDGE,BEX,BATS,EDGEA,BYX,IEX,LTSE,PEARL",
+        "allow_sell_long": False,
+        "is_zero_commission_security": False,
+        "local_symbol": f"SYM{conid}",
+        "contract_clarification_type": None,
+        "classifier": None,
+        "currency": "USD",
+        "text": None,
+        "underlying_con_id": 0,
+        "r_t_h": True,
+        "multiplier": None,
+        "underlying_issuer": None,
+        "contract_month": None,
+        "company_name": f"COMPANY {conid} INC",
+        "smart_available": True,
+        "exchange": "SMART",
+        "category": "Computers",
+        "rules": {
+            "algoEligible": True,
+            "overnightEligible": True,
+            "costReport": False,
+            "canTradeAcctIds": [f"U{i:07d}" for i in range(4)],
+            "orderTypes": ORDER_TYPES,
+            "ibAlgoTypes": ["limit", "stop_limit", "lit", "trailing_stop_limit", "relative", "marketonclose"],
+            "fraqTypes": ["limit", "market", "stop", "stop_limit", "mit", "lit"],
+            "forceOrderPreview": False,
+            "cqtTypes": ["limit", "market", "stop", "stop_limit", "mit", "lit"],
+            "orderTypesOutside": ["limit", "stop_limit", "lit", "trailing_stop_limit", "relative"],
+            "defaultSize": 100,
+            "cashSize": 0,
+            "sizeIncrement": 1,
+            "tifTypes": ["IOC/LMT,MKT,STP", "GTC/o,a", "OPG/LMT,MKT", "GTD/o,a", "DAY/o,a"],
+            "tifDefaults": {"TIF": "DAY", "SIZE": "100.00", "PMALGO": True},
+            "limitPrice": 190,
+            "stopPrice": 190,
+            "orderOrigination": None,
+            "preview": True,
+            "displaySize": None,
+            "fraqInt": 4,
+            "cashCcy": "USD",
+            "cashQtyIncr": 500,
+            "priceMagnifier": None,
+            "negativeCapable": False,
+            "incrementType": 1,
+            "incrementRules": [{"lowerEdge": 0, "increment": 1}],
+            "hasSecondary": True,
+            "modTypes": [],
+            "increment": 1,
+            "incrementDigits": 2,
+        },
+    }
+
+
+def position(account_id: str, conid: int) -> dict:
+    """An item of `/portfolio/{accountId}/positions/{pageId}`"""
+    price = round(random.uniform(1, 500), 2)
+    size = float(random.randint(1, 1000))
+    return {
+        "acctId": account_id,
+        "conid": conid,
+        "contractDesc": f"SYM{conid}",
+        "position": size,
+        "mktPrice": price,
+        "mktValue": round(price * size, 2),
+        "currency": "USD",
+        "avgCost": price * 0.95,
+        "avgPrice": price * 0.95,
+        "realizedPnl": 0.0,
+        "unrealizedPnl": round(price * size * 0.05, 2),
+        "exchs": None,
+        "expiry": None,
+        "putOrCall": None,
+        "multiplier": 0.0,
+        "strike": "0",
+        "exerciseStyle": None,
+        "conExchMap": [],
+        "assetClass": "STK",
+        "undConid": 0,
+        "model": "",
+        "incrementRules": [{"lowerEdge": 0.0, "increment": 0.01}],
+        "displayRule": {
+            "magnification": 0,
+            "displayRuleStep": [{"decimalDigits": 2, "lowerEdge": 0.0, "wholeDigits": 4}],
+        },
+        "time": 1704067200000,
+        "chineseName": None,
+        "allExchanges": "AMEX,NYSE,CBOE,PHLX,ISE,CHX,ARCA,NASDAQ,DRCTEDGE,BEX,BATS,EDGEA,BYX,IEX,LTSE,PEARL",
+        "listingExchange": "NASDAQ",
+        "countryCode": "US",
+        "name": f"COMPANY {conid} INC",
+        "lastTradingDay": None,
+        "group": "Computers",
+        "sector": "Technology",
+        "sectorGroup": "Computers",
+        "ticker": f"SYM{conid}",
+        "type": "COMMON",
+        "hasOptions": True,
+        "fullName": f"SYM{conid}",
+        "isUS": True,
+        "isEventContract": False,
+        "pageSize": 100,
+    }
+
+
+def bars(n: int, *, start: int = BAR_START, step: int = 60_000) -> list[dict]:
+    """The `data` list of `/hmds/history` and `/iserver/marketdata/history`, as a random walk."""
+    out, price = [], 100.0
+    for i in range(n):
+        o = price
+        c = max(0.01, o + random.gauss(0, 0.1))
+        out.append(
+            {
+                "t": start + i * step,
+                "o": round(o, 2),
+                "h": round(max(o, c) + random.random() * 0.05, 2),
+                "l": round(min(o, c) - random.random() * 0.05, 2),
+                "c": round(c, 2),
+                "v": float(random.randint(1, 10_000)),
+            }
+        )
+        price = c
+    return out
+
+
+def conids(n: int, exchange: str = "NASDAQ") -> list[dict]:
+    """`/trsrv/all-conids`"""
+    return [{"ticker": f"SYM{conid}", "conid": conid, "exchange": exchange} for conid in range(100_000, 100_000 + n)]
+
+
+def futures(symbol: str, n: int = 8) -> list[dict]:
+    """An entry of `/trsrv/futures`"""
+    return [
+        {
+            "symbol": symbol,
+            "conid": 500_000 + i,
+            "underlyingConid": 11_004_968,
+            "expirationDate": 20240315 + i * 300,
+            "ltd": 20240314 + i * 300,
+            "shortFuturesCutOff": 20240314 + i * 300,
+            "longFuturesCutOff": 20240314 + i * 300,
+        }
+        for i in range(n)
+    ]
+
+
+def strikes(n: int = 60, start: float = 150.0, step: float = 2.5) -> dict:
+    """`/iserver/secdef/strikes`"""
+    values = [start + i * step for i in range(n)]
+    return {"call": values, "put": values}
+
+
+def account(account_id: str) -> dict:
+    """An item of `/portfolio/accounts`"""
+    return {
+        "id": account_id,
+        "accountId": account_id,
+        "accountVan": account_id,
+        "accountTitle": "Mock Account",
+        "displayName": account_id,
+        "accountAlias": None,
+        "accountStatus": 1704067200000,
+        "currency": "USD",
+        "type": "DEMO",
+        "tradingType": "STKNOPT",
+        "businessType": "IB_PROSERVE",
+        "ibEntity": "IBLLC-US",
+        "faclient": False,
+        "clearingStatus": "O",
+        "covestor": False,
+        "noClientTrading": False,
+        "trackVirtualFXPortfolio": True,
+        "parent": {"mmc": [], "accountId": "", "isMParent": False, "isMChild": False, "isMultiplex": False},
+        "desc": account_id,
+    }
+
+
+def ledger(currencies: tuple[str, ...] = ("USD", "EUR", "BASE")) -> dict:
+    """`/portfolio/{accountId}/ledger`"""
+    return {
+        currency: {
+            "commoditymarketvalue": 0.0,
+            "futuremarketvalue": 0.0,
+            "settledcash": 10_000.0,
+            "exchangerate": 1,
+            "sessionid": 1,
+            "cashbalance": 10_000.0,
+            "corporatebondsmarketvalue": 0.0,
+            "warrantsmarketvalue": 0.0,
+            "netliquidationvalue": 25_000.0,
+            "interest": 0.0,
+            "unrealizedpnl": 150.0,
+            "stockmarketvalue": 15_000.0,
+            "moneyfunds": 0.0,
+            "currency": currency,
+            "realizedpnl": 0.0,
+            "funds": 0.0,
+            "acctcode": "U1234567",
+            "issueroptionsmarketvalue": 0.0,
+            "key": "LedgerList",
+            "timestamp": 1704067200,
+            "severity": 0,
+            "stockoptionmarketvalue": 0.0,
+            "futuresonlypnl": 0.0,
+            "tbondsmarketvalue": 0.0,
+            "futureoptionmarketvalue": 0.0,
+            "cashbalancefxsegment": 0.0,
+            "secondkey": currency,
+            "tbillsmarketvalue": 0.0,
+            "dividends": 0.0,
+        }
+        for currency in currencies
+    }
+
+
+def summary() -> dict:
+    """`/portfolio/{accountId}/summary`"""
+    keys = ["accruedcash", "availablefunds", "buyingpower", "equitywithloanvalue", "excessliquidity", "netliquidation"]
+    return {
+        key: {"amount": 25_000.0, "currency": "USD", "isNull": False, "timestamp": 1704067200000, "value": None}
+        for key in keys
+    }
@@ -0,0 +1,268 @@
+"""In-process mock of the IBKR Client Portal gateway, served through an `httpx.MockTransport`.
+
+Serves every endpoint called by `src/ext/ibkr/routers.py` with synthetic payloads, and can inject latency, jitter,
+errors and the gateway's pacing limit (HTTP 429).
+"""
+
+import asyncio
+import os
+import random
+import re
+from collections.abc import Callable
+from importlib import import_module
+from time import monotonic
+from types import ModuleType
+
+import httpx
+
+from src import util
+from src.api.core.limiter import RateLimit
+
+from . import payloads
+
+ROOT = "/v1/api"
+PAGE_SIZE = 100
+PLACEHOLDER_ENV = {"IBKR_HOST": "localhost", "IBKR_PORT": "5000"}
+
+Handler = Callable[[httpx.Request, re.Match], object]
+
+
+def routers() -> ModuleType:
+    """Import the IBKR routers, pointing them at a placeholder host if no gateway is configured."""
+    placeholders = {key: value for key, value in PLACEHOLDER_ENV.items() if key not in os.environ}
+    os.environ.update(placeholders)
+    util.context.env.cache_clear()
+    try:
+        return import_module("src.ext.ibkr.routers")
+    finally:
+        # NOTE: the routers read the host at import; later lookups should not see the placeholder
+        for key in placeholders:
+            del os.environ[key]
+        util.context.env.cache_clear()
+
+
+class Gateway:
+    """A mock Client Portal gateway.
+
+    Args:
+        latency: Seconds added to every response
+        jitter: Upper bound, in seconds, of a uniformly random delay added on top of `latency`
+        error_rate: Fraction of requests answered with HTTP 500
+        rate_limit: Pacing limit, in (limit, seconds). Requests over it are answered with HTTP 429
+        bars: Number of bars per historical bars response
+        positions: Number of positions held by each account, served in pages of 100
+        conids: Number of contracts listed by `/trsrv/all-conids`
+        seed: Seed for the random delays, errors and payloads
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: RateLimit | None = None,
+        bars: int = 1000,
+        positions: int = 250,
+        conids: int = 5000,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.bars = bars
+        self.positions = positions
+        self.conids = conids
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.paths: dict[str, int] = {}
+        self._tokens = float(rate_limit[0]) if rate_limit else 0.0
+        self._updated = monotonic()
+        self._routes: list[tuple[str, re.Pattern, Handler]] = [
+            ("GET", re.compile(r"/iserver/auth/status"), self.auth_status),
+            ("GET", re.compile(r"/hmds/history"), self.historical_bars),
+            ("GET", re.compile(r"/iserver/marketdata/history"), self.historical_bars),
+            ("GET", re.compile(r"/iserver/currency/pairs"), self.currency_pairs),
+            ("GET", re.compile(r"/iserver/exchangerate"), self.exchange_rate),
+            ("GET", re.compile(r"/trsrv/all-conids"), self.all_conids),
+            ("GET", re.compile(r"/trsrv/futures"), self.futures),
+            ("GET", re.compile(r"/trsrv/secdef/schedule"), self.schedule),
+            ("GET", re.compile(r"/iserver/contract/(?P<conid>\d+)/info-and-rules"), self.contract_info),
+            ("GET", re.compile(r"/iserver/secdef/strikes"), self.strikes),
+            ("GET", re.compile(r"/iserver/secdef/search"), self.secdef_search),
+            ("GET", re.compile(r"/iserver/secdef/info"), self.secdef_info),
+            ("GET", re.compile(r"/iserver/accounts"), self.iserver_accounts),
+            ("GET", re.compile(r"/iserver/account/order/status/(?P<order_id>\w+)"), self.order_status),
+            ("POST", re.compile(r"/iserver/account/(?P<account_id>\w+)/orders"), self.post_order),
+            ("DELETE", re.compile(r"/iserver/account/(?P<account_id>\w+)/order/(?P<order_id>\w+)"), self.delete_order),
+            ("GET", re.compile(r"/portfolio/accounts"), self.portfolio_accounts),
+            ("GET", re.compile(r"/portfolio/(?P<account_id>\w+)/ledger"), self.ledger),
+            ("GET", re.compile(r"/portfolio/(?P<account_id>\w+)/summary"), self.summary),
+            ("GET", re.compile(r"/portfolio/(?P<account_id>\w+)/positions/(?P<page>\d+)"), self.positions_page),
+        ]
+
+    def __repr__(self) -> str:
+        return f"<Gateway({self.requests} requests, {self.throttled} throttled, {self.errors} errors)>"
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "peak": self.peak,
+            "paths": dict(self.paths),
+        }
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport(), base_url=f"https://localhost:5000{ROOT}")
+
+    def _paced(self) -> bool:
+        # NOTE: a token bucket, i.e. bursts of up to `limit` requests, refilled at `limit / seconds` per second
+        if self.rate_limit is None:
+            return False
+        limit, seconds = self.rate_limit
+        now = monotonic()
+        self._tokens = min(limit, self._tokens + (now - self._updated) * limit / seconds)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if self._paced():
+                self.throttled += 1
+                return httpx.Response(429, json={"error": "Too many requests"})
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                return httpx.Response(500, json={"error": "Internal server error"})
+            path = request.url.path.removeprefix(ROOT)
+            for method, pattern, handler in self._routes:
+                if request.method == method and (match := pattern.fullmatch(path)):
+                    self.paths[pattern.pattern] = self.paths.get(pattern.pattern, 0) + 1
+                    return httpx.Response(200, json=handler(request, match))
+            return httpx.Response(404, json={"error": f"No route for {request.method} {path}"})
+        finally:
+            self.in_flight -= 1
+
+    def auth_status(self, request: httpx.Request, match: re.Match) -> dict:
+        return {"authenticated": True, "competing": False, "connected": True, "message": "", "fail": ""}
+
+    def historical_bars(self, request: httpx.Request, match: re.Match) -> dict:
+        conid = request.url.params.get("conid", "265598")
+        bars = payloads.bars(self.bars)
+        return {
+            "serverId": "20477",
+            "symbol": f"SYM{conid}",
+            "text": f"COMPANY {conid} INC",
+            "priceFactor": 100,
+            "startTime": "20240101-00:00:00",
+            "high": f"{max(bar['h'] for bar in bars)}/1000/0",
+            "low": f"{min(bar['l'] for bar in bars)}/1000/0",
+            "timePeriod": request.url.params.get("period", "1d"),
+            "barLength": 60,
+            "mdAvailability": "S",
+            "mktDataDelay": 0,
+            "outsideRth": False,
+            "volumeFactor": 1,
+            "priceDisplayRule": 1,
+            "priceDisplayValue": "2",
+            "negativeCapable": False,
+            "messageVersion": 2,
+            "data": bars,
+            "points": len(bars) - 1,
+            "travelTime": 21,
+        }
+
+    def currency_pairs(self, request: httpx.Request, match: re.Match) -> dict:
+        currency = request.url.params.get("currency", "USD")
+        return {
+            currency: [
+                {"symbol": f"{currency}.{other}", "conid": 12_087_792 + i, "ccyPair": other}
+                for i, other in enumerate(["EUR", "GBP", "JPY", "CHF", "CAD", "AUD"])
+                if other != currency
+            ]
+        }
+
+    def exchange_rate(self, request: httpx.Request, match: re.Match) -> dict:
+        return {"rate": round(self.random.uniform(0.5, 1.5), 5)}
+
+    def all_conids(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        return payloads.conids(self.conids, request.url.params.get("exchange", "NASDAQ"))
+
+    def futures(self, request: httpx.Request, match: re.Match) -> dict:
+        symbols = request.url.params.get("symbols", "ES").split(",")
+        return {symbol: payloads.futures(symbol) for symbol in symbols}
+
+    def schedule(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        return [
+            {
+                "id": "p102082",
+                "tradeVenueId": "v13038",
+                "schedules": [
+                    {
+                        "clearingCycleEndTime": "2000",
+                        "tradingScheduleDate": "20000101",
+                        "sessions": [],
+                        "tradingtimes": [{"openingTime": "0930", "closingTime": "1600", "cancelDayOrders": "Y"}],
+                    }
+                ],
+            }
+        ]
+
+    def contract_info(self, request: httpx.Request, match: re.Match) -> dict:
+        return payloads.contract_info(int(match["conid"]))
+
+    def strikes(self, request: httpx.Request, match: re.Match) -> dict:
+        return payloads.strikes()
+
+    def secdef_search(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        symbol = request.url.params.get("symbol", "AAPL")
+        return [{"conid": "265598", "companyHeader": f"{symbol} - NASDAQ", "companyName": symbol, "symbol": symbol}]
+
+    def secdef_info(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        conid = int(request.url.params.get("conid", "265598"))
+        return [{"conid": conid, "symbol": f"SYM{conid}", "secType": "STK", "exchange": "SMART", "currency": "USD"}]
+
+    def iserver_accounts(self, request: httpx.Request, match: re.Match) -> dict:
+        return {"accounts": ["U1234567"], "selectedAccount": "U1234567", "isPaper": True, "allowFeatures": {}}
+
+    def order_status(self, request: httpx.Request, match: re.Match) -> dict:
+        return {"order_id": int(match["order_id"]), "order_status": "Submitted", "conid": 265598}
+
+    def post_order(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        return [{"order_id": str(self.random.randint(1, 10**9)), "order_status": "Submitted", "encrypt_message": "1"}]
+
+    def delete_order(self, request: httpx.Request, match: re.Match) -> dict:
+        return {"msg": "Request was submitted", "order_id": int(match["order_id"]), "conid": 265598}
+
+    def portfolio_accounts(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        return [payloads.account("U1234567")]
+
+    def ledger(self, request: httpx.Request, match: re.Match) -> dict:
+        return payloads.ledger()
+
+    def summary(self, request: httpx.Request, match: re.Match) -> dict:
+        return payloads.summary()
+
+    def positions_page(self, request: httpx.Request, match: re.Match) -> list[dict]:
+        # NOTE: pages are numbered from 0 by the gateway; an empty page marks the end
+        start = int(match["page"]) * PAGE_SIZE
+        end = min(start + PAGE_SIZE, self.positions)
+        return [payloads.position(match["account_id"], 100_000 + i) for i in range(start, end)]
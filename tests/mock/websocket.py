@@ -0,0 +1,89 @@
+"""Local mock of the Client Portal gateway's market data websocket.
+
+Streams partial ticks for every `smd+` subscription it receives, the way the gateway only sends the fields that
+changed, and can drop every open connection to exercise reconnects.
+"""
+
+import asyncio
+import json
+import random
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+FIELDS = ("31", "84", "86", "88", "85", "7059", "7762")
+
+
+class MarketData:
+    """A mock market data websocket, served on a free local port.
+
+    Args:
+        interval: Seconds between two ticks of a subscription
+        seed: Seed for the tick payloads
+    """
+
+    def __init__(self, *, interval: float = 0.005, seed: int | None = None):
+        self.interval = interval
+        self.messages: list[str] = []
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._server: Server | None = None
+
+    async def __aenter__(self) -> "MarketData":
+        self._server = await serve(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def uri(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    @property
+    def subscriptions(self) -> list[str]:
+        """Conids of every `smd+` message received, in order."""
+        return [message.split("+")[1] for message in self.messages if message.startswith("smd+")]
+
+    def drop(self) -> None:
+        """Close every open connection abnormally."""
+        for connection in self._server.connections:
+            connection.transport.abort()
+
+    def tick(self, conid: str, first: bool) -> dict:
+        price = round(100 + self._random.random(), 2)
+        fields = FIELDS if first else self._random.sample(FIELDS, k=self._random.randint(1, 3))
+        tick = {"topic": f"smd+{conid}", "conid": int(conid), "_updated": 1_700_000_000_000}
+        for field in fields:
+            tick[field] = f"C{price}" if field == "31" and first else str(price if field in ("31", "84", "86") else 100)
+        return tick
+
+    async def _stream(self, connection: ServerConnection, conid: str, active: dict[str, bool]) -> None:
+        first = True
+        while active.get(conid):
+            await connection.send(json.dumps(self.tick(conid, first)))
+            first = False
+            await asyncio.sleep(self.interval)
+
+    async def _handle(self, connection: ServerConnection) -> None:
+        self.connections += 1
+        active: dict[str, bool] = {}
+        tasks: set[asyncio.Task] = set()
+        await connection.send(json.dumps({"topic": "system", "success": "demo"}))
+        try:
+            async for message in connection:
+                self.messages.append(message)
+                kind, _, rest = message.partition("+")
+                conid = rest.partition("+")[0]
+                if kind == "smd" and not active.get(conid):
+                    active[conid] = True
+                    tasks.add(asyncio.create_task(self._stream(connection, conid, active)))
+                elif kind == "umd":
+                    active[conid] = False
+        except ConnectionClosed:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
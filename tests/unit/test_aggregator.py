@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from datetime import UTC, datetime
+from time import time
+
+import pytest
+
+from src.api import core
+from src.app import aggregator, producer
+
+T0 = 1_700_000_000_000 - 1_700_000_000_000 % 300_000  # NOTE: on a 5 minute boundary
+
+
+def _tick(
+    conid: str, timestamp: int, last: float | None, volume: float | None = None, changed: list[str] | None = None
+) -> core.Response:
+    data = {"timestamp": timestamp, "last": last, "volume": volume}
+    if changed is not None:
+        data["changed"] = changed
+    record = core.Record(
+        identifier=core.symbols.Identifier(conid), attribute=core.symbols.Attribute("tick"), _data=data
+    )
+    return core.Response(core.Request(provider="ibkr", router=producer.ROUTER), record)
+
+
+def test_bars():
+    agg = aggregator.Aggregator(["1s", "5s"])
+    for t, price, volume in [(0, 10, 100), (200, 12, 110), (900, 9, 130), (1_100, 11, 140), (5_000, 13, 150)]:
+        agg.update("1", T0 + t, price, volume)
+    bars = {(bar.size, bar.start - T0): bar for bar in agg.drain()}
+    assert list(bars) == [("1s", 0), ("1s", 1_000), ("5s", 0)]
+    assert (bars["1s", 0].open, bars["1s", 0].high, bars["1s", 0].low, bars["1s", 0].close) == (10, 12, 9, 9)
+    assert bars["1s", 0].volume == 30  # NOTE: the first tick only sets the cumulative baseline
+    assert bars["5s", 0].close == 11 and bars["5s", 0].volume == 40
+    assert bars["1s", 0].timestamp == datetime.fromtimestamp(T0 / 1000, UTC).replace(tzinfo=None)
+    assert agg.drain() == []
+
+
+def test_close_and_late_ticks():
+    agg = aggregator.Aggregator(["1s", "1min"])
+    agg.update("1", T0 + 100, 10)
+    agg.update("2", T0 + 200, 20)
+    agg.close(T0 + 999)
+    assert agg.drain() == []
+    agg.close(T0 + 1_000)
+    assert sorted((bar.size, bar.symbol) for bar in agg.drain()) == [("1s", "1"), ("1s", "2")]
+    agg.update("1", T0 + 500, 11)
+    assert agg.late == 1
+    agg.close(T0 + 60_000)
+    assert [(bar.size, bar.symbol, bar.high) for bar in agg.drain()] == [("1min", "1", 11), ("1min", "2", 20)]
+
+
+def test_out_of_order_tick_within_open_bar():
+    agg = aggregator.Aggregator(["1s"])
+    agg.update("1", T0 + 2_500, 10)
+    agg.update("1", T0 + 1_500, 9)
+    assert agg.drain() == [] and agg.late == 1
+
+
+def test_capacity_grows():
+    agg = aggregator.Aggregator(["1s"], capacity=2)
+    for conid in range(5):
+        agg.update(str(conid), T0, conid)
+    agg.close(T0 + 1_000)
+    assert [bar.close for bar in agg.drain()] == [0, 1, 2, 3, 4]
+
+
+def test_add():
+    agg = aggregator.Aggregator(["1s"])
+    assert not agg.add(_tick("1", T0, None))
+    assert agg.add(_tick("1", T0, 10.0, 5.0))
+    agg.close(T0 + 1_000)
+    (bar,) = agg.drain()
+    assert bar.record().json == {
+        "identifier": "$1",
+        "attribute": ".price",
+        "timestamp": bar.timestamp,
+        "open_": 10.0,
+        "high": 10.0,
+        "low": 10.0,
+        "close": 10.0,
+        "volume": 0.0,
+    }
+
+
+def test_add_skips_quote_only_ticks():
+    agg = aggregator.Aggregator(["1s"])
+    assert agg.add(_tick("1", T0, 10.0, 5.0, changed=["last", "volume"]))
+    assert not agg.add(_tick("1", T0 + 1_000, 10.0, 5.0, changed=["bid", "ask"]))
+    assert agg.add(_tick("1", T0 + 2_000, 11.0, 7.0, changed=["volume"]))
+    agg.close(T0 + 3_000)
+    assert [(bar.start, bar.close, bar.volume) for bar in agg.drain()] == [(T0, 10.0, 0.0), (T0 + 2_000, 11.0, 2.0)]
+
+
+class _Session:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.stored = []
+
+    async def store(self, response, table) -> None:
+        self.stored.append((response, table))
+
+
+@pytest.mark.asyncio
+async def test_run():
+    session, queue = _Session(), asyncio.Queue()
+    task = asyncio.create_task(aggregator.run(session, queue, sizes=["1s"], tables={"1s": "ohlc"}, grace=0.0))
+    queue.put_nowait(_tick("1", int(time() * 1000) - 5_000, 10.0))
+    try:
+        async with asyncio.timeout(3):
+            while not session.stored:
+                await asyncio.sleep(0.05)
+    finally:
+        task.cancel()
+    (response, table), *_ = session.stored
+    assert table == "ohlc"
+    assert response.json["identifier"] == "$1" and response.json["close"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_run_raises_consumer_errors():
+    session, queue = _Session(), asyncio.Queue()
+    queue.put_nowait(core.Response(core.Request(provider="ibkr", router=producer.ROUTER), None))
+    with pytest.raises(AttributeError):
+        async with asyncio.timeout(3):
+            await aggregator.run(session, queue, sizes=["1s"], tables={}, grace=0.0)
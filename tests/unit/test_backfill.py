@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime, timedelta
+from functools import partial
+
+import numpy as np
+import pytest
+
+from src.api import core
+from src.app import backfill
+from tests.mock.provider import Gateway
+
+START = datetime(2024, 1, 1)
+
+
+class _Session:
+    def __init__(self, routers, client):
+        self.routers = routers
+        self.client = client
+        self.logger = logging.getLogger(__name__)
+        self.stored = []
+
+    def router(self, provider: str, router: str):
+        return getattr(self.routers, router)
+
+    def __call__(self, provider: str, router: str, **payload):
+        request = core.Request(provider=provider, router=router, payload=payload)
+        return partial(self.router(provider, router), request=request, client=self.client)
+
+    async def store(self, response, table) -> None:
+        self.stored.append((response, table))
+
+
+def test_chunks():
+    chunks = list(backfill.chunks("265598", START, START + timedelta(days=1), "1min"))
+    assert [chunk.start for chunk in chunks] == [START, START + timedelta(hours=8), START + timedelta(hours=16)]
+    assert chunks[1].payload == {
+        "conid": "265598",
+        "bar": "1min",
+        "period": "8h",
+        "startTime": "20240101-08:00:00",
+        "direction": "1",
+    }
+    with pytest.raises(ValueError):
+        list(backfill.chunks("265598", START, START + timedelta(days=1), "7mins"))
+
+
+def test_chunks_clip_last_period():
+    chunks = list(backfill.chunks("265598", START, START + timedelta(hours=11, minutes=30), "1min"))
+    assert [(chunk.period, chunk.end) for chunk in chunks] == [
+        ("8h", START + timedelta(hours=8)),
+        ("4h", START + timedelta(hours=11, minutes=30)),
+    ]
+    assert [chunk.period for chunk in backfill.chunks("265598", START, START + timedelta(days=3), "1d")] == ["3d"]
+
+
+def test_clip():
+    timestamps = np.array([START, START + timedelta(minutes=1), START + timedelta(minutes=2)], dtype="datetime64[ms]")
+    data = core.response.Columnar(
+        identifier=core.symbols.Identifier("1"), _data={"timestamp": timestamps, "close": np.arange(3.0)}
+    )
+    assert backfill.clip(data, START + timedelta(minutes=5)) is data
+    clipped = backfill.clip(data, START + timedelta(minutes=2))
+    assert clipped.arrays["close"].tolist() == [0.0, 1.0]
+    assert backfill.clip(data, START) is None
+    record = core.Record(identifier=core.symbols.Identifier("1"), timestamp=core.symbols.Timestamp(START))
+    assert backfill.clip(record, START + timedelta(minutes=1)) is record
+    assert backfill.clip(record, START) is None
+
+
+def test_plan_resume():
+    end = START + timedelta(days=1)
+    last = {"1": START + timedelta(hours=20), "2": end}
+    chunks = backfill.plan(["1", "2", "3"], START, end, "1min", last)
+    assert [(chunk.conid, chunk.start) for chunk in chunks if chunk.conid != "3"] == [
+        ("1", START + timedelta(hours=20, minutes=1))
+    ]
+    assert len([chunk for chunk in chunks if chunk.conid == "3"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_backfill(ibkr_routers):
+    gateway = Gateway(bars=10, seed=0)
+    async with gateway.client() as client:
+        session = _Session(ibkr_routers, client)
+        progress = await backfill.backfill(
+            session, ["1", "2"], START, START + timedelta(hours=16), resume=False, concurrency=2
+        )
+    assert progress.summary()["done"] == 4
+    assert progress.failed == 0
+    assert progress.bars == 40
+    assert len(session.stored) == 4
+    assert all(table is ibkr_routers.tables.OHLC for _, table in session.stored)
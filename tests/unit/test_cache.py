@@ -0,0 +1,170 @@
+import asyncio
+import json
+import logging
+import pickle
+from datetime import date, datetime
+
+import numpy as np
+import pydantic
+import pytest
+
+from src import api, util
+from src.api import core
+from src.api.core import cache
+from src.api.core.deps.http import HttpClient
+from tests.mock.provider import Gateway
+
+
+def _record(value: str) -> core.Record:
+    return core.Record(identifier=core.symbols.Identifier(value))
+
+
+class _Router:
+    def __init__(self, *values: str, delay: float = 0.01, error: Exception | None = None):
+        self.values = values
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        for value in self.values:
+            yield core.Response(None, _record(value))
+
+
+def test_key():
+    assert cache.key("ibkr", "r", {"a": 1, "b": 2}) == cache.key("ibkr", "r", {"b": 2, "a": 1})
+    assert cache.key("ibkr", "r", {"a": 1}) != cache.key("ibkr", "r", {"a": 2})
+
+
+def test_lru():
+    lru = cache.LRUCache(maxsize=2)
+    lru.set("a", [1], 1e12)
+    lru.set("b", [2], 1e12)
+    assert lru.get("a") == [1]
+    lru.set("c", [3], 1e12)
+    assert lru.get("b") is None and lru.get("a") == [1]
+    lru.set("d", [4], 0.0)
+    assert lru.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    responses = cache.ResponseCache()
+    router = _Router("1", "2")
+    results = await asyncio.gather(*(responses.fetch("k", 60, router) for _ in range(5)))
+    assert router.calls == 1
+    assert all(result is results[0] for result in results)
+    assert [data.identifier.json for data in await responses.fetch("k", 60, router)] == ["$1", "$2"]
+    assert router.calls == 1
+    assert responses.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_error():
+    responses = cache.ResponseCache()
+    router = _Router(error=RuntimeError("upstream"))
+    results = await asyncio.gather(*(responses.fetch("k", 60, router) for _ in range(3)), return_exceptions=True)
+    assert router.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(responses.memory) == 0
+
+
+@pytest.mark.asyncio
+async def test_session_cache(ibkr_routers):
+    gateway = Gateway(latency=0.01)
+    HttpClient.transport = gateway.transport()
+    session = api.Session(
+        asyncio.get_running_loop(), util.context.PROVIDERS, logger=logging.getLogger(__name__), env={}
+    )
+    session.load_provider(util.context.PROVIDERS / "ibkr", session.logger)
+    await HttpClient.start({}, asyncio.get_running_loop())
+    session[HttpClient.name] = HttpClient
+    try:
+
+        async def _call() -> list:
+            return [response async for response in session("ibkr", "iserver_contract_info_from_conid", root=265598)()]
+
+        results = await asyncio.gather(*(_call() for _ in range(3)))
+        assert gateway.requests == 1
+        assert all(result[0].json["con_id"] == 265598 for result in results)
+        assert len({result[0].request.id for result in results}) == 3
+        await _call()
+        assert gateway.requests == 1
+    finally:
+        await HttpClient.stop({})
+        HttpClient.transport = None
+
+
+class _Model(pydantic.BaseModel):
+    price: float
+    at: datetime
+
+
+def test_dumps_round_trip():
+    data = [
+        core.Record(
+            identifier=core.symbols.Identifier("1"), _data={"at": datetime(2024, 1, 2, 3), "d": date(2024, 1, 2)}
+        ),
+        core.response.Object(
+            identifier=core.symbols.Identifier("2"), _data={"price": 1.5, "at": "2024-01-02"}, model=_Model
+        ),
+        core.response.Columnar(
+            identifier=core.symbols.Identifier("3"),
+            _data={"t": np.array(["2024-01-02T03:04"], dtype="datetime64[ms]"), "close": np.array([1.5])},
+        ),
+    ]
+    record, obj, columnar = cache.loads(cache.dumps(data))
+    assert record == data[0]
+    assert obj == data[1] and obj.instance.at == datetime(2024, 1, 2)
+    assert columnar.arrays["t"].dtype == np.dtype("datetime64[ms]")
+    assert columnar.arrays["t"].tolist() == data[2].arrays["t"].tolist()
+    assert columnar.arrays["close"].tolist() == [1.5]
+
+
+def test_loads_is_safe():
+    raw = cache.dumps([core.response.Object(identifier=core.symbols.Identifier("1"), _data={}, model=_Model)])
+    assert json.loads(raw)[0]["type"] == "object"
+    path = f"{_Model.__module__}:_Model"
+    assert cache.loads(raw.replace(path, "os:system")) is None
+    assert cache.loads(raw.replace(path, "not_imported:Model")) is None
+    with pytest.raises(UnicodeDecodeError):
+        cache.loads(pickle.dumps([_record("1")]))
+    with pytest.raises(TypeError):
+        cache.dumps([core.Record(identifier=core.symbols.Identifier("1"), _data={"x": object()})])
+
+
+class _FailingShared:
+    async def get(self, key):
+        return None
+
+    async def set(self, key, data, expires_at):
+        raise ConnectionError("database unavailable")
+
+
+@pytest.mark.asyncio
+async def test_shared_set_error_is_logged(caplog):
+    responses = cache.ResponseCache(shared=_FailingShared(), logger=logging.getLogger(__name__))
+    data = await responses.fetch("k", 60, _Router("1"))
+    assert [item.identifier.json for item in data] == ["$1"]
+    assert "database unavailable" in caplog.text
+    assert len(responses.memory) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_over():
+    responses = cache.ResponseCache()
+    router = _Router("1", delay=0.05)
+    leader = asyncio.create_task(responses.fetch("k", 60, router))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(responses.fetch("k", 60, router))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert [data.identifier.json for data in await waiter] == ["$1"]
+    assert router.calls == 2
+    assert responses.stats["inflight"] == 0
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from src.api import core
+from src.api.core.coalesce import Coalescer
+
+
+class _Router:
+    def __init__(self, n: int = 3, delay: float = 0.01, error: Exception | None = None):
+        self.n = n
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            for i in range(self.n):
+                await asyncio.sleep(self.delay)
+                yield core.Response(None, core.Record(identifier=core.symbols.Identifier(str(i))))
+            if self.error:
+                raise self.error
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def _request() -> core.Request:
+    return core.Request(provider="ibkr", router="iserver_exchange_rate", payload={"source": "USD", "target": "EUR"})
+
+
+async def _consume(coalescer: Coalescer, router: _Router, request: core.Request, limit: int | None = None) -> list:
+    out = []
+    async for response in coalescer.stream("k", router, request):
+        out.append(response)
+        if limit and len(out) >= limit:
+            break
+    return out
+
+
+@pytest.mark.asyncio
+async def test_coalesce():
+    coalescer, router = Coalescer(), _Router()
+    requests = [_request() for _ in range(4)]
+    results = await asyncio.gather(*(_consume(coalescer, router, request) for request in requests))
+    assert router.calls == 1
+    assert coalescer.coalesced == 3
+    for request, responses in zip(requests, results):
+        assert [response.json["identifier"] for response in responses] == ["$0", "$1", "$2"]
+        assert all(response.request is request for response in responses)
+
+
+@pytest.mark.asyncio
+async def test_coalesce_late_join():
+    coalescer, router = Coalescer(), _Router(delay=0.02)
+    first = asyncio.create_task(_consume(coalescer, router, _request()))
+    await asyncio.sleep(0.03)  # NOTE: after the first response
+    second = await _consume(coalescer, router, _request())
+    assert len(await first) == len(second) == 3
+    assert router.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_coalesce_error():
+    coalescer, router = Coalescer(), _Router(error=RuntimeError("upstream"))
+    results = await asyncio.gather(
+        *(_consume(coalescer, router, _request()) for _ in range(2)), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert router.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesce_bounded():
+    coalescer, router = Coalescer(maxsize=1), _Router(n=5, delay=0.0)
+    fast = asyncio.create_task(_consume(coalescer, router, _request()))
+    slow = coalescer.stream("k", router, _request())
+    assert (await anext(slow)).json["identifier"] == "$0"
+    await asyncio.sleep(0.01)
+    assert not fast.done()  # NOTE: held up by the slow consumer's full buffer
+    await slow.aclose()
+    assert len(await fast) == 5
+
+
+@pytest.mark.asyncio
+async def test_coalesce_cancel():
+    coalescer, router = Coalescer(), _Router(n=100)
+    assert len(await _consume(coalescer, router, _request(), limit=1)) == 1
+    await asyncio.sleep(0.01)
+    assert router.cancelled
+    assert not coalescer._inflight
+
+
+def test_coalesce_opt_in():
+    @core.router.define()
+    async def router() -> core.RouterReturnType:
+        yield None
+
+    assert not router.metadata.coalesce
+    assert core.router.define(coalesce=True)(router.router).metadata.coalesce
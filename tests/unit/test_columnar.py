@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.api import core
+from src.api.core.orm.writer import columnar
+from src.ext.ibkr import tables
+from src.ext.ibkr.util import columnar_bars
+from tests.mock import payloads
+
+
+def test_columnar_bars():
+    data = payloads.bars(3)
+    bars = columnar_bars(data, 265598)
+    assert len(bars) == 3
+    assert bars.identifier.json == "$265598"
+    assert bars.arrays["timestamp"].dtype == np.dtype("datetime64[ms]")
+    assert bars.arrays["close"].tolist() == [bar["c"] for bar in data]
+    assert bars.json["timestamp"][0] == "2024-01-01T00:00:00.000"
+
+
+def test_columnar_bars_missing_values():
+    bars = columnar_bars([{"t": payloads.BAR_START, "c": 1.0}], 265598)
+    assert np.isnan(bars.arrays["volume"][0])
+    columns, records = columnar(bars, tables.OHLC)
+    (record,) = records
+    row = dict(zip(columns, record))
+    assert row["close"] == 1.0
+    assert row["open"] is None and row["volume"] is None
+
+
+def test_columnar_length_mismatch():
+    with pytest.raises(ValueError):
+        core.Columnar(identifier=core.symbols.Identifier("1"), _data={"a": np.zeros(2), "b": np.zeros(3)})
+
+
+def test_columnar_records():
+    bars = columnar_bars(payloads.bars(2), 265598)
+    columns, records = columnar(bars, tables.OHLC)
+    assert set(columns) == {"timestamp", "symbol", "open", "high", "low", "close", "volume"}
+    records = list(records)
+    assert len(records) == 2
+    first = dict(zip(columns, records[0]))
+    assert first["timestamp"] == datetime(2024, 1, 1)
+    assert first["symbol"] == "$265598"
+    assert isinstance(first["close"], float)
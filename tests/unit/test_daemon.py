@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from datetime import timedelta
+from time import monotonic
+
+import pytest
+
+from src import util
+from src.app import daemon
+from src.app.common.schedule import Item, Schedule
+
+
+class _Session:
+    logger = logging.getLogger("test_daemon")
+
+
+def _schedule(*offsets: float, routers: tuple[str, ...] = ("router",)) -> Schedule:
+    now = util.dt.timestamp()
+    items = [
+        Item(id=i, t=(now + timedelta(seconds=offset)).time(), provider="test", router=routers[i % len(routers)])
+        for i, offset in enumerate(offsets)
+    ]
+    return Schedule(*items)
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, float]]:
+    calls = []
+
+    async def _handle_request(request, session):
+        calls.append((request.router, monotonic()))
+        await asyncio.sleep(0.3)
+        yield None
+
+    monkeypatch.setattr(daemon, "handle_request", _handle_request)
+    return calls
+
+
+def test_next_group():
+    schedule = _schedule(0.0, 0.2, 5.0)
+    group = schedule.next_group()
+    assert len(group) == 2
+    assert len(schedule.next_group()) == 1
+    assert schedule.next_group() is None
+
+
+@pytest.mark.asyncio
+async def test_process_concurrent(calls: list):
+    start = monotonic()
+    await daemon.process(_schedule(0.0, 0.0, 0.0), _Session(), limits=daemon.ConcurrencyLimits(router=3))
+    assert len(calls) == 3
+    assert monotonic() - start < 0.6
+
+
+@pytest.mark.asyncio
+async def test_process_router_limit(calls: list):
+    await daemon.process(_schedule(0.0, 0.0), _Session(), limits=daemon.ConcurrencyLimits(router=1))
+    (_, first), (_, second) = calls
+    assert second - first >= 0.29
+
+
+@pytest.mark.asyncio
+async def test_process_no_drift(calls: list):
+    start = monotonic()
+    schedule = _schedule(0.1, 0.2, routers=("a", "b"))
+    await daemon.process(schedule, _Session(), window=timedelta(milliseconds=50))
+    (_, first), (_, second) = calls
+    assert second - first < 0.2  # NOTE: "a" is still running when "b" is due
+    assert second - start < 0.3
@@ -0,0 +1,47 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from src.api.core.deps import db
+
+ENV = {"DBUSER": "test", "DBHOST": "localhost", "DBPORT": "5432", "DBNAME": "test"}
+
+
+@pytest.mark.asyncio
+async def test_db_engine_settings():
+    env = ENV | {"DB_POOL_SIZE": "3", "DB_MAX_OVERFLOW": "1", "DB_POOL_PRE_PING": "true", "DB_SERVER_PREPARED": "0"}
+    await db.DBEngine.start(env, asyncio.get_running_loop())
+    try:
+        engine = db.DBEngine.instance
+        assert isinstance(engine.pool, db.InstrumentedPool)
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 1
+        assert engine.pool._pre_ping
+        _, connect_args = engine.dialect.create_connect_args(engine.url)
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert db.DBEngine.pool()["checked_out"] == 0
+    finally:
+        await db.DBEngine.stop(env)
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool():
+    pool = db.InstrumentedPool(MagicMock, pool_size=1, max_overflow=1, timeout=0.05)
+
+    def _checkout():
+        a, b = pool.connect(), pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        a.close()
+        b.close()
+
+    await greenlet_spawn(_checkout)
+    summary = pool.stats.summary()
+    assert summary["checkouts"] == 2
+    assert summary["overflows"] == 1
+    assert summary["timeouts"] == 1
+    assert summary["peak"] == 2
+    assert summary["in_use"] == 0
@@ -0,0 +1,58 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytest
+
+from src.util import dt
+
+MS = [1_704_067_200_000, 1_704_069_000_123]
+
+
+def test_convert():
+    assert dt.convert(unix_ms=MS[0]) == dt.convert(unix=MS[0] // 1000) == "20240101T000000"
+    assert dt.convert(datetime(2024, 1, 2, 3, 4, 5)) == "20240102T030405"
+    assert dt.convert(date(2024, 1, 2)) == "20240102"
+    assert dt.convert(time(3, 4, 5)) == "030405"
+    assert dt.convert(timedelta(days=1, hours=2, seconds=5)) == "P1DT020005"
+    assert dt.convert(d_str="20240102T030405") == datetime(2024, 1, 2, 3, 4, 5)
+    assert dt.convert(d_str="2024-01-02 03:04") == datetime(2024, 1, 2, 3, 4)
+    with pytest.raises(ValueError):
+        dt.convert(d_str="yesterday")
+    assert dt.isotoday() == dt.iso_today()
+
+
+def test_unix_ms_round_trip():
+    values = dt.unix_ms_to_datetime64(MS)
+    assert values.dtype == np.dtype("datetime64[ms]")
+    assert dt.datetime64_to_unix_ms(values).tolist() == MS
+    iso = dt.unix_ms_to_iso(MS)
+    assert iso.tolist() == ["20240101T000000", "20240101T003000"]
+    assert dt.iso_to_unix_ms(iso).tolist() == [MS[0], MS[1] - 123]
+
+
+def test_iso_to_datetime64():
+    assert dt.iso_to_datetime64(["20240101T003000"]).tolist() == [datetime(2024, 1, 1, 0, 30)]
+    assert dt.iso_to_datetime64(["2024-01-01T00:30:00"]).tolist() == [datetime(2024, 1, 1, 0, 30)]
+    assert dt.iso_to_datetime64(np.array([[dt.convert(unix_ms=MS[0])]])).shape == (1, 1)
+    assert len(dt.iso_to_datetime64([])) == 0
+
+
+def test_iso_to_datetime64_formats():
+    values = ["20240102", "20240102T030405", "20240102T030405Z", "2024-01-02"]
+    assert dt.iso_to_datetime64(values).tolist() == [
+        datetime(2024, 1, 2),
+        datetime(2024, 1, 2, 3, 4, 5),
+        datetime(2024, 1, 2, 3, 4, 5),
+        datetime(2024, 1, 2),
+    ]
+    for invalid in ("030405", "P1DT020005", "yesterday"):
+        with pytest.raises(ValueError):
+            dt.iso_to_datetime64([invalid])
+
+
+def test_parse_iso():
+    assert dt.parse_iso("20240102T030405Z") == dt.convert(d_str="20240102T030405") == datetime(2024, 1, 2, 3, 4, 5)
+    assert dt.parse_iso("20240102") == datetime(2024, 1, 2)
+    assert dt.parse_iso("2024-01-02T03:04:05.123456") == datetime(2024, 1, 2, 3, 4, 5, 123456)
+    with pytest.raises(ValueError):
+        dt.parse_iso("030405")
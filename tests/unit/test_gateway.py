@@ -0,0 +1,82 @@
+import pytest
+
+from src.api import core
+from tests.mock.provider import Gateway
+
+BARS_REQUEST = {"conid": "265598", "period": "1d", "bar": "1min"}
+
+
+@pytest.mark.asyncio
+async def test_gateway_historical_bars(gateway: Gateway, ibkr_routers):
+    request = core.Request(provider="ibkr", router="hmds_historical_bars_columnar", payload=BARS_REQUEST)
+    async with gateway.client() as client:
+        responses = [response async for response in ibkr_routers.hmds_historical_bars_columnar(request, client=client)]
+    assert len(responses) == 1
+    assert len(responses[0].data) == gateway.bars
+    assert responses[0].json["identifier"] == "$265598"
+
+
+@pytest.mark.asyncio
+async def test_gateway_positions_pages(gateway: Gateway):
+    async with gateway.client() as client:
+        pages = [(await client.get(f"/portfolio/U1234567/positions/{page}")).json() for page in range(4)]
+    assert [len(page) for page in pages] == [100, 100, 50, 0]
+
+
+@pytest.mark.asyncio
+async def test_gateway_pacing():
+    gateway = Gateway(rate_limit=(3, 60.0))
+    async with gateway.client() as client:
+        statuses = [(await client.get("/iserver/auth/status")).status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 429, 429]
+    assert gateway.throttled == 2
+
+
+@pytest.mark.asyncio
+async def test_gateway_errors():
+    gateway = Gateway(error_rate=1.0)
+    async with gateway.client() as client:
+        assert (await client.get("/iserver/auth/status")).status_code == 500
+        gateway.error_rate = 0.0
+        assert (await client.get("/not/a/route")).status_code == 404
+    assert gateway.stats["errors"] == 1
+
+
+async def _positions(routers, client, limit: int | None = None) -> list:
+    request = core.Request(provider="ibkr", router="portfolio_account_positions", payload={"root": "U1234567"})
+    responses = []
+    router = routers.portfolio_account_positions(request, client=client)
+    async for response in router:
+        responses.append(response)
+        if limit and len(responses) >= limit:
+            await router.aclose()
+            break
+    return responses
+
+
+@pytest.mark.asyncio
+async def test_gateway_positions_prefetch(ibkr_routers):
+    gateway = Gateway(latency=0.01, positions=650, seed=0)
+    async with gateway.client() as client:
+        responses = await _positions(ibkr_routers, client)
+    conids = [response.data.instance.conid for response in responses]
+    assert conids == sorted(conids) and len(conids) == 650
+    assert gateway.peak > 1
+    # NOTE: pages 0-6 hold the positions; at most `POSITIONS_PREFETCH` pages past the short one are requested
+    assert 7 <= gateway.paths[r"/portfolio/(?P<account_id>\w+)/positions/(?P<page>\d+)"] <= 7 + 4
+
+
+@pytest.mark.asyncio
+async def test_gateway_positions_single_page(ibkr_routers):
+    gateway = Gateway(positions=30)
+    async with gateway.client() as client:
+        assert len(await _positions(ibkr_routers, client)) == 30
+    assert gateway.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_gateway_positions_cancel(ibkr_routers):
+    gateway = Gateway(latency=0.05, positions=1000)
+    async with gateway.client() as client:
+        assert len(await _positions(ibkr_routers, client, limit=1)) == 1
+        assert gateway.in_flight == 0
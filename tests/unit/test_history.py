@@ -0,0 +1,50 @@
+import pytest
+
+from src import api
+
+
+def test_history_ring_buffer():
+    history = api.core.history.History(capacity=3)
+    for i in range(5):
+        entry = history.start(i)
+        entry.record()
+        entry.finish()
+    assert len(history) == 3
+    assert [entry.request_id for entry in history] == [2, 3, 4]
+
+
+def test_history_summary():
+    history = api.core.history.History(capacity=100)
+    for i in range(1, 101):
+        entry = history.start(i)
+        entry.finish()
+        entry.total = float(i)
+    failed = history.start(None)
+    failed.finish(ValueError("boom"))
+    pending = history.start(None)
+    summary = history.summary()
+    assert summary["count"] == 99
+    assert summary["errors"] == 1
+    assert summary["total"]["p50"] == 51.0
+    assert summary["total"]["p99"] == 100.0
+    assert summary["first_byte"] == {"p50": None, "p95": None, "p99": None}
+    assert pending.total is None
+
+
+@pytest.mark.asyncio
+async def test_router_records_history():
+    @api.core.router.define()
+    async def router(request: api.core.Request) -> api.core.RouterReturnType:
+        for i in range(3):
+            yield i
+        raise RuntimeError("upstream")
+
+    request = api.core.Request(provider="test", router="router")
+    with pytest.raises(RuntimeError):
+        async for _ in router(request=request):
+            pass
+    (entry,) = router.metadata.history
+    assert entry.request_id == request.id
+    assert entry.count == 3
+    assert entry.first_byte is not None and entry.total >= entry.first_byte
+    assert entry.error == "RuntimeError('upstream')"
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from src.api.core.deps import http, setting
+
+
+def test_setting():
+    env = {"INT": "8", "BOOL": "Yes", "EMPTY": "", "BAD": "x"}
+    assert setting(env, "INT", 1, int) == 8
+    assert setting(env, "BOOL", False, bool) is True
+    assert setting(env, "EMPTY", 2.5, float) == 2.5
+    assert setting(env, "MISSING", "a") == "a"
+    with pytest.raises(ValueError):
+        setting(env, "BAD", 1, int)
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while await reader.readuntil(b"\r\n\r\n"):
+        await asyncio.sleep(0.01)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: application/json\r\n\r\n{}")
+        await writer.drain()
+
+
+@pytest.mark.asyncio
+async def test_http_client_pool():
+    server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    env = {"HTTP_MAX_CONNECTIONS": "2", "HTTP_POOL_TIMEOUT": "5"}
+    try:
+        await http.HttpClient.start(env, asyncio.get_running_loop())
+        client = http.HttpClient.instance
+        responses = await asyncio.gather(*(client.get(f"http://127.0.0.1:{port}/") for _ in range(6)))
+        assert all(response.status_code == 200 for response in responses)
+        pool = http.HttpClient.pool()
+        assert pool["checkouts"] == 6
+        assert pool["in_use"] == 0
+        assert pool["peak"] == 2
+        assert pool["connections"]["open"] <= 2
+        assert pool["wait"]["p99"] > pool["wait"]["p50"] >= 0
+    finally:
+        await http.HttpClient.stop(env)
+        server.close()
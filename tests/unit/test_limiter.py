@@ -0,0 +1,50 @@
+import asyncio
+from time import monotonic
+
+import pytest
+
+from src import api
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_burst_then_throttle():
+    bucket = api.core.limiter.TokenBucket(2, 0.2)
+    start = monotonic()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert monotonic() - start < 0.05
+    await bucket.acquire()
+    assert monotonic() - start >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_fifo():
+    bucket = api.core.limiter.TokenBucket(1, 0.05)
+    order = []
+
+    async def _acquire(i: int):
+        await bucket.acquire()
+        order.append(i)
+
+    tasks = [asyncio.create_task(_acquire(i)) for i in range(5)]
+    await asyncio.sleep(0)
+    assert bucket.queue_depth == 4  # NOTE: the first caller takes the only token straight away
+    assert bucket.wait_time > 0
+    await asyncio.gather(*tasks)
+    assert order == list(range(5))
+    assert bucket.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_parent():
+    parent = api.core.limiter.Limiter((1, 0.1))
+    limiter = api.core.limiter.Limiter(None, parent=parent)
+    await limiter.acquire()
+    waited = await limiter.acquire()
+    assert waited >= 0.09
+    assert limiter.stats["queue_depth"] == 0
+
+
+def test_invalid_rate_limit():
+    with pytest.raises(ValueError):
+        api.core.limiter.TokenBucket(0, 1.0)
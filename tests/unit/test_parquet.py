@@ -0,0 +1,92 @@
+import json
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import MetaData
+from sqlalchemy import types as t
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
+from sqlalchemy.sql import select
+
+from src.api.core.orm import parquet, raw
+from src.api.core.orm.common import filter_select
+
+base = declarative_base(metadata=MetaData(schema="test"))
+START = datetime(2024, 1, 31, 23)
+
+
+class OHLC(base):
+    __tablename__ = "ohlc"
+    timestamp: Mapped[datetime] = mapped_column(t.DateTime, primary_key=True)
+    symbol: Mapped[str] = mapped_column(t.String, primary_key=True)
+    open_: Mapped[float] = mapped_column(t.Float, name="open", nullable=True)
+    close: Mapped[float] = mapped_column(t.Float)
+    meta: Mapped[dict] = mapped_column(t.JSON, nullable=True)
+    strikes: Mapped[list[int]] = mapped_column(t.ARRAY(t.Integer), nullable=True)
+
+
+def _rows(n: int, step: timedelta = timedelta(minutes=30)) -> list[dict]:
+    return [
+        {
+            "timestamp": START + i * step,
+            "symbol": "$1",
+            "open": float(i),
+            "close": float(i) + 0.5,
+            "meta": {"i": i},
+            "strikes": [i, i + 1],
+        }
+        for i in range(n)
+    ]
+
+
+async def _batches(rows: list[dict], size: int):
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def test_schema():
+    schema = parquet.schema(OHLC)
+    assert schema.names == ["timestamp", "symbol", "open", "close", "meta", "strikes"]
+    assert schema.field("timestamp").type == pa.timestamp("us")
+    assert schema.field("meta").type == pa.string()
+    assert schema.field("strikes").type == pa.list_(pa.int64())
+
+
+@pytest.mark.asyncio
+async def test_round_trip(tmp_path):
+    rows = _rows(10)
+    summary = await parquet.write(_batches(rows, 3), OHLC, tmp_path, partition_by="timestamp")
+    assert summary.rows == 10
+    assert sorted(fp.parent.name for fp in summary.files) == ["month=2024-01", "month=2024-02"]
+    assert pq.read_table(tmp_path / "month=2024-01" / parquet.FILE_NAME).num_rows == 2
+
+    read = [dict(zip(columns, record)) for columns, records in parquet.read(tmp_path, OHLC) for record in records]
+    assert sorted(read, key=lambda row: row["timestamp"]) == [
+        {**row, "meta": json.dumps(row["meta"])} for row in rows
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unpartitioned(tmp_path):
+    summary = await parquet.write(_batches(_rows(5), 2), OHLC, tmp_path)
+    assert summary.files == [tmp_path / parquet.FILE_NAME]
+    assert pq.read_table(summary.files[0]).num_rows == 5
+
+
+def test_read_batches(tmp_path):
+    pq.write_table(pa.Table.from_batches([parquet.batch(_rows(10), OHLC)]), tmp_path / parquet.FILE_NAME)
+    batches = [list(records) for _, records in parquet.read(tmp_path, OHLC, batch_size=4)]
+    assert [len(records) for records in batches] == [4, 4, 2]
+
+
+def test_mirror():
+    table = raw.mirror(OHLC, "test")
+    assert table.fullname == "raw_test.ohlc"
+    assert [c.name for c in table.primary_key] == ["timestamp", "symbol"]
+    assert table.c.open.nullable
+
+
+def test_filter_table():
+    query = filter_select(select(OHLC.__table__), OHLC.__table__, ("symbol", "$1", "=="))
+    assert "WHERE test.ohlc.symbol =" in str(query)
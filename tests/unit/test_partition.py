@@ -0,0 +1,89 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import Index, MetaData
+from sqlalchemy import types as t
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from src.api.core.orm import partition
+
+TODAY = date(2024, 11, 15)
+
+
+def _metadata() -> tuple[MetaData, type]:
+    base = declarative_base(metadata=MetaData(schema="test"))
+
+    class OHLC(base):
+        __tablename__ = "ohlc"
+        __table_args__ = (
+            Index("ix_ohlc_timestamp_brin", "timestamp", postgresql_using="brin"),
+            {"info": {"partition_by": "timestamp"}},
+        )
+        timestamp: Mapped[datetime] = mapped_column(t.DateTime, primary_key=True)
+        symbol: Mapped[str] = mapped_column(t.String, primary_key=True)
+
+    class Ledger(base):
+        __tablename__ = "ledger"
+        timestamp: Mapped[datetime] = mapped_column(t.DateTime, primary_key=True)
+
+    return base.metadata, OHLC.__table__
+
+
+def _ddl(element) -> str:
+    return str(element.compile(dialect=postgresql.dialect()))
+
+
+def test_declare():
+    md, table = _metadata()
+    assert "PARTITION BY" not in _ddl(CreateTable(table))
+    partition.declare(md)
+    assert partition.tables(md) == [table]
+    assert _ddl(CreateTable(table)).rstrip().endswith("PARTITION BY RANGE (timestamp)")
+    assert "PARTITION BY" not in _ddl(CreateTable(md.tables["test.ledger"]))
+    assert "USING brin" in _ddl(CreateIndex(next(iter(table.indexes))))
+
+
+def test_months():
+    assert partition.shift(date(2024, 11, 15), 2) == date(2025, 1, 1)
+    assert partition.shift(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert list(partition.months(date(2024, 11, 30), date(2025, 1, 1))) == [
+        date(2024, 11, 1),
+        date(2024, 12, 1),
+        date(2025, 1, 1),
+    ]
+
+
+def test_names():
+    _, table = _metadata()
+    assert partition.name(table, date(2024, 2, 1)) == "ohlc_p202402"
+    assert partition.parse(table, "ohlc_p202402") == date(2024, 2, 1)
+    assert partition.parse(table, "ohlc_default") is None
+    assert partition.parse(table, "ohlc_pxxx") is None
+    assert partition.create_statement(table, date(2024, 12, 1)) == (
+        'CREATE TABLE IF NOT EXISTS "test"."ohlc_p202412" PARTITION OF "test"."ohlc" '
+        "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')"
+    )
+
+
+def test_plan_ahead():
+    steps = partition.plan([date(2024, 11, 1)], [], TODAY, ahead=2)
+    assert steps.create == [date(2024, 12, 1), date(2025, 1, 1)]
+    assert not steps.move and not steps.drop
+    assert not partition.plan(steps.create + [date(2024, 11, 1)], [], TODAY, ahead=2)
+
+
+def test_plan_moves_defaulted_rows():
+    steps = partition.plan([date(2024, 11, 1)], [date(2024, 11, 1), date(2024, 6, 1), date(2024, 12, 1)], TODAY)
+    assert steps.move == [date(2024, 6, 1), date(2024, 12, 1)]
+    assert steps.create == [date(2025, 1, 1), date(2025, 2, 1)]
+
+
+def test_plan_retention():
+    existing = [date(2024, m, 1) for m in range(1, 12)]
+    steps = partition.plan(existing, [], TODAY, ahead=0, retention=3)
+    assert steps.drop == [date(2024, m, 1) for m in range(1, 9)]
+    assert steps.summary()["drop"][-1] == "202408"
+    with pytest.raises(ValueError):
+        partition.plan(existing, [], TODAY, retention=0)
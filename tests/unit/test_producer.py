@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from src.app import producer
+from tests.mock.websocket import MarketData
+
+
+async def _take(queue: asyncio.Queue, n: int, timeout: float = 5.0) -> list:
+    async with asyncio.timeout(timeout):
+        return [await queue.get() for _ in range(n)]
+
+
+def test_decode_merges_partial_updates():
+    decoder = producer.Decoder()
+    conid, tick = decoder.decode(json.dumps({"topic": "smd+1", "31": "C101.5", "84": "101.4", "_updated": 1}))
+    assert conid == "1"
+    assert tick["last"] == 101.5 and tick["bid"] == 101.4 and tick["ask"] is None
+    _, tick = decoder.decode(json.dumps({"topic": "smd+1", "86": "101.6", "7762": "1,200", "_updated": 2}))
+    assert tick == {
+        "timestamp": 2,
+        "last": 101.5,
+        "bid": 101.4,
+        "ask": 101.6,
+        "bid_size": None,
+        "ask_size": None,
+        "last_size": None,
+        "volume": 1200.0,
+        "changed": ["ask", "volume"],
+    }
+
+
+def test_decode_ignores_other_topics():
+    decoder = producer.Decoder()
+    assert decoder.decode("tic") is None
+    assert decoder.decode(json.dumps({"topic": "system", "hb": 1})) is None
+    assert decoder.decode(json.dumps({"topic": "smd+1", "_updated": 1})) is None
+
+
+def test_tick_queue_drops_oldest():
+    queue = producer.TickQueue(2)
+    for i in range(5):
+        queue.put_nowait(i)
+    assert queue.dropped == 3
+    assert [queue.get_nowait(), queue.get_nowait()] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_stream():
+    async with MarketData(seed=0) as server:
+        stream = producer.Producer(server.uri, ["1", "2"], heartbeat=0.01)
+        task = asyncio.create_task(stream.run())
+        try:
+            responses = await _take(stream.queue, 20)
+        finally:
+            task.cancel()
+    assert {response.json["identifier"] for response in responses} == {"$1", "$2"}
+    assert all(response.json["attribute"] == ".tick" for response in responses)
+    assert all(response.json["last"] is not None for response in responses)
+    assert {response.request.router for response in responses} == {producer.ROUTER}
+    assert sorted(server.subscriptions) == ["1", "2"]
+    assert "tic" in server.messages
+
+
+@pytest.mark.asyncio
+async def test_resubscribe_after_reconnect():
+    async with MarketData(seed=0) as server:
+        stream = producer.Producer(server.uri, ["1"])
+        task = asyncio.create_task(stream.run(reconnect_delay=0.01))
+        try:
+            await _take(stream.queue, 5)
+            await stream.subscribe("2")
+            while "2" not in server.subscriptions:
+                await asyncio.sleep(0.01)
+            server.drop()
+            while server.connections < 2:
+                await asyncio.sleep(0.01)
+            responses = await _take(stream.queue, 20)
+        finally:
+            task.cancel()
+    assert stream.reconnects >= 1
+    assert server.subscriptions.count("1") == 2
+    assert server.subscriptions.count("2") == 2
+    assert "$2" in {response.json["identifier"] for response in responses}
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe():
+    async with MarketData(seed=0) as server:
+        stream = producer.Producer(server.uri, ["1", "2"])
+        task = asyncio.create_task(stream.run())
+        try:
+            await _take(stream.queue, 5)
+            await stream.unsubscribe("2")
+            await asyncio.sleep(0.05)
+            while not stream.queue.empty():
+                stream.queue.get_nowait()
+            responses = await _take(stream.queue, 10)
+        finally:
+            task.cancel()
+    assert "umd+2+{}" in server.messages
+    assert {response.json["identifier"] for response in responses} == {"$1"}
+    assert stream.conids == {"1"}
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, JSON, MetaData, String, Table
+from sqlalchemy.dialects import postgresql
+
+from src import api
+
+TABLE = Table(
+    "ohlc",
+    MetaData(schema="test"),
+    Column("timestamp", DateTime, primary_key=True),
+    Column("symbol", String, primary_key=True),
+    Column("close", Float),
+    Column("extra", JSON),
+)
+
+
+class Session:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+def _compile(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_merge_statement():
+    query = api.core.orm.raw.merge_statement(TABLE, "_staging_ohlc", ["timestamp", "symbol", "close"])
+    sql = _compile(query)
+    assert (
+        "SELECT DISTINCT ON (_staging_ohlc.timestamp, _staging_ohlc.symbol) "
+        "_staging_ohlc.timestamp, _staging_ohlc.symbol, _staging_ohlc.close"
+    ) in sql
+    assert "ORDER BY _staging_ohlc.timestamp, _staging_ohlc.symbol, ctid DESC" in sql
+    assert "ON CONFLICT (timestamp, symbol) DO UPDATE SET close = coalesce(excluded.close, test.ohlc.close)" in sql
+
+
+def test_merge_statement_no_update():
+    query = api.core.orm.raw.merge_statement(TABLE, "_staging_ohlc", ["timestamp", "symbol"])
+    assert "DO NOTHING" in _compile(query)
+    query = api.core.orm.raw.merge_statement(TABLE, "_staging_ohlc", ["timestamp", "symbol", "close"], do_update=False)
+    assert "ON CONFLICT (timestamp, symbol) DO NOTHING" in _compile(query)
+
+
+def test_merge_statement_without_key():
+    sql = _compile(api.core.orm.raw.merge_statement(TABLE, "_staging_ohlc", ["close"]))
+    assert "DISTINCT" not in sql and "ORDER BY" not in sql
+
+
+def test_insert_statement():
+    session = Session()
+    asyncio.run(api.core.orm.raw.insert(session, TABLE, _commit=False, timestamp=1, symbol="AAPL", close=None, extra=2))
+    assert "DO UPDATE SET extra = %(param_1)s" in _compile(session.statements[0])
+    asyncio.run(api.core.orm.raw.insert(session, TABLE, do_update=False, _commit=False, timestamp=1, symbol="AAPL"))
+    assert "ON CONFLICT (timestamp, symbol) DO NOTHING" in _compile(session.statements[1])
+
+
+def test_records():
+    records = api.core.orm.raw._records(TABLE, ["symbol", "extra"], [{"symbol": "AAPL", "extra": {"a": 1}}, {}])
+    assert records == [("AAPL", '{"a": 1}'), (None, None)]
+    data = [{"timestamp": "20240102T030405"}, {"timestamp": "2024-01-02"}]
+    records = api.core.orm.raw._records(TABLE, ["timestamp"], data)
+    assert records == [(datetime(2024, 1, 2, 3, 4, 5),), (datetime(2024, 1, 2),)]
+
+
+class _Result:
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.closed = False
+        self.kind = None
+
+    def scalars(self):
+        self.kind = "scalars"
+        return self
+
+    def mappings(self):
+        self.kind = "mappings"
+        return self
+
+    async def __aiter__(self):
+        for row in self.rows:
+            yield row
+
+    async def partitions(self, size: int):
+        for i in range(0, len(self.rows), size):
+            yield self.rows[i : i + size]
+
+    async def close(self):
+        self.closed = True
+
+
+class _StreamSession:
+    def __init__(self, rows: list):
+        self.result = _Result(rows)
+        self.statements = []
+
+    async def stream(self, statement):
+        self.statements.append(statement)
+        return self.result
+
+
+def test_fetch():
+    session = _StreamSession([1, 2, 3])
+
+    async def _take(n: int) -> list:
+        rows = []
+        generator = api.core.orm.raw.fetch(session, TABLE, yield_per=2)
+        async for row in generator:
+            rows.append(row)
+            if len(rows) == n:
+                break
+        await generator.aclose()
+        return rows
+
+    assert asyncio.run(_take(1)) == [1]
+    assert session.result.closed
+    assert session.statements[0].get_execution_options()["yield_per"] == 2
+    session.result.closed = False
+    assert asyncio.run(_take(5)) == [1, 2, 3]
+    assert session.result.closed
+
+
+def test_fetch_batches():
+    session = _StreamSession([{"symbol": str(i)} for i in range(5)])
+
+    async def _take(n: int) -> list:
+        batches = []
+        generator = api.core.orm.raw.fetch_batches(session, TABLE, size=2, mappings=True, order_by="timestamp")
+        async for batch in generator:
+            batches.append(batch)
+            if len(batches) == n:
+                break
+        await generator.aclose()
+        return batches
+
+    assert [len(batch) for batch in asyncio.run(_take(5))] == [2, 2, 1]
+    assert session.result.kind == "mappings" and session.result.closed
+    assert "ORDER BY test.ohlc.timestamp" in _compile(session.statements[0])
+    session.result.closed = False
+    assert len(asyncio.run(_take(1))) == 1
+    assert session.result.closed
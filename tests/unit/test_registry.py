@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from src import api
+
+SOURCE = '''
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class Side(Enum):
+    buy = "BUY"
+    sell = "SELL"
+
+
+class Fill(BaseModel):
+    side: Side = Side.buy
+    order: Order | None = None
+
+
+class Order(BaseModel):
+    fills: list[Fill] = []
+
+
+class Unused(BaseModel):
+    value: int
+
+
+Order.model_rebuild()
+'''
+
+CYCLIC_SOURCE = '''
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class Account(BaseModel):
+    margin: Margin | None = None
+
+
+class Margin(Account):
+    leverage: float = 1.0
+'''
+
+
+@pytest.fixture
+def module_fp(tmp_path: Path) -> Path:
+    fp = tmp_path / "lazy_models.py"
+    fp.write_text(SOURCE)
+    yield fp
+    sys.modules.pop("lazy_models", None)
+
+
+def test_index(module_fp: Path):
+    index = api.core.registry.ModelIndex.load(module_fp)
+    assert list(index) == ["Side", "Fill", "Order", "Unused"]
+    assert index.classes["Fill"]["deps"] == ["Order", "Side"]
+    assert len(index.classes["Order"]["post"]) == 1
+    assert (module_fp.parent / "__pycache__" / "lazy_models.index.json").exists()
+    cached = api.core.registry.ModelIndex.load(module_fp)
+    assert cached.classes == index.classes
+
+
+def test_lazy_module(module_fp: Path):
+    module = api.core.registry.install("lazy_models", module_fp)
+    assert isinstance(module, api.core.registry.LazyModule)
+    assert "Fill" not in module.__dict__
+    import lazy_models
+
+    assert lazy_models is module
+    order = module.Order(fills=[{"side": "SELL"}])
+    assert order.fills[0].side is module.Side.sell
+    assert "Fill" in module.__dict__
+    assert "Unused" not in module.__dict__
+    with pytest.raises(AttributeError):
+        module.Missing
+
+
+def test_model_registry(module_fp: Path):
+    module = api.core.registry.install("lazy_models", module_fp)
+    models = api.core.registry.ModelRegistry(module)
+    assert len(models) == 4
+    assert "Unused" not in module.__dict__
+    assert models["lazy_models.Unused"] is module.Unused
+
+
+def test_lazy_module_bases_first(tmp_path: Path):
+    fp = tmp_path / "lazy_cyclic.py"
+    fp.write_text(CYCLIC_SOURCE)
+    try:
+        module = api.core.registry.install("lazy_cyclic", fp)
+        assert module.__dict__["__lazy_index__"].classes["Margin"]["bases"] == ["Account"]
+        account = module.Account(margin={"leverage": 2.0})
+        assert isinstance(account.margin, module.Margin)
+        assert issubclass(module.Margin, module.Account)
+    finally:
+        sys.modules.pop("lazy_cyclic", None)
@@ -0,0 +1,76 @@
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from src.api import core
+from src.ext.ibkr import models_generated as models
+from tests.mock import payloads
+
+
+def _object(model=models.IndividualPosition) -> core.response.Object:
+    return core.response.Object(
+        identifier=core.symbols.Identifier("265598"),
+        model=model,
+        _data=payloads.position("U1234567", 265598),
+    )
+
+
+def test_object_validates_once():
+    calls = []
+
+    class Model(models.IndividualPosition):
+        def __init__(self, **data):
+            calls.append(data)
+            super().__init__(**data)
+
+    obj = _object(Model)
+    assert obj.json == obj.json
+    assert obj.instance is obj.instance
+    assert len(calls) == 1
+
+
+def test_object_json():
+    obj = _object()
+    json = obj.json
+    assert json["identifier"] == "$265598"
+    assert json["acct_id"] == "U1234567"
+    json["acct_id"] = "mutated"
+    assert obj.json["acct_id"] == "U1234567"
+
+
+def test_object_equality_ignores_cache():
+    a, b = _object(), _object()
+    object.__setattr__(b, "_data", a._data)
+    a.json
+    assert a == b
+
+
+def test_record_slots():
+    record = core.Record(
+        identifier=core.symbols.Identifier("265598"),
+        timestamp=core.symbols.Timestamp("20240101T000000"),
+        attribute=core.symbols.Attribute("price"),
+        _data={"close": 1.0},
+    )
+    assert not hasattr(record, "__dict__")
+    assert record.json == {
+        "identifier": "$265598",
+        "timestamp": "^20240101T000000",
+        "attribute": ".price",
+        "close": 1.0,
+    }
+    assert record.identifier is core.symbols.Identifier("265598")
+    assert record.timestamp.json == "^20240101T000000"
+    with pytest.raises(FrozenInstanceError):
+        record._data = {}
+
+
+def test_pickle():
+    obj = _object()
+    obj.json
+    restored = pickle.loads(pickle.dumps(obj))
+    assert restored == obj
+    assert restored._dumped is None and restored.json == obj.json
+    response = core.Response(core.Request(provider="ibkr", router="r"), obj)
+    assert pickle.loads(pickle.dumps(response)).json == response.json
@@ -0,0 +1,50 @@
+from datetime import datetime, time, timedelta
+
+from src.app.common.schedule import Rule, Schedule
+
+RECORDS = [
+    {"id": 1, "provider": "ibkr", "router": "a", "request": {"x": 1}, "start": time(9), "end": time(10),
+     "interval": timedelta(minutes=30)},
+    {"id": 2, "provider": "ibkr", "router": "b", "request": {}, "start": time(9, 15), "end": time(9, 45),
+     "interval": time(0, 15)},
+    {"id": 3, "enabled": False, "provider": "ibkr", "router": "c", "start": time(9), "end": None,
+     "interval": timedelta(minutes=1)},
+]
+
+
+def test_from_orm_is_lazy():
+    schedule = Schedule.from_orm(RECORDS)
+    assert len(schedule) == 2
+    items = list(schedule)
+    assert [(item.id, item.t) for item in items] == [
+        (1, time(9)),
+        (2, time(9, 15)),
+        (1, time(9, 30)),
+        (2, time(9, 30)),
+        (2, time(9, 45)),
+        (1, time(10)),
+    ]
+    assert items[0].request.payload == {"x": 1}
+    assert len(schedule) == 0
+
+
+def test_from_orm_after():
+    after = datetime.combine(datetime.today(), time(9, 31))
+    schedule = Schedule.from_orm(RECORDS, after=after)
+    assert [(item.id, item.t) for item in schedule] == [(2, time(9, 45)), (1, time(10))]
+
+
+def test_rule_first():
+    rule = Rule(RECORDS[0], day=datetime(2024, 1, 1))
+    assert rule.first() == datetime(2024, 1, 1, 9)
+    assert rule.first(datetime(2024, 1, 1, 9, 1)) == datetime(2024, 1, 1, 9, 30)
+    assert rule.first(datetime(2024, 1, 1, 10, 1)) is None
+
+
+def test_next_group():
+    schedule = Schedule.from_orm(RECORDS)
+    group = schedule.next_group(timedelta(minutes=15))
+    assert [item.id for item in group] == [1, 2]
+    group = schedule.next_group(timedelta(0))
+    assert [item.id for item in group] == [1, 2]
+    assert group.t == time(9, 30)
@@ -0,0 +1,66 @@
+import pickle
+
+import pytest
+
+from src.api.core import symbols
+
+
+def test_interned():
+    identifier = symbols.Identifier("265598")
+    assert symbols.Identifier("265598") is identifier
+    assert symbols.Identifier("$265598") is identifier
+    assert symbols.Identifier(265598) is identifier
+    assert symbols.Attribute("265598") is not identifier
+    assert pickle.loads(pickle.dumps(identifier)) is identifier
+    assert identifier.json == "$265598"
+
+
+def test_timestamp_not_interned():
+    timestamp = symbols.Timestamp("20240101T000000")
+    assert symbols.Timestamp("20240101T000000") is not timestamp
+    assert timestamp.json == "^20240101T000000"
+    assert pickle.loads(pickle.dumps(timestamp)) == timestamp
+
+
+def test_reserved():
+    for value in ["a,b", "a(b", "$a$b", "a.b"]:
+        with pytest.raises(ValueError):
+            symbols.Identifier(value)
+    assert symbols.RESERVED >= symbols.ILLEGAL | set(symbols.MAP)
+
+
+def test_invalid_types():
+    for value in [None, 1.5, True, b"1", ["1"]]:
+        with pytest.raises(TypeError):
+            symbols.Identifier(value)
+    assert symbols.Identifier(symbols.Attribute("1")) is symbols.Identifier("1")
+
+
+def test_registration():
+    assert symbols.MAP["$"] is symbols.Identifier
+    with pytest.raises(ValueError):
+
+        class Duplicate(symbols.Symbol):
+            discriminator = "$"
+
+    assert symbols.MAP["$"] is symbols.Identifier
+
+
+def test_parse():
+    parsed = symbols.Collection._parse_str("$AAPL,.price,^20240101T000000,*bars")
+    assert [type(symbol) for symbol in parsed] == [
+        symbols.Identifier,
+        symbols.Attribute,
+        symbols.Timestamp,
+        symbols.Router,
+    ]
+    assert parsed[0] is symbols.Identifier("AAPL")
+    with pytest.raises(ValueError):
+        symbols.Collection._parse_str("$AAPL,AAPL")
+
+
+def test_parse_str():
+    collection = symbols.Collection.parse_str("$AAPL, $MSFT,$AAPL")
+    assert collection.obj == "AAPL,MSFT"
+    with pytest.raises(ValueError):
+        symbols.Collection.parse_str("$AAPL,.price")
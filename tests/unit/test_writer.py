@@ -0,0 +1,169 @@
+import asyncio
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import MetaData
+from sqlalchemy import types as t
+from sqlalchemy.orm import Mapped, declarative_base, mapped_column
+
+from src.api import core
+from src.api.core.orm.writer import BatchWriter, datetimes, row
+
+base = declarative_base(metadata=MetaData(schema="test"))
+
+
+class OHLC(base):
+    __tablename__ = "ohlc"
+    timestamp: Mapped[str] = mapped_column(t.String, primary_key=True)
+    symbol: Mapped[str] = mapped_column(t.String, primary_key=True)
+    open_: Mapped[float] = mapped_column(t.Float, name="open")
+    close: Mapped[float] = mapped_column(t.Float)
+
+
+class Bars(base):
+    __tablename__ = "bars"
+    timestamp: Mapped[datetime] = mapped_column(t.DateTime, primary_key=True)
+    symbol: Mapped[str] = mapped_column(t.String, primary_key=True)
+
+
+class _Sink:
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+
+    async def __call__(self, table, rows):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append((table, rows))
+
+
+def test_row():
+    data = {"identifier": "265598", "timestamp": "2024-01-01", "attribute": "price", "open_": 1.0, "close": 2.0}
+    assert row(data, OHLC) == {"timestamp": "2024-01-01", "symbol": "265598", "open": 1.0, "close": 2.0}
+    assert row(data, OHLC.__table__) == {"timestamp": "2024-01-01", "symbol": "265598", "close": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_flush_on_size():
+    sink = _Sink()
+    writer = BatchWriter(sink, batch_size=3, interval=60)
+    for i in range(7):
+        await writer.put(OHLC, {"close": i})
+    assert [len(rows) for _, rows in sink.batches] == [3, 3]
+    assert writer.pending == 1
+    await writer.close()
+    assert [len(rows) for _, rows in sink.batches] == [3, 3, 1]
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_on_interval():
+    sink = _Sink()
+    writer = BatchWriter(sink, batch_size=100, interval=0.05).start()
+    await writer.put(OHLC, {"close": 1})
+    await asyncio.sleep(0.15)
+    assert len(sink.batches) == 1
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows():
+    sink = _Sink(failures=1)
+    writer = BatchWriter(sink, batch_size=2, interval=60)
+    await writer.put(OHLC, {"close": 1})
+    await writer.put(OHLC, {"close": 2})
+    assert writer.pending == 2 and writer.backing_off
+    await writer.put(OHLC, {"close": 3})
+    assert not sink.batches
+    await writer.close()
+    assert [[data["close"] for data in rows] for _, rows in sink.batches] == [[1, 2, 3]]
+    assert writer.pending == 0 and not writer.backing_off
+
+
+@pytest.mark.asyncio
+async def test_backoff_holds_put():
+    sink = _Sink(failures=1)
+    writer = BatchWriter(sink, batch_size=1, max_pending=3, interval=60)
+    for i in range(3):
+        await writer.put(OHLC, {"close": i})
+    assert writer.pending == 3 and not sink.failures and not sink.batches
+    sink.failures = 1
+    with pytest.raises(ConnectionError):
+        await writer.put(OHLC, {"close": 3})
+    assert writer.pending == 3
+    await writer.put(OHLC, {"close": 3})
+    assert [[data["close"] for data in rows] for _, rows in sink.batches] == [[0, 1, 2], [3]]
+    await writer.close()
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_retries():
+    sink = _Sink(failures=2)
+    writer = BatchWriter(sink, batch_size=100, interval=0.02).start()
+    await writer.put(OHLC, {"close": 1})
+    await asyncio.sleep(0.25)
+    assert [len(rows) for _, rows in sink.batches] == [1]
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_close_raises():
+    sink = _Sink(failures=2)
+    writer = BatchWriter(sink, batch_size=100, interval=60)
+    await writer.put(OHLC, {"close": 1})
+    await writer.put(Bars, {"close": 2})
+    with pytest.raises(ConnectionError):
+        await writer.close()
+    assert writer.pending == 2
+    await writer.close()
+    assert writer.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_backpressure():
+    sink = _Sink(delay=0.05)
+    writer = BatchWriter(sink, batch_size=100, max_pending=2, interval=60)
+    await writer.put(OHLC, {"close": 1})
+    await writer.put(OHLC.__table__, {"close": 2})
+    assert not sink.batches
+    await writer.put(OHLC, {"close": 3})
+    assert {len(rows) for _, rows in sink.batches} == {1}
+    assert writer.pending == 1
+    await writer.close()
+
+
+def test_datetimes():
+    record = core.Record(
+        identifier=core.symbols.Identifier("1"),
+        timestamp=core.symbols.Timestamp("20240101T003000"),
+    )
+    rows = [
+        row(record.json, Bars),
+        {"timestamp": "2024-01-02T00:00:00", "symbol": "$2"},
+        {"timestamp": datetime(2024, 1, 3), "symbol": "$3"},
+    ]
+    assert [data["timestamp"] for data in datetimes(rows, Bars)] == [
+        datetime(2024, 1, 1, 0, 30),
+        datetime(2024, 1, 2),
+        datetime(2024, 1, 3),
+    ]
+
+
+def test_datetimes_dates():
+    records = [
+        core.Record(identifier=core.symbols.Identifier("1"), timestamp=core.symbols.Timestamp()),
+        core.Record(identifier=core.symbols.Identifier("2"), timestamp=core.symbols.Timestamp(date(2024, 1, 2))),
+    ]
+    assert [data["timestamp"] for data in datetimes([row(r.json, Bars) for r in records], Bars)] == [
+        datetime.combine(date.today(), datetime.min.time()),
+        datetime(2024, 1, 2),
+    ]
+    invalid = core.Record(
+        identifier=core.symbols.Identifier("3"), timestamp=core.symbols.Timestamp(datetime.min.time())
+    )
+    with pytest.raises(ValueError):
+        datetimes([row(invalid.json, Bars)], Bars)